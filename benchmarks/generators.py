@@ -0,0 +1,105 @@
+"""Deterministic synthetic data for the benchmarks (seeded, no network)."""
+import datetime
+import json
+import random
+
+from service.history_store import HistoryStore, NewsRecord
+from service.regions import CITY_TO_REGION_MAPPING, REGION_MAPPING
+
+LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+WORDS = (
+    "вибухи", "ворог", "атакує", "дрони", "ракети", "ППО", "працює", "укриття", "загроза",
+    "напрямок", "північ", "південь", "схід", "місто", "область", "відбій", "тривоги",
+    "балістика", "шахеди", "курс", "група", "обстріл", "район", "громада", "увага",
+)
+REGIONS = sorted(REGION_MAPPING)
+# Names as they appear in posts: full names, cities, short forms, unknown
+REGION_NAMES = REGIONS + sorted(CITY_TO_REGION_MAPPING) + [r.replace(" область", "") for r in REGIONS] + ["Невідомо", "Азов"]
+
+
+def text(rng, words=25):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def post_json(rng, i):
+    return {
+        "summary": f"{text(rng, 12)} #{i}",
+        "original_text": f"{text(rng, 60)} #{i}",
+        "level": rng.choice(LEVELS),
+        "regions": rng.sample(REGIONS, rng.randint(0, 3)),
+        "status": "ignore" if rng.random() < 0.1 else "normal",
+    }
+
+
+class Message:
+    """Stand-in for a Telethon message."""
+
+    def __init__(self, id, message, date):
+        self.id = id
+        self.message = message
+        self.date = date
+
+
+def messages(n, seed=1):
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        Message(i + 1, "json\n" + json.dumps(post_json(rng, i), ensure_ascii=False), now)
+        for i in range(n)
+    ]
+
+
+def records(n, seed=2):
+    rng = random.Random(seed)
+    for i in range(n):
+        post = post_json(rng, i)
+        record = NewsRecord(
+            "УВАГА", post["summary"], "19.10.2026", f"{i % 24:02d}:{i % 60:02d}:00", "yellow700",
+            regions=post["regions"], status=post["status"],
+        )
+        yield record, post["original_text"]
+
+
+def history_file(path, n, seed=2):
+    """Writes an n-record history file in one pass (same format as HistoryStore.append)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (record, original_text) in enumerate(records(n, seed), start=1):
+            record.id = i
+            f.write(json.dumps(record.to_dict(original_text), ensure_ascii=False) + "\n")
+    return HistoryStore(path=path, legacy_path=path + ".legacy")
+
+
+def alert_states(density, seed=3):
+    """Alerts API payload with `density` (0..1) of the regions under alert."""
+    rng = random.Random(seed)
+    active = set(rng.sample(REGIONS, round(len(REGIONS) * density)))
+    return {name: {"alertnow": name in active, "changed": "2026-10-19 10:00:00"} for name in REGIONS}
+
+
+def region_names(n, seed=4):
+    rng = random.Random(seed)
+    return [rng.choice(REGION_NAMES) for _ in range(n)]
+
+
+# Ordinary prose around the keywords: non-JSON posts are mostly not threat words
+PROSE = (
+    "сьогодні", "вранці", "у", "місті", "проходили", "роботи", "мешканців", "просять", "бути",
+    "уважними", "повідомляють", "про", "на", "та", "не", "ігноруйте", "сигнали", "обережні",
+)
+
+
+def plain_posts(n, seed=6):
+    """Non-JSON channel posts: prose with a few threat words and region/city names."""
+    rng = random.Random(seed)
+    places = REGION_NAMES + ["Харківщину", "Одещини", "Києві", "Львова", "Сумах"]
+    posts = []
+    for _ in range(n):
+        words = [rng.choice(PROSE) for _ in range(25)] + [rng.choice(WORDS) for _ in range(3)]
+        words += [rng.choice(places) for _ in range(rng.randint(0, 2))]
+        rng.shuffle(words)
+        posts.append(" ".join(words).capitalize() + ".")
+    return posts
+
+
+def days(n, end=datetime.date(2026, 10, 19)):
+    return [end - datetime.timedelta(days=k) for k in range(n - 1, -1, -1)]
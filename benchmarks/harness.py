@@ -0,0 +1,118 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Each repeat runs the benchmark for at least this long (timeit-style autorange)
+MIN_REPEAT_TIME = 0.05
+REPEATS = 7
+# Relative slowdown against the baseline reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+class Result:
+    def __init__(self, name, params, per_op):
+        self.name = name
+        self.params = params
+        # Seconds per operation, one entry per repeat
+        self.per_op = per_op
+
+    @property
+    def key(self):
+        if not self.params:
+            return self.name
+        return self.name + "[" + ",".join(f"{k}={v}" for k, v in sorted(self.params.items())) + "]"
+
+    def to_dict(self):
+        q1, _, q3 = statistics.quantiles(self.per_op, n=4) if len(self.per_op) > 1 else (self.per_op[0],) * 3
+        return {
+            "name": self.name,
+            "params": self.params,
+            "median_us": statistics.median(self.per_op) * 1e6,
+            "min_us": min(self.per_op) * 1e6,
+            "iqr_us": (q3 - q1) * 1e6,
+            "repeats": len(self.per_op),
+        }
+
+
+def measure(fn, repeats=REPEATS, min_time=MIN_REPEAT_TIME):
+    """Seconds per call of fn(), one value per repeat; GC is off while timing."""
+    fn()  # warm-up (imports, caches, lazy init)
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_op = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            per_op.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return per_op
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save(results, path):
+    data = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "results": {r.key: r.to_dict() for r in results},
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """Lines comparing medians with a saved run; returns (lines, regressions)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    lines, regressions = [], []
+    for r in results:
+        base = baseline.get(r.key)
+        if base is None:
+            lines.append(f"{r.key}: new")
+            continue
+        current = r.to_dict()["median_us"]
+        change = current / base["median_us"] - 1 if base["median_us"] else 0.0
+        # Changes inside the noise of either run are not reported as regressions
+        noise = max(r.to_dict()["iqr_us"], base["iqr_us"]) / base["median_us"] if base["median_us"] else 0.0
+        flag = ""
+        if change > max(threshold, noise):
+            flag = "  REGRESSION"
+            regressions.append(r.key)
+        elif change < -max(threshold, noise):
+            flag = "  faster"
+        lines.append(f"{r.key}: {base['median_us']:.1f} -> {current:.1f} us ({change:+.1%}){flag}")
+    return lines, regressions
+
+
+def format_result(r):
+    d = r.to_dict()
+    return f"{r.key:60s} median {d['median_us']:12.1f} us  min {d['min_us']:12.1f} us  iqr {d['iqr_us']:10.1f} us"
@@ -0,0 +1,240 @@
+"""Offline benchmarks for the hot paths.
+
+    python -m benchmarks.run                      # full run, saves benchmarks/results/<timestamp>.json
+    python -m benchmarks.run --quick -k history   # smaller sizes, only matching benchmarks
+    python -m benchmarks.run --baseline benchmarks/results/<old>.json
+
+Everything runs against synthetic data in a temporary directory: no
+Telegram, no alerts API, no Flet window.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import generators
+from benchmarks.harness import Result, compare, format_result, measure, save
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SVG_PATH = os.path.join(ROOT, "ukraine.svg")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+HISTORY_SIZES = (100, 10_000, 100_000)
+QUICK_HISTORY_SIZES = (100, 10_000)
+ALERT_DENSITIES = (0.0, 0.25, 1.0)
+
+
+class _FakePage:
+    """Just enough of ft.Page for controls and the UpdateScheduler."""
+
+    def __init__(self):
+        self.client_storage = None
+
+    def update(self, *controls):
+        pass
+
+
+def bench_map(quick):
+    from ui.components.map_component import MapComponent
+    from ui.frame_assets import FrameAssets
+    from ui.map_renderer import MapRenderer
+
+    # cache_size=0: every state is rendered, as on a cache miss
+    renderer = MapRenderer(SVG_PATH, cache_size=0).load()
+    component = MapComponent(svg_path=SVG_PATH, defer_load=True, frame_cache_path=os.devnull, assets=FrameAssets("assets"))
+    component.renderer = renderer
+    results = []
+    for density in ALERT_DENSITIES:
+        # Two different states with the same density, alternated so each call renders
+        states = (generators.alert_states(density, seed=3), generators.alert_states(density, seed=4))
+        for highlights in (0, 3):
+            component.set_highlights(generators.REGIONS[:highlights])
+
+            def render_and_send():
+                component.update_alerts(states[0])
+                component.update_alerts(states[1])
+
+            results.append(Result("map.render_map_state", {"alerts": density, "highlights": highlights},
+                                  [t / 2 for t in measure(render_and_send)]))
+    return results
+
+
+def bench_process_message(quick):
+    import config
+    from service.telegram_service import TelegramService
+
+    config.API_ID = config.API_ID or 1
+    messages = generators.messages(2_000 if quick else 10_000)
+    service = TelegramService(lambda *args, **kwargs: None, client_factory=lambda: None)
+    # State writes are part of the per-message cost today; keep them in the measurement
+    index = iter(range(1 << 62))
+
+    async def run_batch():
+        for message in messages:
+            # Fresh ids/dedup window so every message takes the full path
+            message.id = next(index)
+            await service.process_message(message)
+        service.dedup = type(service.dedup)()
+
+    loop = asyncio.new_event_loop()
+    try:
+        per_batch = measure(lambda: loop.run_until_complete(run_batch()), repeats=5)
+    finally:
+        loop.close()
+    return [Result("telegram.process_message", {"messages": len(messages)}, [t / len(messages) for t in per_batch])]
+
+
+def bench_history(quick):
+    from service.history_store import NewsRecord
+
+    results = []
+    for n in QUICK_HISTORY_SIZES if quick else HISTORY_SIZES:
+        path = f"history-{n}.jsonl"
+        store = generators.history_file(path, n)
+        results.append(Result("history.load", {"items": n}, measure(store.load, repeats=5)))
+
+        record, original_text = next(generators.records(1, seed=9))
+        size = os.path.getsize(path)
+
+        def append():
+            store.append(NewsRecord(record.title, record.text, record.footer, record.time, record.bg_color,
+                                    regions=record.regions, status=record.status), original_text)
+
+        per_op = measure(append)
+        results.append(Result("history.append", {"items": n}, per_op))
+        # Keep later sizes independent of how many appends the autorange did
+        with open(path, "r+b") as f:
+            f.truncate(size)
+    return results
+
+
+def bench_regions(quick):
+    from service.regions import REGION_MAPPING, canonical_region, region_svg_id
+
+    names = generators.region_names(1_000)
+    # The lookup chain without the memoization (first sighting of a name)
+    resolve = canonical_region.__wrapped__
+
+    def cold():
+        for name in names:
+            REGION_MAPPING.get(resolve(name))
+
+    def warm():
+        for name in names:
+            region_svg_id(name)
+
+    return [
+        Result("regions.resolve", {"cache": "cold"}, [t / len(names) for t in measure(cold)]),
+        Result("regions.resolve", {"cache": "warm"}, [t / len(names) for t in measure(warm)]),
+    ]
+
+
+def bench_feed_filter(quick):
+    from service.log_service import remove_sink
+    from ui.app_layout import AppLayout
+    from ui.frame_assets import FrameAssets
+    from ui.update_scheduler import UpdateScheduler
+
+    results = []
+    for n in (100, 1_000) if quick else (100, 1_000, 5_000):
+        page = _FakePage()
+        # Frames under the temporary directory, not the checkout's assets/
+        layout = AppLayout(page, scheduler=UpdateScheduler(page), history=generators.history_file(f"feed-{n}.jsonl", n),
+                           assets=FrameAssets("assets"))
+        try:
+            asyncio.run(layout.load_history_async())
+            state = [False]
+
+            def toggle():
+                state[0] = not state[0]
+                layout.toggle_ignored_view(state[0])
+
+            results.append(Result("feed.toggle_ignored", {"cards": n}, measure(toggle)))
+        finally:
+            remove_sink(layout.on_log_record)
+    return results
+
+
+def bench_analytics(quick):
+    import numpy as np
+    from service.alert_analytics import REGIONS, SLOTS_PER_DAY, compute_report
+
+    results = []
+    rng = np.random.default_rng(5)
+    for days in (7, 30) if quick else (7, 30, 90):
+        day_list = generators.days(days)
+        alerts = rng.random((len(REGIONS), days * SLOTS_PER_DAY)) < 0.2
+        sampled = np.ones(days * SLOTS_PER_DAY, dtype=bool)
+        results.append(Result("analytics.report", {"days": days},
+                              measure(lambda: compute_report(alerts, sampled, day_list), repeats=3)))
+    return results
+
+
+def bench_text_classifier(quick):
+    from service.text_classifier import TextClassifier
+
+    results = [Result("text_classifier.build", {}, measure(TextClassifier, repeats=3))]
+    classifier = TextClassifier()
+    texts = generators.plain_posts(500 if quick else 2_000)
+    results.append(Result("text_classifier.classify", {"messages": len(texts)},
+                          [t / len(texts) for t in measure(lambda: [classifier.classify(t) for t in texts], repeats=5)]))
+    return results
+
+
+BENCHMARKS = {
+    "map": bench_map,
+    "process_message": bench_process_message,
+    "history": bench_history,
+    "regions": bench_regions,
+    "feed": bench_feed_filter,
+    "analytics": bench_analytics,
+    "text_classifier": bench_text_classifier,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varta AI offline benchmarks")
+    parser.add_argument("-k", dest="only", action="append", default=[], help="Run only benchmarks whose group contains this (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Smaller data sizes")
+    parser.add_argument("--out", default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved result file")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 if a benchmark regressed")
+    args = parser.parse_args(argv)
+
+    out = os.path.abspath(args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json"))
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Logging from the services under test would dominate the timings
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix="varta-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    results = []
+    try:
+        for group, bench in BENCHMARKS.items():
+            if args.only and not any(part in group for part in args.only):
+                continue
+            for result in bench(args.quick):
+                print(format_result(result), flush=True)
+                results.append(result)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Saved {save(results, out)}")
+    if baseline:
+        lines, regressions = compare(results, baseline)
+        print(f"\nAgainst {baseline}:")
+        for line in lines:
+            print(line)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,3 +6,5 @@ load_dotenv()
 API_ID = os.getenv('TELEGRAM_API_ID')
 API_HASH = os.getenv('TELEGRAM_API_HASH')
 CHANNEL_USERNAME = os.getenv('CHANNEL_USERNAME') # Example: '@news_channel' or channel ID
+# Latest posts prefetched on a first run (no telegram_state.json) so the feed is not empty; 0 disables
+BOOTSTRAP_MESSAGES = int(os.getenv('BOOTSTRAP_MESSAGES', '50'))
@@ -0,0 +1,172 @@
+"""Headless ingestion daemon: Telegram + alerts -> classification -> history + sinks.
+
+Runs the same pipeline as the Flet app without loading Flet, e.g.:
+
+    python headless.py --sink stdout --sink file:news.jsonl --region "Харківська область"
+"""
+import argparse
+import asyncio
+import signal
+import sys
+import time
+from collections import OrderedDict
+
+import config
+from service.alert_playback import AlertStateLog
+from service.classifier import classify
+from service.history_store import HistoryStore, NewsRecord
+from service.ingestion_hub import RECENT_MESSAGES
+from service.log_service import add_sink, get_logger, setup_logging, shutdown_logging
+from service.loop_watchdog import get_watchdog
+from service.sinks import create_sink
+
+logger = get_logger("Daemon")
+
+
+class HeadlessDaemon:
+    def __init__(self, sinks, user_region=None, history=None):
+        self.sinks = sinks
+        self.user_region = user_region
+        self.history = history or HistoryStore()
+        self.telegram_service = None
+        self.alerts_service = None
+        self.timeline = None
+        self.state_log = AlertStateLog()
+        self._active_alerts = None
+        # Telegram message id -> history record id, for duplicate notifications
+        self._recent = OrderedDict()
+        self._stop = asyncio.Event()
+
+    def emit(self, item):
+        for sink in self.sinks:
+            try:
+                sink.emit(item)
+            except Exception as e:
+                logger.error(f"Sink {type(sink).__name__} failed: {e}")
+
+    def on_telegram_message(self, summary, original_text, level, regions, time_str, footer, status="normal", trace=None, message_id=None):
+        title, bg_color = classify(level, regions, status, self.user_region)
+        record = NewsRecord(title, summary, footer, time_str, bg_color, regions=regions, status=status, level=level)
+        self.history.append(record, original_text)
+        if message_id is not None:
+            self._recent[message_id] = record.id
+            if len(self._recent) > RECENT_MESSAGES:
+                self._recent.popitem(last=False)
+        self.emit({
+            "type": "news",
+            "id": record.id,
+            "title": title,
+            "color": bg_color,
+            "level": level,
+            "regions": regions,
+            "status": status,
+            "summary": summary,
+            "original_text": original_text,
+            "time": time_str,
+            "date": footer,
+        })
+        if trace:
+            trace.finish()
+
+    def on_duplicate(self, message_id, sources):
+        self.emit({"type": "duplicate", "id": self._recent.get(message_id), "sources": sources})
+
+    def on_alerts_update(self, states, trace=None):
+        if self.timeline:
+            self.timeline.record(states)
+        self.state_log.record(states)
+        active = sorted(name for name, data in states.items() if data.get("alertnow"))
+        # Only changes are emitted - the poller runs every 15 seconds
+        if active != self._active_alerts:
+            self._active_alerts = active
+            self.emit({"type": "alerts", "time": time.time(), "active": active})
+        if trace:
+            trace.finish()
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self):
+        # Imported here so `--help` and config errors stay cheap
+        from service.alert_analytics import AlertTimeline
+        from service.alerts_service import AlertsService
+        from service.telegram_service import TelegramService
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows: fall back to KeyboardInterrupt
+                pass
+
+        get_watchdog().start()
+
+        # Written before any Telegram message can be appended
+        self.history.load()
+
+        config.API_ID = int(config.API_ID)
+        self.telegram_service = TelegramService(self.on_telegram_message, self.on_duplicate)
+        self.alerts_service = AlertsService(self.on_alerts_update)
+        tasks = [asyncio.create_task(self.telegram_service.start())]
+        self.alerts_service.start_polling()
+        self.timeline = AlertTimeline()
+        self.timeline.schedule_flush()
+        logger.info("Headless daemon started")
+
+        await self._stop.wait()
+        logger.info("Shutting down...")
+
+        self.alerts_service.stop()
+        self.timeline.flush()
+        await self.telegram_service.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def _config_error():
+    try:
+        int(config.API_ID)
+    except (ValueError, TypeError):
+        return "TELEGRAM_API_ID is missing or invalid"
+    if not config.API_HASH or config.API_HASH == "your_api_hash":
+        return "TELEGRAM_API_HASH is missing"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varta AI headless ingestion daemon")
+    parser.add_argument("--sink", action="append", default=[],
+                        help="stdout | file:<path> | webhook:<url> (repeatable, default: stdout)")
+    parser.add_argument("--region", default=None, help="User region for 'ВЕЛИКА НЕБЕЗПЕКА' classification")
+    parser.add_argument("--verbose", action="store_true", help="Also print log records to stderr")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if args.verbose:
+        add_sink(lambda record: print(f"{record.levelname} {record.source}: {record.getMessage()}", file=sys.stderr))
+
+    error = _config_error()
+    if error:
+        logger.error(f"Invalid Configuration: {error}")
+        print(f"Invalid Configuration: {error}", file=sys.stderr)
+        return 2
+
+    daemon = HeadlessDaemon([create_sink(spec) for spec in args.sink or ["stdout"]], user_region=args.region)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
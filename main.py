@@ -1,22 +1,48 @@
+from time import perf_counter
+# Reference point for the startup timeline
+PROCESS_START = perf_counter()
+
 import flet as ft
 import asyncio
 from ui.app_layout import AppLayout
-from service.telegram_service import TelegramService
-from service.alerts_service import AlertsService
+from ui.frame_assets import ASSETS_DIR
+from ui.update_scheduler import UpdateScheduler
 import os
 from datetime import datetime
 import config
+from service.log_service import get_logger, remove_sink, setup_logging
+from service.metrics import NULL_TRACE, Timeline
+from service.health_service import OK, format_result
+from service.ingestion_hub import get_hub
+from service.loop_watchdog import get_watchdog
+from service.periodic import get_periodic
 
+from ui.analytics_dialog import AnalyticsDialog
 from ui.settings_dialog import SettingsDialog
+from ui.settings_store import SettingsStore
+
+logger = get_logger("UI")
 
 async def main(page: ft.Page):
-    telegram_service = None
-    alerts_service = None
+    # Structured logs: queue -> listener thread -> rotating JSONL files + developer console
+    setup_logging()
+    # Always on: loop lag + call sites of blocking work (idempotent across sessions)
+    get_watchdog().start()
+
+    # Staged startup: shell + cached map frame paint first, everything else after
+    startup = Timeline("startup", start=PROCESS_START)
+
+    def mark(phase, **fields):
+        # Phase names are fixed (one metric series each); details go in fields
+        elapsed = startup.mark(phase)
+        logger.info(f"Startup: {phase} +{elapsed:.0f} мс", extra={"fields": {"phase": phase, "ms": elapsed, **fields}})
+
+    mark("flet_ready")
+
+    # Telegram client, alerts poller and history are shared by all sessions (web mode)
+    hub = get_hub()
+    subscription = None
     
-    # Store user settings in memory to avoid client_storage calls during callbacks
-    user_settings = {
-        "region": None
-    }
     page.title = "Varta AI"
     page.theme_mode = ft.ThemeMode.DARK
     page.title = "Varta AI"
@@ -28,18 +54,27 @@ async def main(page: ft.Page):
     page.window.min_height = 700
     page.update()
 
+    # Single path for UI updates: components mark controls dirty, scheduler flushes per frame
+    scheduler = UpdateScheduler(page)
+
     def on_dev_mode_change(enabled):
         layout.toggle_console(visible=enabled)
         layout.log("Developer Mode " + ("Enabled" if enabled else "Disabled"))
         
+    # Typed settings cache: loaded once after first paint, persisted write-behind
+    settings = SettingsStore(page, scheduler)
+
     def on_region_changed(region):
-        user_settings["region"] = region
+        if subscription:
+            hub.set_region(subscription, region)
+        layout.map_view.set_region(region)
         if region:
              layout.log(f"Регіон змінено на: {region}")
         else:
              layout.log("Регіон скинуто")
 
-    settings_dialog = SettingsDialog(page, on_dev_mode_change, on_region_changed)
+    settings.subscribe("user_region", on_region_changed)
+    settings_dialog = SettingsDialog(page, settings, on_dev_mode_change)
 
     # --- Info Tooltip (Overlay) ---
     info_tooltip = ft.Container(
@@ -94,11 +129,11 @@ async def main(page: ft.Page):
 
     def show_tooltip(e):
         info_tooltip.opacity = 1
-        info_tooltip.update()
+        scheduler.mark_dirty(info_tooltip)
 
     def hide_tooltip(e):
         info_tooltip.opacity = 0
-        info_tooltip.update()
+        scheduler.mark_dirty(info_tooltip)
 
     # --- Header ---
     header_content = ft.Row(
@@ -128,11 +163,19 @@ async def main(page: ft.Page):
     )
 
     settings_btn = ft.IconButton(icon=ft.Icons.SETTINGS, icon_color=ft.Colors.BLUE_400, on_click=lambda _: settings_dialog.show())
+
+    analytics_dialog = AnalyticsDialog(page, hub, scheduler)
+
+    async def on_analytics_click(e):
+        await analytics_dialog.show()
+
+    analytics_btn = ft.IconButton(icon=ft.Icons.INSIGHTS, icon_color=ft.Colors.BLUE_400, tooltip="Аналітика тривог", on_click=on_analytics_click)
     
     header = ft.Row(
         controls=[
             header_interactive,
             ft.Container(expand=True),
+            analytics_btn,
             settings_btn
         ],
         alignment=ft.MainAxisAlignment.START,
@@ -140,42 +183,27 @@ async def main(page: ft.Page):
 
     async def on_pulse(e):
         layout.log("--- ПЕРЕВІРКА ПУЛЬСУ СИСТЕМИ ---")
-        
-        # 1. Telegram Connection
-        layout.log("1. Перевірка з'єднання з Telegram...")
-        if telegram_service:
-            connected = await telegram_service.check_connection()
-            if not connected:
-                layout.log("Увага: Telegram не авторизовано/не підключено.")
-        else:
-            layout.log("Telegram сервіс: НЕ ЗАПУЩЕНО")
-            
-        await asyncio.sleep(0.5)
-
-        # 2. Reading Status (Inferred from presence of service)
-        layout.log("2. Статус читача...")
-        if telegram_service:
-             layout.log(f"Слухаємо канал: {telegram_service.channel_username}")
-             
-        await asyncio.sleep(0.5)
-        
-        # 3. Missed Messages
-        layout.log("3. Перевірка пропущених повідомлень...")
-        if telegram_service:
-            await telegram_service.check_missed_messages()
 
-        await asyncio.sleep(0.5)
+        report = await hub.health.run()
+        for result in report:
+            layout.log(format_result(result), level="INFO" if result.status == OK else "WARNING")
 
-        # 4. Alerts Data
-        layout.log("4. Оновлення даних про тривоги...")
-        if alerts_service:
-            await alerts_service.force_refresh()
-        else:
-            layout.log("Сервіс тривог: НЕ ЗАПУЩЕНО")
+        for line in get_watchdog().format_lines():
+            layout.log(line, level="INFO")
+
+        for line in get_periodic().format_lines():
+            layout.log(line, level="INFO")
+
+        stats = scheduler.stats()
+        layout.log(f"UI оновлення: запитів {stats['requested']}, відправлено {stats['flushes']}")
             
         layout.log("--- ПЕРЕВІРКУ ЗАВЕРШЕНО ---")
 
-    layout = AppLayout(page, on_clear_history=lambda e: layout.clear_history(e), on_pulse_click=on_pulse)
+    def on_clear_history(e):
+        hub.clear_history()
+        layout.clear_history(e)
+
+    layout = AppLayout(page, on_clear_history=on_clear_history, on_pulse_click=on_pulse, scheduler=scheduler, history=hub.history, state_log=hub.state_log)
     
     # Main Container with Gradient
     main_container = ft.Container(
@@ -197,119 +225,111 @@ async def main(page: ft.Page):
     )
     
     page.add(main_container)
-
-    # Callback to update UI from Telegram
-    def on_telegram_message(summary, original_text, level, regions, time, footer, status="normal"):
-        # Get User Region from cached settings (AVOIDS TIMEOUT)
-        user_region = user_settings.get("region")
-        
-        is_region_match = False
-        if user_region and regions:
-            # Check if regions is a list or string, theoretically list per new JSON
-            if isinstance(regions, list):
-                if user_region in regions:
-                    is_region_match = True
-            elif isinstance(regions, str) and regions != "none":
-                if user_region == regions:
-                    is_region_match = True
-
-        # Default Mapping
-        title = "ПОВІДОМЛЕННЯ"
-        bg_color = ft.Colors.BLUE_GREY_700
-        
-        if status == "ignore":
-            title = "IGNORED"
-            bg_color = ft.Colors.GREY_700
-            # We can also modify summary/text if needed, but requirements said:
-            # "summary text on front, original_text on back. Grey color."
-            # That's already handled by passing arguments.
-            
-        else:
-            # LOGIC:
-            # Red Card IF: (Region Match AND Level != LOW) OR (Level == CRITICAL)
-            
-            is_danger = False
-            if level == "CRITICAL":
-                is_danger = True
-            elif is_region_match and level != "LOW":
-                is_danger = True
-                
-            if is_danger:
-                title = "ВЕЛИКА НЕБЕЗПЕКА"
-                bg_color = ft.Colors.RED_700
-            else:
-                # Standard Colors based on Level
-                if level == "LOW":
-                    title = "ІНФОРМАЦІЯ"
-                    bg_color = ft.Colors.GREEN_700
-                elif level == "MEDIUM":
-                    title = "УВАГА"
-                    bg_color = ft.Colors.YELLOW_700
-                elif level == "HIGH":
-                    title = "НЕБЕЗПЕКА"
-                    bg_color = ft.Colors.ORANGE_700
-                else:
-                    title = "ПОВІДОМЛЕННЯ"
-                    bg_color = ft.Colors.BLUE_GREY_700
-
-        # Add News Card
-        layout.add_news(title, summary, footer, time, bg_color, original_text=original_text, regions=regions, status=status)
-        
-    def logger(msg):
-        layout.log(msg)
+    mark("first_paint")
 
     # Verify API credentials
-    api_id_valid = False
+    config_error = None
     try:
         real_api_id = int(config.API_ID)
-        api_id_valid = True
     except (ValueError, TypeError):
-        pass
+        real_api_id = None
+    if real_api_id is None or config.API_ID == 'your_api_id':
+        config_error = "Будь ласка, відкрийте файл .env та вкажіть ваші TELEGRAM_API_ID та TELEGRAM_API_HASH."
+        logger.error("Invalid Configuration: API_ID is missing or invalid.")
+    elif not config.API_HASH or config.API_HASH == 'your_api_hash':
+        config_error = "Вкажіть TELEGRAM_API_HASH у файлі .env"
+    else:
+        # Temporarily update config with integer ID for this session
+        config.API_ID = real_api_id
 
-    if not api_id_valid or config.API_ID == 'your_api_id':
+    if config_error:
         layout.add_news(
             "ПОМИЛКА НАЛАШТУВАННЯ", 
-            "Будь ласка, відкрийте файл .env та вкажіть ваші TELEGRAM_API_ID та TELEGRAM_API_HASH.", 
+            config_error, 
             "Система", 
             datetime.now().strftime("%H:%M:%S"), 
-            ft.Colors.RED_700,
-            save=False
+            ft.Colors.RED_700
         )
-        print("Invalid Configuration: API_ID is missing or invalid.")
-        return
 
-    # Initialize Telegram Service
-    if config.API_HASH and config.API_HASH != 'your_api_hash':
-        # Temporarily update config with integer ID for this session
-        config.API_ID = real_api_id
-        
-        telegram_service = TelegramService(on_telegram_message, logger=logger)
-        
-        # Run Telegram client in the background
-        asyncio.create_task(telegram_service.start())
-        
-        # Initialize Alerts Service (Map)
-        def on_alerts_update(states):
-            # This runs in a thread or async context depending on implementation
-            # AppLayout.update_map calls map.update_alerts -> updates UI
-            # Flet requires running UI updates on loop?
-            # Since requests are blocking in thread, we call this on thread.
-            # But MapComponent modifies controls. `image_control.update()` needs to happen.
-            # Page is thread-safe.
-            layout.update_map(states)
-            
-        alerts_service = AlertsService(on_alerts_update, logger=logger)
-        asyncio.create_task(alerts_service.start_polling())
-        
-    else:
-        layout.add_news(
-            "ПОМИЛКА НАЛАШТУВАННЯ", 
-            "Вкажіть TELEGRAM_API_HASH у файлі .env", 
-            "Система", 
-            datetime.now().strftime("%H:%M:%S"), 
-            ft.Colors.RED_700,
-            save=False
+    # Callback to update UI from Telegram (called by the hub for every session)
+    def on_telegram_message(item, result):
+        # `result` is already classified for this session's region by the hub
+        layout.add_persisted_news(item.record, result.title, result.bg_color, original_text=item.original_text, trace=item.trace or NULL_TRACE)
+
+    def on_telegram_batch(entries):
+        # First-run prefetch: all cards in one non-animated update
+        layout.add_persisted_news_batch([(item.record, result.title, result.bg_color, item.original_text) for item, result in entries])
+        layout.log(f"Завантажено {len(entries)} останніх повідомлень каналу")
+
+    first_alerts_seen = False
+
+    def on_alerts_update(states, trace=None):
+        layout.update_map(states, trace=trace or NULL_TRACE)
+        nonlocal first_alerts_seen
+        if not first_alerts_seen:
+            first_alerts_seen = True
+            mark("first_alerts")
+
+    # Deferred work, concurrently after first paint
+    async def load_history():
+        nonlocal subscription
+        # The first session starts the services; heavy imports (telethon, requests) happen there
+        await hub.start(with_services=config_error is None)
+        mark("hub_ready")
+        # History cards are classified for the user's region, so it must be known first
+        await settings.loaded.wait()
+        subscription, records, states = hub.subscribe(
+            on_news=on_telegram_message, on_alerts=on_alerts_update, region=settings.get("user_region"),
+            on_duplicate=layout.update_sources, on_news_batch=on_telegram_batch
         )
+        count = await layout.load_history_async(records)
+        mark("history_loaded", count=count)
+        if states is not None:
+            on_alerts_update(states)
+
+        if hub.telegram_service:
+            asyncio.create_task(wait_telegram_ready())
+
+    async def wait_telegram_ready():
+        await hub.telegram_service.ready.wait()
+        mark("telegram_ready")
+
+    async def load_map():
+        await layout.map.load_svg_async()
+        layout.map_view.refresh()
+        mark("map_loaded")
+
+    async def load_settings():
+        await settings.load()
+        mark("settings_loaded")
+
+    async def deferred_startup():
+        await asyncio.gather(load_history(), load_map(), load_settings())
+        for line in startup.format_lines():
+            layout.log(line, level="DEBUG")
+
+    asyncio.create_task(deferred_startup())
+
+    def on_session_closed(e):
+        # Services keep running for the other sessions
+        if subscription:
+            hub.unsubscribe(subscription)
+        remove_sink(layout.on_log_record)
+
+    page.on_close = on_session_closed
+
+    async def on_lifecycle_change(e):
+        # On the loop: showing the window renders the latest alert states.
+        # INACTIVE is only focus loss - the map is still on screen
+        if not subscription:
+            return
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE):
+            hub.set_visible(subscription, False)
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME):
+            hub.set_visible(subscription, True)
+
+    page.on_app_lifecycle_state_change = on_lifecycle_change
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    # Map frames are published as files under the assets directory (ui.frame_assets)
+    ft.app(target=main, assets_dir=ASSETS_DIR)
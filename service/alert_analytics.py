@@ -0,0 +1,244 @@
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from service.log_service import get_logger
+from service.periodic import get_periodic
+from service.regions import REGION_MAPPING, canonical_region
+
+logger = get_logger("Analytics")
+
+TIMELINE_DIR = "alert_timeline"
+REPORTS_DIR = "reports"
+
+# One bit per region per 15 s (the alerts poll interval)
+SLOT = 15
+SLOTS_PER_HOUR = 3600 // SLOT
+SLOTS_PER_DAY = 24 * SLOTS_PER_HOUR
+# The last state is carried forward over gaps up to this many slots (late or failed polls)
+MAX_FILL = 8
+# Seconds between background writes of the changed days
+FLUSH_INTERVAL = 60
+# Days per block in the co-occurrence product (bounds the float copy)
+BLOCK_DAYS = 7
+TOP_PAIRS = 20
+
+REGIONS = tuple(sorted(REGION_MAPPING))
+
+
+class DayBitmap:
+    """Region x slot alert bits for one local day, plus which slots were actually polled."""
+
+    __slots__ = ("day", "alerts", "sampled", "dirty")
+
+    def __init__(self, day, alerts=None, sampled=None):
+        self.day = day
+        self.alerts = alerts if alerts is not None else np.zeros((len(REGIONS), SLOTS_PER_DAY), dtype=bool)
+        self.sampled = sampled if sampled is not None else np.zeros(SLOTS_PER_DAY, dtype=bool)
+        self.dirty = False
+
+    def save(self, path):
+        # Packed bits: ~18 KB per day uncompressed, far less for quiet days
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp, regions=np.array(REGIONS),
+            alerts=np.packbits(self.alerts, axis=1), sampled=np.packbits(self.sampled),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, day, path):
+        with np.load(path, allow_pickle=False) as data:
+            stored = [str(r) for r in data["regions"]]
+            packed = np.unpackbits(data["alerts"], axis=1, count=SLOTS_PER_DAY).astype(bool)
+            sampled = np.unpackbits(data["sampled"], count=SLOTS_PER_DAY).astype(bool)
+        if tuple(stored) == REGIONS:
+            return cls(day, packed, sampled)
+        # Region list changed since the file was written: copy the rows we still know
+        alerts = np.zeros((len(REGIONS), SLOTS_PER_DAY), dtype=bool)
+        index = {r: i for i, r in enumerate(REGIONS)}
+        for row, region in enumerate(stored):
+            if region in index:
+                alerts[index[region]] = packed[row]
+        return cls(day, alerts, sampled)
+
+
+class AlertTimeline:
+    """Every alerts poll recorded as one column of a per-day region x time bitmap.
+
+    record() runs on the event loop (a few dozen dict lookups and one column
+    write); flush() and report() are meant for worker threads.
+    """
+
+    def __init__(self, path=TIMELINE_DIR):
+        self.path = path
+        self._days = {}
+        self._index = {r: i for i, r in enumerate(REGIONS)}
+        # (day, slot, column) of the previous poll, for filling short gaps
+        self._last = None
+        self._lock = threading.Lock()
+
+    def _file(self, day):
+        return os.path.join(self.path, f"{day.isoformat()}.npz")
+
+    def _day(self, day):
+        bitmap = self._days.get(day)
+        if bitmap is None:
+            path = self._file(day)
+            try:
+                bitmap = DayBitmap.load(day, path) if os.path.exists(path) else DayBitmap(day)
+            except Exception as e:
+                logger.error(f"Error loading alert timeline {path}: {e}")
+                bitmap = DayBitmap(day)
+            self._days[day] = bitmap
+        return bitmap
+
+    def record(self, states, now=None):
+        moment = datetime.fromtimestamp(time.time() if now is None else now)
+        day = moment.date()
+        slot = (moment.hour * 3600 + moment.minute * 60 + moment.second) // SLOT
+        column = np.zeros(len(REGIONS), dtype=bool)
+        for name, data in states.items():
+            i = self._index.get(canonical_region(name))
+            if i is not None and data.get("alertnow"):
+                column[i] = True
+
+        with self._lock:
+            bitmap = self._day(day)
+            last = self._last
+            if last and last[0] == day and 1 < slot - last[1] <= MAX_FILL:
+                # The previous state held until this poll
+                bitmap.alerts[:, last[1] + 1:slot] = last[2][:, None]
+                bitmap.sampled[last[1] + 1:slot] = True
+            bitmap.alerts[:, slot] = column
+            bitmap.sampled[slot] = True
+            bitmap.dirty = True
+            self._last = (day, slot, column)
+
+    def flush(self):
+        """Writes changed days; only today stays cached afterwards."""
+        with self._lock:
+            dirty = [b for b in self._days.values() if b.dirty]
+            for bitmap in dirty:
+                bitmap.dirty = False
+            snapshots = [(b.day, DayBitmap(b.day, b.alerts.copy(), b.sampled.copy())) for b in dirty]
+            today = date.today()
+            self._days = {d: b for d, b in self._days.items() if d == today}
+        if snapshots:
+            os.makedirs(self.path, exist_ok=True)
+        for day, snapshot in snapshots:
+            try:
+                snapshot.save(self._file(day))
+            except Exception as e:
+                logger.error(f"Error saving alert timeline {day}: {e}")
+
+    def schedule_flush(self, interval=FLUSH_INTERVAL, scheduler=None):
+        # Not pausable: the last polls before the window was hidden still get written
+        return (scheduler or get_periodic()).add(
+            "timeline.flush", lambda: asyncio.to_thread(self.flush), interval, first_delay=interval, pausable=False
+        )
+
+    def load_range(self, days):
+        """(alerts R x D*S, sampled D*S) for consecutive `days`; missing days are unsampled."""
+        alerts = np.zeros((len(REGIONS), len(days) * SLOTS_PER_DAY), dtype=bool)
+        sampled = np.zeros(len(days) * SLOTS_PER_DAY, dtype=bool)
+        for n, day in enumerate(days):
+            with self._lock:
+                bitmap = self._days.get(day)
+                if bitmap is not None:
+                    bitmap = DayBitmap(day, bitmap.alerts.copy(), bitmap.sampled.copy())
+            if bitmap is None:
+                path = self._file(day)
+                if not os.path.exists(path):
+                    continue
+                try:
+                    bitmap = DayBitmap.load(day, path)
+                except Exception as e:
+                    logger.error(f"Error loading alert timeline {path}: {e}")
+                    continue
+            span = slice(n * SLOTS_PER_DAY, (n + 1) * SLOTS_PER_DAY)
+            alerts[:, span] = bitmap.alerts
+            sampled[span] = bitmap.sampled
+        return alerts, sampled
+
+    def report(self, days=1, end=None):
+        end = end or date.today()
+        day_list = [end - timedelta(days=n) for n in range(days - 1, -1, -1)]
+        start = time.perf_counter()
+        alerts, sampled = self.load_range(day_list)
+        report = compute_report(alerts, sampled, day_list)
+        report["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return report
+
+
+def compute_report(alerts, sampled, days):
+    """Counts, durations, hour-of-day profile and co-occurrence; no per-sample Python loops."""
+    n_regions, n_days = alerts.shape[0], len(days)
+    # Unpolled slots count as "no alert"
+    active = alerts & sampled
+    slots = active.sum(axis=1)
+
+    # Alert starts are rising edges; one that continues over midnight counts once.
+    # A gap in polling (app closed) splits an alert in two.
+    edges = np.diff(active.view(np.int8), axis=1, prepend=0) == 1
+    counts = edges.sum(axis=1)
+
+    # Share of the polled time under alert, per hour of day
+    by_hour = active.reshape(n_regions, n_days, 24, SLOTS_PER_HOUR).sum(axis=(1, 3))
+    polled_by_hour = sampled.reshape(n_days, 24, SLOTS_PER_HOUR).sum(axis=(0, 2))
+    profile = np.divide(by_hour, polled_by_hour, out=np.zeros(by_hour.shape), where=polled_by_hour > 0)
+
+    # Slots two regions spent under alert together (Gram matrix), in blocks of days
+    together = np.zeros((n_regions, n_regions))
+    block = BLOCK_DAYS * SLOTS_PER_DAY
+    for start in range(0, active.shape[1], block):
+        part = active[:, start:start + block].astype(np.float32)
+        together += part @ part.T
+    either = slots[:, None] + slots[None, :] - together
+    jaccard = np.divide(together, either, out=np.zeros_like(together), where=either > 0)
+
+    upper = np.triu_indices(n_regions, k=1)
+    order = np.argsort(-jaccard[upper])[:TOP_PAIRS]
+    pairs = [
+        {"a": REGIONS[upper[0][k]], "b": REGIONS[upper[1][k]],
+         "minutes_together": round(float(together[upper[0][k], upper[1][k]]) * SLOT / 60),
+         "jaccard": round(float(jaccard[upper[0][k], upper[1][k]]), 3)}
+        for k in order if jaccard[upper[0][k], upper[1][k]] > 0
+    ]
+
+    polled = int(sampled.sum())
+    regions = [
+        {"region": REGIONS[i], "alerts": int(counts[i]), "minutes": round(int(slots[i]) * SLOT / 60),
+         "share": round(float(slots[i]) / polled, 3) if polled else 0.0,
+         "hours": [round(float(v), 3) for v in profile[i]]}
+        for i in np.argsort(-slots, kind="stable")
+    ]
+    return {
+        "from": days[0].isoformat(),
+        "to": days[-1].isoformat(),
+        "days": n_days,
+        "coverage": round(polled / sampled.size, 3),
+        "hour_profile": [round(float(v), 3) for v in profile.mean(axis=0)],
+        "regions": regions,
+        "pairs": pairs,
+    }
+
+
+def export_report(report, directory=REPORTS_DIR):
+    """Writes <directory>/alerts-<from>-<to>.json and .csv (one row per region); returns both paths."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"alerts-{report['from']}-{report['to']}")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(base + ".csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["region", "alerts", "minutes", "share"] + [f"h{h:02d}" for h in range(24)])
+        for r in report["regions"]:
+            writer.writerow([r["region"], r["alerts"], r["minutes"], r["share"]] + r["hours"])
+    return base + ".json", base + ".csv"
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from service.log_service import get_logger
+
+STATES_DIR = "alert_states"
+# A keyframe (full set of alerting names) after this many deltas, so a seek
+# applies at most this many changes
+KEYFRAME_EVERY = 32
+
+
+class StateTrack:
+    """Alert states over a time window: keyframes plus the deltas between them."""
+
+    def __init__(self, entries):
+        # entries: (t, keyframe or None, added, removed), in time order
+        self.times = [e[0] for e in entries]
+        self._entries = entries
+        self._keyframes = [i for i, e in enumerate(entries) if e[1] is not None]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def seek(self, t):
+        """Names under alert at time t (empty before the first recorded state)."""
+        i = bisect_right(self.times, t) - 1
+        if i < 0:
+            return frozenset()
+        k = bisect_right(self._keyframes, i) - 1
+        if k < 0:
+            return frozenset()
+        start = self._keyframes[k]
+        state = set(self._entries[start][1])
+        for _, _, added, removed in self._entries[start + 1:i + 1]:
+            state.difference_update(removed)
+            state.update(added)
+        return frozenset(state)
+
+
+class AlertStateLog:
+    """Alert-state changes per poll as JSONL per local day: keyframes + deltas.
+
+    Unchanged polls write nothing; every file starts with a keyframe, so a day
+    can be read on its own.
+    """
+
+    def __init__(self, path=STATES_DIR):
+        self.path = path
+        self.logger = get_logger("Analytics")
+        self._state = None
+        self._day = None
+        self._since_keyframe = 0
+        self._lock = threading.Lock()
+
+    def _file(self, day):
+        return os.path.join(self.path, f"{day.isoformat()}.jsonl")
+
+    def record(self, states, now=None):
+        now = time.time() if now is None else now
+        active = frozenset(name for name, data in states.items() if data.get("alertnow"))
+        day = datetime.fromtimestamp(now).date()
+        with self._lock:
+            if active == self._state and day == self._day:
+                return
+            if self._state is None or day != self._day or self._since_keyframe >= KEYFRAME_EVERY:
+                entry = {"t": now, "k": sorted(active)}
+                self._since_keyframe = 0
+            else:
+                entry = {"t": now, "a": sorted(active - self._state), "r": sorted(self._state - active)}
+                self._since_keyframe += 1
+            self._state = active
+            self._day = day
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._file(day), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            self.logger.error(f"Error saving alert state: {e}")
+
+    def _read_day(self, day):
+        entries = []
+        path = self._file(day)
+        if not os.path.exists(path):
+            return entries
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                keyframe = item.get("k")
+                entries.append((
+                    item["t"],
+                    frozenset(keyframe) if keyframe is not None else None,
+                    frozenset(item.get("a", ())),
+                    frozenset(item.get("r", ())),
+                ))
+        return entries
+
+    def track(self, start, end):
+        """StateTrack for [start, end] (epoch seconds); blocking file reads."""
+        first = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(end).date()
+        entries = []
+        day = first
+        while day <= last:
+            entries.extend(e for e in self._read_day(day) if e[0] <= end)
+            day += timedelta(days=1)
+        return StateTrack(entries)
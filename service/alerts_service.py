@@ -1,30 +1,39 @@
 import requests
 import asyncio
+import logging
 import time
+from service.health_service import FAIL, OK, WARN
+from service.log_service import get_logger
+from service.metrics import Trace
+from service.periodic import get_periodic
 
 URL = "https://ubilling.net.ua/aerialalerts/"
+# Poll every 15 seconds to avoid rate limits
+POLL_INTERVAL = 15
 
 class AlertsService:
-    def __init__(self, on_update, logger=None):
+    def __init__(self, on_update):
         self.on_update = on_update
-        self.logger = logger
+        self.logger = get_logger("Alerts")
         self.running = False
         self._last_states = {}
+        # monotonic time of the last successful poll (health probes)
+        self.last_success = None
+        self.job = None
 
-    def log(self, msg):
-        if self.logger:
-            self.logger(f"[Alerts] {msg}")
-        else:
-            print(f"[Alerts] {msg}")
+    def log(self, msg, level=logging.INFO, **fields):
+        self.logger.log(level, msg, extra={"fields": fields})
 
-    async def start_polling(self):
+    def start_polling(self, scheduler=None):
+        # Fixed-rate job: request duration does not stretch the interval. Not
+        # pausable: region states, the timeline and the state log need every
+        # poll; hidden windows skip only the render (IngestionHub.set_visible)
         self.running = True
         self.log("Started polling for alerts...")
-        while self.running:
-            await self.fetch_alerts()
-            
-            # Poll every 15 seconds to avoid rate limits
-            await asyncio.sleep(15)
+        self.job = (scheduler or get_periodic()).add(
+            "alerts.poll", self.fetch_alerts, POLL_INTERVAL, jitter=0.05, pausable=False
+        )
+        return self.job
 
     async def force_refresh(self):
         self.log("Примусове оновлення тривог...")
@@ -32,19 +41,44 @@ class AlertsService:
 
     async def fetch_alerts(self):
         try:
+            # Latency is measured from the request start to the rendered map frame
+            trace = Trace("alerts")
             # Run blocking request in executor
-            response = await asyncio.to_thread(requests.get, URL)
+            with trace.span("http"):
+                response = await asyncio.to_thread(requests.get, URL, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                with trace.span("parse"):
+                    data = response.json()
                 states = data.get("states", {})
-                self.on_update(states)
+                self.last_success = time.monotonic()
+                self.on_update(states, trace=trace)
                 self.log("Дані тривог успішно оновлено.")
             elif response.status_code == 429:
-                self.log(f"Rate limit hit (429).")
+                self.log("Rate limit hit (429).", logging.WARNING)
             else:
-                self.log(f"Error fetching alerts: {response.status_code}")
+                self.log(f"Error fetching alerts: {response.status_code}", logging.ERROR, status_code=response.status_code)
         except Exception as e:
-            self.log(f"Exception fetching alerts: {e}")
+            self.log(f"Exception fetching alerts: {e}", logging.ERROR)
+
+    # --- Health probes (see service.health_service.HealthCheck) ---
+
+    async def probe_endpoint(self):
+        # Real request - not run periodically because of the endpoint rate limit
+        before = self.last_success
+        start = time.perf_counter()
+        await self.fetch_alerts()
+        ms = (time.perf_counter() - start) * 1000
+        if self.last_success == before:
+            return FAIL, f"запит не вдався ({ms:.0f} мс)"
+        return f"відповідь за {ms:.0f} мс"
+
+    async def probe_freshness(self, max_age=60):
+        if self.last_success is None:
+            return WARN, "ще немає даних"
+        age = time.monotonic() - self.last_success
+        return (OK if age < max_age else WARN), f"останнє оновлення {age:.0f} с тому"
 
     def stop(self):
         self.running = False
+        if self.job:
+            self.job.cancel()
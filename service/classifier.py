@@ -0,0 +1,147 @@
+# Card classification (title + color) shared by the Flet UI and the headless daemon.
+# Colors are Flet color names as plain strings so this module does not import flet.
+from collections import namedtuple
+
+RED_700 = "red700"
+ORANGE_700 = "orange700"
+YELLOW_700 = "yellow700"
+GREEN_700 = "green700"
+BLUE_GREY_700 = "bluegrey700"
+GREY_700 = "grey700"
+
+Classification = namedtuple("Classification", ["title", "bg_color", "priority"])
+
+LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+ANY = "*"
+
+# (status, level, region_match) -> (title, color, priority); first matching row wins.
+# Red card IF: (region match AND level != LOW) OR level == CRITICAL.
+RULES = [
+    ("ignore", ANY, ANY, "IGNORED", GREY_700, 0),
+    (ANY, "CRITICAL", ANY, "ВЕЛИКА НЕБЕЗПЕКА", RED_700, 5),
+    (ANY, "LOW", ANY, "ІНФОРМАЦІЯ", GREEN_700, 1),
+    (ANY, ANY, True, "ВЕЛИКА НЕБЕЗПЕКА", RED_700, 5),
+    (ANY, "MEDIUM", False, "УВАГА", YELLOW_700, 2),
+    (ANY, "HIGH", False, "НЕБЕЗПЕКА", ORANGE_700, 3),
+    (ANY, ANY, False, "ПОВІДОМЛЕННЯ", BLUE_GREY_700, 1),
+]
+
+
+# A post about a region that is under an air-raid alert right now is raised one level
+ESCALATION = {"MEDIUM": "HIGH"}
+
+
+def _compile(rules):
+    # Expanded once into a dict over every (ignored, level, match) combination;
+    # unknown levels share the ANY entry
+    table = {}
+    for ignored in (True, False):
+        status = "ignore" if ignored else "normal"
+        for level in LEVELS + (ANY,):
+            for match in (True, False):
+                for rule_status, rule_level, rule_match, title, color, priority in rules:
+                    if rule_status not in (ANY, status):
+                        continue
+                    if rule_level not in (ANY, level):
+                        continue
+                    if rule_match not in (ANY, match):
+                        continue
+                    table[(ignored, level, match)] = Classification(title, color, priority)
+                    break
+    return table
+
+
+_TABLE = _compile(RULES)
+
+
+def lookup(level, status, region_match):
+    if level not in LEVELS:
+        level = ANY
+    return _TABLE[(status == "ignore", level, region_match)]
+
+
+def message_regions(regions):
+    """Normalizes the parsed `regions` field to a tuple of names."""
+    # Check if regions is a list or string, theoretically list per new JSON
+    if isinstance(regions, list):
+        return tuple(regions)
+    if isinstance(regions, str) and regions and regions != "none":
+        return (regions,)
+    return ()
+
+
+def is_region_match(user_region, regions):
+    if not user_region:
+        return False
+    return user_region in message_regions(regions)
+
+
+def classify(level, regions, status, user_region=None):
+    """Returns (title, bg_color) for a parsed message."""
+    result = lookup(level, status, is_region_match(user_region, regions))
+    return result.title, result.bg_color
+
+
+def effective_level(level, status, under_alert=False):
+    """The level after escalation for an ongoing alert (what records store)."""
+    if under_alert and status != "ignore":
+        return ESCALATION.get(level, level)
+    return level
+
+
+def record_view(record, user_region):
+    """A stored NewsRecord as a session with `user_region` sees it.
+
+    History keeps the default classification; the region match is applied per
+    session. Records without a level (older history) are shown as stored.
+    """
+    if record.level is None:
+        return record
+    title, bg_color = classify(record.level, record.regions, record.status, user_region)
+    if title == record.title and bg_color == record.bg_color:
+        return record
+    return record.view(title, bg_color)
+
+
+class RegionIndex:
+    """Subscribers indexed by their region.
+
+    A message is classified twice at most (region match / no match) and the
+    matching subscribers are found by region lookup, so the cost per message
+    does not grow with a per-user rule evaluation.
+    """
+
+    def __init__(self):
+        self._by_region = {}
+        self._regions = {}
+
+    def set_region(self, subscriber, region):
+        old = self._regions.pop(subscriber, None)
+        if old is not None:
+            members = self._by_region.get(old)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self._by_region[old]
+        if region:
+            self._regions[subscriber] = region
+            self._by_region.setdefault(region, set()).add(subscriber)
+
+    def remove(self, subscriber):
+        self.set_region(subscriber, None)
+
+    def matching(self, regions):
+        """Subscribers whose region is one of the message regions."""
+        matched = set()
+        for region in message_regions(regions):
+            members = self._by_region.get(region)
+            if members:
+                matched.update(members)
+        return matched
+
+    def dispatch(self, level, regions, status, under_alert=False):
+        """Returns (default, matched, matched_result): everyone not in `matched` gets `default`."""
+        level = effective_level(level, status, under_alert)
+        default = lookup(level, status, False)
+        matched = self.matching(regions)
+        return default, matched, lookup(level, status, True) if matched else default
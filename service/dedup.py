@@ -0,0 +1,120 @@
+import hashlib
+import re
+import time
+from collections import deque
+from functools import lru_cache
+
+# 64-bit SimHash split into 4 bands of 16 bits: two fingerprints within
+# Hamming distance 3 always agree on at least one whole band (pigeonhole),
+# so a band lookup finds every candidate without scanning the window.
+FINGERPRINT_BITS = 64
+BANDS = 4
+MAX_DISTANCE = 3
+WINDOW = 3 * 60 * 60  # seconds
+
+_BAND_BITS = FINGERPRINT_BITS // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _features(text):
+    # Character trigrams of the normalized text: punctuation, case and word
+    # endings barely move the fingerprint, a different event moves ~half the bits
+    normalized = " ".join(_TOKEN_RE.findall(text.lower()))
+    if len(normalized) <= 3:
+        return [normalized] if normalized else []
+    return [normalized[i:i + 3] for i in range(len(normalized) - 2)]
+
+
+@lru_cache(maxsize=65536)
+def _feature_bits(feature):
+    # The trigram vocabulary is small, so hashes are mostly cache hits
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return format(int.from_bytes(digest, "big"), "064b")
+
+
+def simhash(text):
+    features = _features(text)
+    if not features:
+        return 0
+    bits = [_feature_bits(f) for f in features]
+    # Majority vote per bit position (column-wise over the bit strings)
+    half = len(bits) / 2
+    fingerprint = 0
+    for column in zip(*bits):
+        fingerprint = (fingerprint << 1) | (column.count("1") > half)
+    return fingerprint
+
+
+def _bands(fingerprint):
+    return [(i, (fingerprint >> (i * _BAND_BITS)) & _BAND_MASK) for i in range(BANDS)]
+
+
+class Cluster:
+    """A group of near-identical posts; `key` is whatever identified the first one."""
+
+    __slots__ = ("key", "fingerprint", "scope", "sources", "first_seen")
+
+    def __init__(self, key, fingerprint, seen, scope=None):
+        self.key = key
+        self.fingerprint = fingerprint
+        # Posts only fold into a cluster with the same scope (e.g. regions/level/status)
+        self.scope = scope
+        self.sources = 1
+        self.first_seen = seen
+
+
+class NearDuplicateIndex:
+    """Banded LSH index of SimHash fingerprints over a sliding time window."""
+
+    def __init__(self, window=WINDOW, max_distance=MAX_DISTANCE):
+        self.window = window
+        self.max_distance = max_distance
+        self._buckets = {}
+        # Clusters in insertion order; they expire `window` seconds after the first post
+        self._clusters = deque()
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def _expire(self, now):
+        while self._clusters and self._clusters[0].first_seen < now - self.window:
+            cluster = self._clusters.popleft()
+            for band in _bands(cluster.fingerprint):
+                bucket = self._buckets.get(band)
+                if bucket is not None:
+                    bucket.remove(cluster)
+                    if not bucket:
+                        del self._buckets[band]
+
+    def find(self, fingerprint, scope=None):
+        for band in _bands(fingerprint):
+            for cluster in self._buckets.get(band, ()):
+                if cluster.scope != scope:
+                    continue
+                if bin(cluster.fingerprint ^ fingerprint).count("1") <= self.max_distance:
+                    return cluster
+        return None
+
+    def add(self, key, text, now=None, scope=None):
+        """Returns (cluster, is_duplicate). Duplicates bump the cluster's source count.
+
+        Texts a few bits apart can still differ in what matters (an alert
+        template where only the region changes), so a post is folded only into
+        a cluster with an equal `scope`.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+
+        fingerprint = simhash(text)
+        cluster = self.find(fingerprint, scope) if fingerprint else None
+        if cluster is not None:
+            cluster.sources += 1
+            return cluster, True
+
+        cluster = Cluster(key, fingerprint, now, scope)
+        if fingerprint:
+            for band in _bands(fingerprint):
+                self._buckets.setdefault(band, []).append(cluster)
+            self._clusters.append(cluster)
+        return cluster, False
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from collections import namedtuple
+
+from service.log_service import get_logger
+from service.metrics import METRICS
+from service.periodic import get_periodic
+
+ProbeResult = namedtuple("ProbeResult", ["name", "status", "duration_ms", "detail"])
+
+OK = "ok"
+WARN = "warn"
+FAIL = "fail"
+TIMEOUT = "timeout"
+
+Probe = namedtuple("Probe", ["name", "check", "timeout", "periodic"])
+
+
+class HealthCheck:
+    """Registered async probes, run concurrently with a timeout each.
+
+    A probe is an async callable returning a detail string (status OK) or a
+    (status, detail) tuple. Exceptions count as FAIL, timeouts as TIMEOUT.
+    Probes registered with periodic=False (e.g. ones that hit a rate-limited
+    endpoint) only run on demand, not in the background loop.
+    """
+
+    def __init__(self):
+        self.logger = get_logger("Health")
+        self._probes = {}
+        self.last_report = []
+        self.job = None
+
+    def register(self, name, check, timeout=5.0, periodic=True):
+        self._probes[name] = Probe(name, check, timeout, periodic)
+
+    async def _run_probe(self, probe):
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe.check(), probe.timeout)
+            if isinstance(result, tuple):
+                status, detail = result
+            else:
+                status, detail = OK, result
+        except asyncio.TimeoutError:
+            status, detail = TIMEOUT, f"no answer in {probe.timeout:g}s"
+        except Exception as e:
+            status, detail = FAIL, str(e) or type(e).__name__
+        duration_ms = (time.perf_counter() - start) * 1000
+        METRICS.record(f"health.{probe.name}", duration_ms)
+        return ProbeResult(probe.name, status, duration_ms, detail)
+
+    async def run(self, periodic_only=False):
+        probes = [p for p in self._probes.values() if p.periodic or not periodic_only]
+        report = await asyncio.gather(*(self._run_probe(p) for p in probes))
+        self.last_report = list(report)
+        return self.last_report
+
+    def run_periodically(self, interval=300, scheduler=None):
+        """Background checks: only cheap (periodic) probes, problems logged as warnings."""
+        self.job = (scheduler or get_periodic()).add("health", self._run_background, interval, first_delay=interval)
+        return self.job
+
+    async def _run_background(self):
+        report = await self.run(periodic_only=True)
+        for result in report:
+            level = logging.DEBUG if result.status == OK else logging.WARNING
+            self.logger.log(level, format_result(result), extra={"fields": result._asdict()})
+
+    def stop(self):
+        if self.job:
+            self.job.cancel()
+
+
+def format_result(result):
+    return f"[{result.status.upper()}] {result.name}: {result.detail} ({result.duration_ms:.0f} мс)"
+
+
+async def probe_loop_lag(interval=0.05, warn_ms=100):
+    """How late the event loop wakes up a short sleep."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.sleep(interval)
+    lag_ms = max(0.0, (loop.time() - start - interval) * 1000)
+    return (OK if lag_ms < warn_ms else WARN), f"затримка циклу {lag_ms:.1f} мс"
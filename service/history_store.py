@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+from service.log_service import get_logger
+
+HISTORY_FILE = "history.jsonl"
+LEGACY_HISTORY_FILE = "history.json"
+
+
+class NewsRecord:
+    """Compact in-memory news record. The heavy original text stays on disk."""
+
+    __slots__ = ("id", "title", "text", "footer", "time", "bg_color", "regions", "status", "level", "offset", "sources", "alert_minutes", "_original_text")
+
+    def __init__(self, title, text, footer, time, bg_color, regions=None, status="normal", id=None, offset=None, original_text=None, level=None):
+        self.id = id
+        self.title = title
+        self.text = text
+        self.footer = footer
+        self.time = time
+        self.bg_color = bg_color
+        self.regions = regions
+        self.status = status
+        # Threat level the title/color were derived from; lets each session
+        # reclassify for its own region (None for records saved before it was kept)
+        self.level = level
+        # Byte offset of the record line in the history file (None = not persisted)
+        self.offset = offset
+        # Number of channel posts folded into this record (near-duplicates, in memory only)
+        self.sources = 1
+        # Minutes the (longest) air-raid alert in the record regions had lasted when it arrived
+        self.alert_minutes = None
+        # Only kept for records that were never written to the history file
+        self._original_text = original_text if offset is None else None
+
+    def view(self, title, bg_color, original_text=None):
+        """Copy with another title/color sharing id, offset and in-memory annotations."""
+        view = NewsRecord(title, self.text, self.footer, self.time, bg_color, regions=self.regions, status=self.status,
+                          id=self.id, offset=self.offset, original_text=original_text, level=self.level)
+        view.sources = self.sources
+        view.alert_minutes = self.alert_minutes
+        return view
+
+    def to_dict(self, original_text=None):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "text": self.text,
+            "footer": self.footer,
+            "time": self.time,
+            "bg_color": self.bg_color,
+            "original_text": original_text,
+            "regions": self.regions,
+            "status": self.status,
+            "level": self.level,
+        }
+
+
+class HistoryStore:
+    """Append-only JSONL history (oldest first on disk, newest first in memory)."""
+
+    def __init__(self, path=HISTORY_FILE, legacy_path=LEGACY_HISTORY_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.logger = get_logger("History")
+        self._next_id = 1
+        # verify() state: (offset, valid, bad) up to the last complete line checked
+        self._verified = (0, 0, 0)
+        self._verify_lock = threading.Lock()
+
+    def log(self, msg, level=logging.INFO, **fields):
+        self.logger.log(level, msg, extra={"fields": fields})
+
+    @staticmethod
+    def _record_from_item(item, offset=None):
+        return NewsRecord(
+            item.get("title"),
+            item.get("text"),
+            item.get("footer"),
+            item.get("time"),
+            item.get("bg_color"),
+            regions=item.get("regions"),
+            status=item.get("status", "normal"),
+            id=item.get("id"),
+            offset=offset,
+            original_text=item.get("original_text"),
+            level=item.get("level"),
+        )
+
+    def _migrate_legacy(self):
+        # One-time conversion of the old history.json array (newest first)
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            with open(self.path, "w", encoding="utf-8") as f:
+                for i, item in enumerate(reversed(legacy), start=1):
+                    item["id"] = i
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            self.log(f"Migrated {len(legacy)} history items to {self.path}")
+        except Exception as e:
+            self.log(f"Error migrating history: {e}", logging.ERROR)
+
+    def load(self):
+        """Returns records newest first, without original texts in memory."""
+        self._migrate_legacy()
+        records = []
+        if not os.path.exists(self.path):
+            return records
+
+        try:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Torn last line after a crash - skip it
+                            offset += len(line)
+                            continue
+                        record = self._record_from_item(item, offset=offset)
+                        if record.id is None:
+                            record.id = self._next_id
+                        self._next_id = max(self._next_id, record.id + 1)
+                        records.append(record)
+                    offset += len(line)
+        except Exception as e:
+            self.log(f"Error loading history: {e}", logging.ERROR)
+
+        records.reverse()
+        return records
+
+    def append(self, record, original_text=None):
+        """Persists a record and returns it with its id/offset assigned."""
+        record.id = self._next_id
+        self._next_id += 1
+        line = (json.dumps(record.to_dict(original_text), ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            with open(self.path, "ab") as f:
+                record.offset = f.tell()
+                f.write(line)
+            record._original_text = None
+        except Exception as e:
+            record._original_text = original_text
+            self.log(f"Error saving history: {e}", logging.ERROR)
+        return record
+
+    def append_many(self, pairs):
+        """append() for [(record, original_text)] with one file open and write."""
+        lines = []
+        for record, original_text in pairs:
+            record.id = self._next_id
+            self._next_id += 1
+            lines.append((json.dumps(record.to_dict(original_text), ensure_ascii=False) + "\n").encode("utf-8"))
+        try:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                for (record, _), line in zip(pairs, lines):
+                    record.offset = offset
+                    record._original_text = None
+                    offset += len(line)
+                f.write(b"".join(lines))
+        except Exception as e:
+            for record, original_text in pairs:
+                record.offset = None
+                record._original_text = original_text
+            self.log(f"Error saving history: {e}", logging.ERROR)
+        return [record for record, _ in pairs]
+
+    def get_original_text(self, record):
+        if record.offset is None:
+            return record._original_text
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(record.offset)
+                return json.loads(f.readline()).get("original_text")
+        except Exception as e:
+            self.log(f"Error reading history item {record.id}: {e}", logging.ERROR, record_id=record.id)
+            return None
+
+    def verify(self):
+        """Returns (valid_records, bad_lines) for the history file. Blocking.
+
+        Incremental: the file is append-only, so only lines added since the
+        last call are parsed (a shorter file means it was cleared or replaced).
+        """
+        with self._verify_lock:
+            if not os.path.exists(self.path):
+                self._verified = (0, 0, 0)
+                return 0, 0
+            offset, valid, bad = self._verified
+            if os.path.getsize(self.path) < offset:
+                offset, valid, bad = 0, 0, 0
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Still being written; checked once complete
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        json.loads(line)
+                        valid += 1
+                    except json.JSONDecodeError:
+                        bad += 1
+            self._verified = (offset, valid, bad)
+            return valid, bad
+
+    def clear(self):
+        # Ids keep increasing: cards and reposts from before the clear still refer to the old ones
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        with self._verify_lock:
+            self._verified = (0, 0, 0)
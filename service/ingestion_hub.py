@@ -0,0 +1,290 @@
+import asyncio
+from collections import OrderedDict, namedtuple
+from time import perf_counter
+
+from service.alert_playback import AlertStateLog
+from service.classifier import RegionIndex, effective_level, record_view
+from service.health_service import FAIL, WARN, HealthCheck, probe_loop_lag
+from service.history_store import HistoryStore, NewsRecord
+from service.log_service import get_logger
+from service.periodic import get_periodic
+from service.region_state import RegionStateCache, alert_minutes
+
+# Telegram message id -> record, for folding near-duplicates into their card
+RECENT_MESSAGES = 10000
+
+# One parsed Telegram post, as delivered to every subscribed session
+NewsItem = namedtuple("NewsItem", ["summary", "original_text", "level", "regions", "time", "footer", "status", "record", "trace"])
+
+
+class Subscription:
+    def __init__(self, on_news=None, on_alerts=None, region=None, on_duplicate=None, on_news_batch=None):
+        self.on_news = on_news
+        # [(item, classification)] oldest first; sessions without it get on_news per item
+        self.on_news_batch = on_news_batch
+        self.on_alerts = on_alerts
+        self.on_duplicate = on_duplicate
+        self.region = region
+
+
+class IngestionHub:
+    """Process-wide owner of the Telegram client, the alerts poller and the history store.
+
+    In Flet web mode every browser session runs main(page); sessions subscribe
+    here instead of starting their own services, so there is exactly one
+    client on the session file and one poller however many viewers there are.
+    Late joiners get a snapshot (history records + last alert states).
+    """
+
+    def __init__(self, history=None):
+        self.logger = get_logger("Hub")
+        self.history = history or HistoryStore()
+        # Newest first; shared by all sessions as the history snapshot
+        self.records = []
+        self.alert_states = None
+        # canonical region -> current alert state, for correlating news with alerts
+        self.region_states = RegionStateCache()
+        self.telegram_service = None
+        self.alerts_service = None
+        # service.alert_analytics.AlertTimeline once services run (numpy imported there)
+        self.timeline = None
+        # Keyframes + deltas of the alerting names, for the map time-travel scrubber
+        self.state_log = AlertStateLog()
+        self.health = HealthCheck()
+        self.health.register("telegram_auth", self._probe_not_started)
+        self.health.register("alerts_endpoint", self._probe_not_started)
+        self.health.register("event_loop", probe_loop_lag, timeout=2)
+        self.health.register("history_store", self._probe_history)
+        self._subscriptions = []
+        # Subscriptions whose window is hidden: no map renders for them, and
+        # pausable periodic jobs (health) pause when all are
+        self._hidden = set()
+        # region -> subscriptions, for the per-user "ВЕЛИКА НЕБЕЗПЕКА" treatment
+        self.regions = RegionIndex()
+        self._recent = OrderedDict()
+        self._history_ready = False
+        # (handler, args) received before the history was loaded
+        self._pending_news = []
+        self._tasks = []
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self, with_services=True):
+        """Idempotent: the first session starts everything, later ones only wait for history."""
+        async with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+
+            if with_services:
+                self._start_services()
+
+            # Telethon login runs concurrently; posts arriving meanwhile are queued
+            self.records = await asyncio.to_thread(self.history.load)
+            self._history_ready = True
+            for handler, args in self._pending_news:
+                handler(*args)
+            self._pending_news.clear()
+
+    def _start_services(self):
+        # Heavy imports (telethon, requests) only when services actually start
+        from service.alert_analytics import AlertTimeline
+        from service.alerts_service import AlertsService
+        from service.telegram_service import TelegramService
+
+        self.telegram_service = TelegramService(self._on_telegram_message, self._on_duplicate, batch_callback=self._on_telegram_batch)
+        self.alerts_service = AlertsService(self._on_alerts_update)
+        self._tasks.append(asyncio.create_task(self.telegram_service.start()))
+        self.alerts_service.start_polling()
+        self.timeline = AlertTimeline()
+        self.timeline.schedule_flush()
+
+        health = self.health
+        health.register("telegram_auth", self.telegram_service.probe_auth)
+        health.register("telegram_channel", self.telegram_service.probe_channel)
+        health.register("telegram_gap", self.telegram_service.probe_gap)
+        # The endpoint is rate limited: real requests only on demand, freshness in the background
+        health.register("alerts_endpoint", self.alerts_service.probe_endpoint, timeout=12, periodic=False)
+        health.register("alerts_freshness", self.alerts_service.probe_freshness)
+        health.run_periodically()
+
+    @staticmethod
+    async def _probe_not_started():
+        return FAIL, "НЕ ЗАПУЩЕНО"
+
+    async def _probe_history(self):
+        valid, bad = await asyncio.to_thread(self.history.verify)
+        if bad:
+            return WARN, f"{valid} записів, {bad} пошкоджених рядків"
+        return f"{valid} записів"
+
+    def subscribe(self, on_news=None, on_alerts=None, region=None, on_duplicate=None, on_news_batch=None):
+        """Returns (subscription, history_records, alert_states) taken atomically."""
+        subscription = Subscription(on_news, on_alerts, region, on_duplicate, on_news_batch)
+        self._subscriptions.append(subscription)
+        self.regions.set_region(subscription, region)
+        self.logger.info(f"Session subscribed ({len(self._subscriptions)} active)")
+        # The shared records carry the default classification; this session's region match is applied here
+        return subscription, [record_view(r, region) for r in self.records], self.alert_states
+
+    def unsubscribe(self, subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            self.regions.remove(subscription)
+            self._hidden.discard(subscription)
+            self._update_visibility()
+            self.logger.info(f"Session unsubscribed ({len(self._subscriptions)} active)")
+
+    def set_visible(self, subscription, visible):
+        """Window shown/hidden; call on the event loop.
+
+        Alerts keep polling either way (region states, the timeline and the
+        state log need every poll); a hidden session only skips the map render
+        and gets the latest states when it is shown again.
+        """
+        if visible:
+            was_hidden = subscription in self._hidden
+            self._hidden.discard(subscription)
+            if was_hidden and subscription.on_alerts and self.alert_states is not None:
+                try:
+                    subscription.on_alerts(self.alert_states, None)
+                except Exception as e:
+                    self.logger.error(f"Session alerts callback failed: {e}")
+        elif subscription in self._subscriptions:
+            self._hidden.add(subscription)
+        self._update_visibility()
+
+    def _update_visibility(self):
+        periodic = get_periodic()
+        if self._subscriptions and len(self._hidden) == len(self._subscriptions):
+            periodic.pause()
+        else:
+            periodic.resume()
+
+    def set_region(self, subscription, region):
+        subscription.region = region
+        if subscription in self._subscriptions:
+            self.regions.set_region(subscription, region)
+
+    def _on_telegram_message(self, summary, original_text, level, regions, time, footer, status="normal", trace=None, message_id=None):
+        args = (summary, original_text, level, regions, time, footer, status, trace, message_id)
+        if not self._history_ready:
+            self._pending_news.append((self._publish_news, args))
+            return
+        self._publish_news(*args)
+
+    def _on_duplicate(self, message_id, sources):
+        if not self._history_ready:
+            self._pending_news.append((self._publish_duplicate, (message_id, sources)))
+            return
+        self._publish_duplicate(message_id, sources)
+
+    def _publish_duplicate(self, message_id, sources):
+        record = self._recent.get(message_id)
+        if record is None:
+            return
+        record.sources = sources
+        for subscription in list(self._subscriptions):
+            if subscription.on_duplicate:
+                try:
+                    subscription.on_duplicate(record)
+                except Exception as e:
+                    self.logger.error(f"Session duplicate callback failed: {e}")
+
+    def _on_telegram_batch(self, posts):
+        if not self._history_ready:
+            self._pending_news.append((self._publish_batch, (posts,)))
+            return
+        self._publish_batch(posts)
+
+    def _publish_news(self, summary, original_text, level, regions, time, footer, status, trace, message_id):
+        item, default, matched, matched_result = self._build_item(summary, original_text, level, regions, time, footer, status, trace)
+        if trace:
+            with trace.span("history_write"):
+                self.history.append(item.record, original_text)
+        else:
+            self.history.append(item.record, original_text)
+        self._add_record(item.record, message_id)
+
+        for subscription in list(self._subscriptions):
+            if subscription.on_news:
+                try:
+                    subscription.on_news(item, matched_result if subscription in matched else default)
+                except Exception as e:
+                    self.logger.error(f"Session news callback failed: {e}")
+
+    def _publish_batch(self, posts):
+        """First-run prefetch: one history write and one callback per session for all posts (oldest first)."""
+        built = [self._build_item(*post[:7], None) for post in posts]
+        self.history.append_many([(item.record, item.original_text) for item, *_ in built])
+        for (item, *_), post in zip(built, posts):
+            self._add_record(item.record, post[7])
+
+        for subscription in list(self._subscriptions):
+            entries = [(item, matched_result if subscription in matched else default)
+                       for item, default, matched, matched_result in built]
+            try:
+                if subscription.on_news_batch:
+                    subscription.on_news_batch(entries)
+                elif subscription.on_news:
+                    for item, result in entries:
+                        subscription.on_news(item, result)
+            except Exception as e:
+                self.logger.error(f"Session news callback failed: {e}")
+
+    def _build_item(self, summary, original_text, level, regions, time, footer, status, trace):
+        # Classified once per outcome: subscribers in the message regions get the
+        # region-match result, everyone else (and the history file) the default
+        classify_start = perf_counter()
+        alert = self.region_states.longest_alert(regions)
+        default, matched, matched_result = self.regions.dispatch(level, regions, status, under_alert=alert is not None)
+        if trace:
+            trace.mark("classify", since=classify_start)
+        record = NewsRecord(default.title, summary, footer, time, default.bg_color, regions=regions, status=status,
+                            level=effective_level(level, status, alert is not None))
+        if alert:
+            record.alert_minutes = alert_minutes(alert)
+        item = NewsItem(summary, original_text, level, regions, time, footer, status, record, trace)
+        return item, default, matched, matched_result
+
+    def clear_history(self):
+        """Empties the history file and everything that refers to its records."""
+        self.records.clear()
+        # Reposts of cleared posts must not fold into (or be counted on) anything
+        self._recent.clear()
+        try:
+            self.history.clear()
+            self.logger.info("History cleared.")
+        except Exception as e:
+            self.logger.error(f"Error clearing history file: {e}")
+
+    def _add_record(self, record, message_id):
+        self.records.insert(0, record)
+        if message_id is not None:
+            self._recent[message_id] = record
+            if len(self._recent) > RECENT_MESSAGES:
+                self._recent.popitem(last=False)
+
+    def _on_alerts_update(self, states, trace=None):
+        self.alert_states = states
+        self.region_states.update(states)
+        if self.timeline:
+            self.timeline.record(states)
+        self.state_log.record(states)
+        for subscription in list(self._subscriptions):
+            if subscription.on_alerts and subscription not in self._hidden:
+                try:
+                    subscription.on_alerts(states, trace)
+                except Exception as e:
+                    self.logger.error(f"Session alerts callback failed: {e}")
+
+
+_hub = None
+
+
+def get_hub():
+    """The process-wide hub (created on first use)."""
+    global _hub
+    if _hub is None:
+        _hub = IngestionHub()
+    return _hub
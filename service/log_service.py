@@ -0,0 +1,120 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+LOG_DIR = "logs"
+LOG_FILE = "varta.jsonl"
+ROOT_LOGGER = "varta"
+
+_listener = None
+_sinks = []
+_sinks_lock = threading.Lock()
+_setup_lock = threading.Lock()
+
+
+class _ContextFilter(logging.Filter):
+    """Stamps records on the calling thread: monotonic time, source and fields."""
+
+    def filter(self, record):
+        record.mono = time.monotonic()
+        if not hasattr(record, "source"):
+            record.source = record.name.rsplit(".", 1)[-1]
+        if not hasattr(record, "fields"):
+            record.fields = {}
+        return True
+
+
+class JsonlFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "wall": record.created,
+            "mono": getattr(record, "mono", None),
+            "level": record.levelname,
+            "source": getattr(record, "source", record.name),
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry["fields"] = fields
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _SinkHandler(logging.Handler):
+    """Fans records out to in-process sinks (e.g. the developer console)."""
+
+    def emit(self, record):
+        with _sinks_lock:
+            sinks = list(_sinks)
+        for sink in sinks:
+            try:
+                sink(record)
+            except Exception:
+                self.handleError(record)
+
+
+def setup_logging(log_dir=LOG_DIR, max_bytes=1_000_000, backup_count=5, level=logging.DEBUG):
+    """Idempotent. Callers only enqueue records; file I/O happens on the listener thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, LOG_FILE),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonlFormatter())
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, _SinkHandler(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Flushes the queue and stops the listener thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(source):
+    """Logger for a component, e.g. get_logger("Telegram").
+
+    Structured fields go in `extra`: log.info("msg", extra={"fields": {"id": 1}})
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{source}")
+
+
+def add_sink(sink):
+    """Registers `sink(record)`; called on the listener thread, never on the event loop."""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+from service.log_service import get_logger
+from service.metrics import METRICS
+
+logger = get_logger("Loop")
+
+# Heartbeat period on the loop and the lag that counts as a stall
+INTERVAL = 0.1
+THRESHOLD = 0.25
+STACK_DEPTH = 12
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StallSite:
+    __slots__ = ("site", "count", "total_ms", "max_ms", "stack")
+
+    def __init__(self, site, stack):
+        self.site = site
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.stack = stack
+
+
+def _call_site(stack):
+    # The innermost frame in our own code is the one to fix; library frames
+    # (json, ElementTree, flet) only say how it blocks
+    for frame in reversed(stack):
+        if frame.filename.startswith(_PROJECT_DIR) and "site-packages" not in frame.filename:
+            return f"{os.path.relpath(frame.filename, _PROJECT_DIR)}:{frame.lineno} {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return "unknown"
+
+
+class LoopWatchdog:
+    """Continuous event-loop lag measurement with blocking call-site capture.
+
+    A heartbeat task wakes every `interval`; a daemon thread notices when it
+    is late by more than `threshold` and grabs the loop thread's stack while
+    it is still blocked. The stall is attributed to that call site once the
+    heartbeat runs again. Cost when healthy: one short sleep on the loop and
+    one thread wake-up per interval.
+    """
+
+    def __init__(self, interval=INTERVAL, threshold=THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.sites = {}
+        self._lock = threading.Lock()
+        self._beat = None
+        self._loop_thread_id = None
+        self._captured = None
+        self._running = False
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        """Starts on the running loop; idempotent."""
+        if self._running:
+            return
+        self._running = True
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while self._running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            METRICS.record("loop.lag", lag * 1000)
+            with self._lock:
+                self._beat = now
+                captured, self._captured = self._captured, None
+            if lag >= self.threshold:
+                self._record_stall(lag * 1000, captured)
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.interval / 2)
+            with self._lock:
+                stalled = time.monotonic() - self._beat > self.interval + self.threshold
+                if not stalled or self._captured is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=STACK_DEPTH)
+            with self._lock:
+                self._captured = stack
+
+    def _record_stall(self, ms, stack):
+        site = _call_site(stack) if stack else "unknown"
+        with self._lock:
+            entry = self.sites.get(site)
+            if entry is None:
+                entry = self.sites[site] = StallSite(site, stack)
+            entry.count += 1
+            entry.total_ms += ms
+            entry.max_ms = max(entry.max_ms, ms)
+        METRICS.increment("loop.stalls")
+        logger.warning(f"Event loop blocked {ms:.0f} ms at {site}", extra={"fields": {"ms": ms, "site": site}})
+
+    def top(self, n=10):
+        with self._lock:
+            return sorted(self.sites.values(), key=lambda s: s.total_ms, reverse=True)[:n]
+
+    def format_lines(self, n=10):
+        sites = self.top(n)
+        if not sites:
+            return ["Блокувань циклу не виявлено"]
+        lines = ["Блокування циклу (за сумарним часом):"]
+        for s in sites:
+            lines.append(f"{s.total_ms:8.0f} мс {s.count:4d}x max {s.max_ms:.0f} мс  {s.site}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self.sites.clear()
+
+
+_watchdog = None
+
+
+def get_watchdog():
+    """Process-wide watchdog (one event loop per process)."""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+    return _watchdog
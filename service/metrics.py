@@ -0,0 +1,197 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_FILE = "metrics.json"
+
+
+class StreamingHistogram:
+    """Log-bucketed histogram of millisecond values.
+
+    Memory is bounded by the value range, not the sample count; percentiles
+    are accurate to about half a bucket (~5%).
+    """
+
+    GROWTH = 1.1
+    # Values below this (ms) share bucket 0
+    FLOOR = 0.01
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value <= self.FLOOR:
+            index = 0
+        else:
+            index = int(math.log(value / self.FLOOR, self.GROWTH)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == 0:
+                    return 0.0
+                # Geometric middle of the bucket, never above the observed max
+                return min(self.FLOOR * self.GROWTH ** (index - 0.5), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = StreamingHistogram()
+            histogram.record(ms)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def format_lines(self):
+        snap = self.snapshot()
+        lines = []
+        for name, s in snap["histograms"].items():
+            lines.append(
+                f"{name}: n={s['count']} p50={s['p50']:.1f} p95={s['p95']:.1f} "
+                f"p99={s['p99']:.1f} max={s['max']:.1f} ms"
+            )
+        for name, value in snap["counters"].items():
+            lines.append(f"{name}: {value}")
+        return lines
+
+    def export(self, path=METRICS_FILE):
+        """Writes a JSON snapshot atomically. Blocking - call via asyncio.to_thread on the loop."""
+        data = self.snapshot()
+        data["exported_at"] = time.time()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Process-wide registry
+METRICS = MetricsRegistry()
+
+
+class Trace:
+    """Timing spans for one item flowing through a pipeline (e.g. one Telegram post).
+
+    Stages are recorded as "<pipeline>.<stage>"; finish() records the end-to-end
+    time from `origin` (wall clock, e.g. the post date) as "<pipeline>.e2e".
+    """
+
+    def __init__(self, pipeline, origin=None, registry=METRICS):
+        self.pipeline = pipeline
+        self.registry = registry
+        self.origin = origin if origin is not None else time.time()
+        self.created = time.perf_counter()
+        self.finished = False
+
+    @contextmanager
+    def span(self, stage):
+        with self.registry.time(f"{self.pipeline}.{stage}"):
+            yield
+
+    def mark(self, stage, since=None):
+        """Records the time from `since` (perf_counter, default: trace creation) until now."""
+        start = self.created if since is None else since
+        self.registry.record(f"{self.pipeline}.{stage}", (time.perf_counter() - start) * 1000)
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.mark("local")
+        self.registry.record(f"{self.pipeline}.e2e", max(0.0, time.time() - self.origin) * 1000)
+
+
+class _NullTrace:
+    """Stand-in for code paths that are not traced (history load, system cards)."""
+
+    @contextmanager
+    def span(self, stage):
+        yield
+
+    def mark(self, stage, since=None):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Timeline:
+    """Named phases relative to a start point, e.g. the cold-start sequence.
+
+    Each phase is also recorded as "<name>.<phase>" so regressions show up in
+    the exported metrics.
+    """
+
+    def __init__(self, name, start=None, registry=METRICS):
+        self.name = name
+        self.registry = registry
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        self.phases.append((phase, elapsed_ms))
+        self.registry.record(f"{self.name}.{phase}", elapsed_ms)
+        return elapsed_ms
+
+    def format_lines(self):
+        return [f"{self.name}: {phase} +{elapsed:.0f} мс" for phase, elapsed in self.phases]
@@ -0,0 +1,165 @@
+import asyncio
+import math
+import random
+import time
+
+from service.log_service import get_logger
+from service.metrics import METRICS
+
+logger = get_logger("Scheduler")
+
+
+class Job:
+    __slots__ = ("name", "func", "interval", "jitter", "first_delay", "pausable", "max_concurrent",
+                 "running", "missed", "runs", "skipped", "failures", "total_ms", "max_ms", "last_ms", "_task")
+
+    def __init__(self, name, func, interval, jitter, first_delay, pausable, max_concurrent):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        # Fraction of the interval each tick may move either way
+        self.jitter = jitter
+        self.first_delay = first_delay
+        self.pausable = pausable
+        self.max_concurrent = max_concurrent
+        self.running = 0
+        # A tick was dropped while paused: run once on resume
+        self.missed = False
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = None
+        self._task = None
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.runs if self.runs else 0.0
+
+    def cancel(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+class PeriodicScheduler:
+    """Periodic jobs on the event loop.
+
+    Deadlines are absolute (first run + n * interval on the loop clock), so a
+    slow run does not push later ones back. A tick that comes while the job
+    is still running `max_concurrent` times is skipped, not queued; ticks
+    missed during a loop stall are dropped instead of run in a burst. Jitter
+    moves each tick independently and does not accumulate. While paused,
+    pausable jobs skip their ticks and run once right away on resume.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.paused = False
+        self._loop = None
+
+    def add(self, name, func, interval, jitter=0.0, first_delay=0.0, pausable=True, max_concurrent=1):
+        """Schedules func (sync or async) every `interval` seconds; needs a running loop."""
+        if name in self.jobs:
+            self.remove(name)
+        job = Job(name, func, interval, jitter, first_delay, pausable, max_concurrent)
+        self._loop = asyncio.get_running_loop()
+        job._task = self._loop.create_task(self._schedule(job))
+        self.jobs[name] = job
+        return job
+
+    def remove(self, name):
+        job = self.jobs.pop(name, None)
+        if job:
+            job.cancel()
+
+    def stop(self):
+        for name in list(self.jobs):
+            self.remove(name)
+
+    def pause(self):
+        if not self.paused:
+            self.paused = True
+            logger.info("Periodic jobs paused")
+
+    def resume(self):
+        """Thread-safe: session handlers may call it from Flet worker threads."""
+        if not self.paused:
+            return
+        self.paused = False
+        logger.info("Periodic jobs resumed")
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._run_missed)
+
+    def _run_missed(self):
+        for job in self.jobs.values():
+            if job.missed and job.running < job.max_concurrent:
+                job.missed = False
+                self._loop.create_task(self._execute(job))
+
+    async def _schedule(self, job):
+        loop = asyncio.get_running_loop()
+        start = loop.time() + job.first_delay
+        tick = 0
+        while True:
+            offset = random.uniform(-job.jitter, job.jitter) * job.interval if job.jitter else 0.0
+            delay = start + tick * job.interval + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Next tick after now, however long the loop was blocked
+            tick = max(tick + 1, math.floor((loop.time() - start) / job.interval) + 1)
+
+            if self.paused and job.pausable:
+                job.missed = True
+            elif job.running >= job.max_concurrent:
+                job.skipped += 1
+                METRICS.increment(f"job.{job.name}.skipped")
+            else:
+                # Separate task: the schedule keeps ticking while a slow run is in flight
+                loop.create_task(self._execute(job))
+
+    async def _execute(self, job):
+        job.running += 1
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            if asyncio.iscoroutine(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Periodic job {job.name} failed: {e}", extra={"fields": {"job": job.name}})
+        finally:
+            job.running -= 1
+            ms = (time.perf_counter() - start) * 1000
+            job.runs += 1
+            job.total_ms += ms
+            job.max_ms = max(job.max_ms, ms)
+            job.last_ms = ms
+            METRICS.record(f"job.{job.name}", ms)
+
+    def format_lines(self):
+        if not self.jobs:
+            return ["Періодичних задач немає"]
+        state = " (призупинено)" if self.paused else ""
+        lines = [f"Періодичні задачі{state}:"]
+        for job in self.jobs.values():
+            last = f"{job.last_ms:.0f}" if job.last_ms is not None else "-"
+            lines.append(
+                f"{job.name}: кожні {job.interval:g} с, запусків {job.runs}, пропущено {job.skipped}, "
+                f"помилок {job.failures}, ост. {last} мс, сер. {job.avg_ms:.0f} мс, max {job.max_ms:.0f} мс"
+            )
+        return lines
+
+
+_scheduler = None
+
+
+def get_periodic():
+    """Process-wide scheduler (one event loop per process)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PeriodicScheduler()
+    return _scheduler
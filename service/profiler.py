@@ -0,0 +1,104 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+PROFILES_DIR = "profiles"
+TOP_N = 15
+# Stack depth kept per allocation (tracemalloc); 1 = allocation line only
+TRACE_FRAMES = 5
+
+
+def _report_path(directory, kind):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+
+
+class Profiler:
+    """On-demand cProfile sessions and tracemalloc snapshots.
+
+    Nothing is installed until a session is started: with profiling off
+    there is no profile hook and no allocation tracing, i.e. zero overhead.
+    cProfile records the thread that started it - the event loop, where
+    rendering, card construction and history writes run.
+    """
+
+    def __init__(self, directory=PROFILES_DIR, top_n=TOP_N):
+        self.directory = directory
+        self.top_n = top_n
+        self._cpu = None
+        self._cpu_started = None
+        self._snapshot = None
+
+    @property
+    def cpu_active(self):
+        return self._cpu is not None
+
+    @property
+    def memory_active(self):
+        return tracemalloc.is_tracing()
+
+    def start_cpu(self):
+        if self._cpu is not None:
+            return
+        self._cpu = cProfile.Profile()
+        self._cpu_started = time.perf_counter()
+        self._cpu.enable()
+
+    def stop_cpu(self):
+        """Stops the session; returns (report_path, top lines by cumulative time)."""
+        if self._cpu is None:
+            return None, []
+        self._cpu.disable()
+        profile, self._cpu = self._cpu, None
+        duration = time.perf_counter() - self._cpu_started
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n * 4)
+
+        path = _report_path(self.directory, "cpu")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"cProfile session: {duration:.1f} s\n")
+            f.write(stream.getvalue())
+        profile.dump_stats(path[:-len(".txt")] + ".prof")
+
+        lines = [f"CPU профіль за {duration:.1f} с (сумарний час):"]
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        for (filename, line, name), (_, calls, _, cumulative, _) in entries[:self.top_n]:
+            lines.append(f"{cumulative * 1000:8.1f} мс {calls:6d}x {name} ({os.path.basename(filename)}:{line})")
+        return path, lines
+
+    def take_snapshot(self):
+        """Starts tracing on first use; returns (report_path, top lines + diff to the previous snapshot)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._snapshot = None
+            return None, ["tracemalloc увімкнено; наступний знімок покаже різницю"]
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Пам'ять: {current / 1024 / 1024:.1f} МБ (пік {peak / 1024 / 1024:.1f} МБ)", "Місця виділення:"]
+        for stat in snapshot.statistics("lineno")[:self.top_n]:
+            lines.append(f"{stat.size / 1024:8.1f} КБ {stat.count:7d} бл. {stat.traceback[0]}")
+
+        if self._snapshot is not None:
+            lines.append("Зміна від попереднього знімка:")
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:self.top_n]:
+                lines.append(f"{stat.size_diff / 1024:+8.1f} КБ {stat.count_diff:+7d} бл. {stat.traceback[0]}")
+        self._snapshot = snapshot
+
+        path = _report_path(self.directory, "mem")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path, lines
+
+    def stop_memory(self):
+        self._snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,65 @@
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from service.classifier import message_regions
+from service.regions import canonical_region
+
+# Current air-raid state of one region; `since` is epoch seconds of the last change
+RegionState = namedtuple("RegionState", ["region", "alert", "since"])
+
+
+def _parse_changed(value):
+    # The alerts API reports the last change as local "YYYY-MM-DD HH:MM:SS"
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class RegionStateCache:
+    """Latest alert state per canonical region, fed by the alerts poller.
+
+    News correlation is a dict lookup per region: no HTTP request and no scan
+    of the API payload per message.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self.updated = None
+
+    def update(self, states, now=None):
+        now = time.time() if now is None else now
+        fresh = {}
+        for name, data in states.items():
+            region = canonical_region(name)
+            if region is None:
+                continue
+            alert = bool(data.get("alertnow"))
+            since = _parse_changed(data.get("changed"))
+            if since is None:
+                # No timestamp from the API: keep the first time we saw this state
+                previous = self._states.get(region)
+                since = previous.since if previous and previous.alert == alert else now
+            fresh[region] = RegionState(region, alert, since)
+        # Swapped in one assignment, so readers never see a half-updated cache
+        self._states = fresh
+        self.updated = now
+
+    def get(self, name):
+        region = canonical_region(name)
+        return self._states.get(region) if region else None
+
+    def longest_alert(self, regions):
+        """The active alert among `regions` that started first, or None."""
+        longest = None
+        for name in message_regions(regions):
+            state = self.get(name)
+            if state and state.alert and (longest is None or state.since < longest.since):
+                longest = state
+        return longest
+
+
+def alert_minutes(state, now=None):
+    now = time.time() if now is None else now
+    return max(0, int((now - state.since) // 60))
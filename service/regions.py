@@ -0,0 +1,100 @@
+# Region names used by the alerts API, the parsed Telegram posts and the map.
+# Flet-free: shared by the UI, the ingestion hub and the headless daemon.
+from functools import lru_cache
+
+# Mapping from API Region Names -> SVG IDs
+# Based on ISO 3166-2:UA and common naming in alerts APIs
+REGION_MAPPING = {
+    "Вінницька область": "UA-05",
+    "Волинська область": "UA-07",
+    "Дніпропетровська область": "UA-12",
+    "Донецька область": "UA-14",
+    "Житомирська область": "UA-18",
+    "Закарпатська область": "UA-21",
+    "Запорізька область": "UA-23",
+    "Івано-Франківська область": "UA-26",
+    "Київська область": "UA-32", # Usually 32 is region, 30 is city. Need to check svg for both or just one.
+    "м. Київ": "UA-30",
+    "Кіровоградська область": "UA-35",
+    "Луганська область": "UA-09",
+    "Львівська область": "UA-46",
+    "Миколаївська область": "UA-48",
+    "Одеська область": "UA-51",
+    "Полтавська область": "UA-53",
+    "Рівненська область": "UA-56",
+    "Сумська область": "UA-59",
+    "Тернопільська область": "UA-61",
+    "Харківська область": "UA-63",
+    "Херсонська область": "UA-65",
+    "Хмельницька область": "UA-68",
+    "Черкаська область": "UA-71",
+    "Чернівецька область": "UA-77",
+    "Чернігівська область": "UA-74",
+    "Автономна Республіка Крим": "UA-43",
+    "м. Севастополь": "UA-40"
+}
+
+# Common City/Short names to Full Region Names mapping
+CITY_TO_REGION_MAPPING = {
+    "Вінниця": "Вінницька область",
+    "Дніпро": "Дніпропетровська область",
+    "Донецьк": "Донецька область",
+    "Житомир": "Житомирська область",
+    "Запоріжжя": "Запорізька область",
+    "Івано-Франківськ": "Івано-Франківська область",
+    "Київ": "м. Київ", # Or Київська область depending on context, usually City for alerts
+    "Кропивницький": "Кіровоградська область",
+    "Луганськ": "Луганська область",
+    "Луцьк": "Волинська область",
+    "Львів": "Львівська область",
+    "Миколаїв": "Миколаївська область",
+    "Одеса": "Одеська область",
+    "Полтава": "Полтавська область",
+    "Рівне": "Рівненська область",
+    "Суми": "Сумська область",
+    "Тернопіль": "Тернопільська область",
+    "Ужгород": "Закарпатська область",
+    "Харків": "Харківська область",
+    "Херсон": "Херсонська область",
+    "Хмельницький": "Хмельницька область",
+    "Черкаси": "Черкаська область",
+    "Чернівці": "Чернівецька область",
+    "Чернігів": "Чернігівська область",
+    "Сімферополь": "Автономна Республіка Крим",
+    "Крим": "Автономна Республіка Крим",
+    "Севастополь": "м. Севастополь"
+}
+
+
+@lru_cache(maxsize=1024)
+def canonical_region(name):
+    """Full region name (a REGION_MAPPING key) for an API/post region name, or None."""
+    name = name.strip() if name else ""
+    if not name:
+        return None
+
+    # 1. Direct Match
+    if name in REGION_MAPPING:
+        return name
+
+    # 2. City Mapping (Robust)
+    full_name = CITY_TO_REGION_MAPPING.get(name)
+    if full_name:
+        return full_name
+
+    # 3. "Область" suffix check (e.g. input "Вінницька" -> "Вінницька область")
+    if "область" not in name:
+        potential_name = f"{name} область"
+        if potential_name in REGION_MAPPING:
+            return potential_name
+
+    # 4. Partial / Case-insensitive Search
+    name_lower = name.lower()
+    for key in REGION_MAPPING:
+        if name_lower in key.lower():
+            return key
+    return None
+
+
+def region_svg_id(name):
+    return REGION_MAPPING.get(canonical_region(name))
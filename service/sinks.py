@@ -0,0 +1,96 @@
+import json
+import queue
+import sys
+import threading
+import urllib.request
+
+from service.log_service import get_logger
+
+logger = get_logger("Daemon")
+
+
+def _encode(item):
+    return json.dumps(item, ensure_ascii=False, default=str)
+
+
+class StdoutSink:
+    """One JSON object per line on stdout."""
+
+    def emit(self, item):
+        sys.stdout.write(_encode(item) + "\n")
+        sys.stdout.flush()
+
+    def close(self):
+        pass
+
+
+class JsonlFileSink:
+    """Appends one JSON object per line to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, item):
+        self._file.write(_encode(item) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class WebhookSink:
+    """POSTs each item as JSON to a (local) URL from a background thread.
+
+    The queue is bounded so a dead endpoint cannot grow memory; when it is
+    full new items are dropped and counted.
+    """
+
+    def __init__(self, url, timeout=5, max_pending=1000):
+        self.url = url
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="webhook-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request = urllib.request.Request(
+                self.url,
+                data=_encode(item).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+            except Exception as e:
+                logger.warning(f"Webhook {self.url} failed: {e}")
+
+    def close(self):
+        try:
+            self._queue.put(None, timeout=self.timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=self.timeout)
+
+
+def create_sink(spec):
+    """'stdout', 'file:<path>' or 'webhook:<url>'."""
+    if spec == "stdout":
+        return StdoutSink()
+    if spec.startswith("file:"):
+        return JsonlFileSink(spec[len("file:"):])
+    if spec.startswith("webhook:"):
+        return WebhookSink(spec[len("webhook:"):])
+    raise ValueError(f"Unknown sink: {spec}")
@@ -1,21 +1,58 @@
 import asyncio
 import json
+import logging
 import os
-import flet as ft
+import random
+import time
+from collections import deque
 from telethon import TelegramClient, events
 import config
+from service.dedup import NearDuplicateIndex
+from service.health_service import FAIL, OK, WARN
+from service.log_service import get_logger
+from service.metrics import METRICS, Trace
+from service.text_classifier import get_text_classifier
 
 STATE_FILE = "telegram_state.json"
 
+# Reconnect delays (seconds): doubled per failed attempt up to the cap, with jitter
+BACKOFF_MIN = 1
+BACKOFF_MAX = 60
+# Max messages fetched by one gap catch-up after (re)connecting
+CATCH_UP_LIMIT = 100
+
+def dedup_scope(level, regions, status):
+    # Only posts with the same regions, level and status are folded together:
+    # the same alert for another oblast must still reach that oblast's subscribers
+    return level, frozenset(regions or ()), status
+
+
 class TelegramService:
-    def __init__(self, update_callback, logger=None):
+    def __init__(self, update_callback, duplicate_callback=None, client_factory=None, batch_callback=None):
         self.api_id = config.API_ID
         self.api_hash = config.API_HASH
         self.channel_username = config.CHANNEL_USERNAME
-        self.client = TelegramClient('anon', self.api_id, self.api_hash)
+        # Injectable so the supervisor can run against a local stand-in client
+        self.client_factory = client_factory or (lambda: TelegramClient('anon', self.api_id, self.api_hash))
+        self.client = self.client_factory()
         self.update_callback = update_callback
-        self.logger = logger
+        # Reposts / light rephrasings of a recent post are folded into it
+        self.duplicate_callback = duplicate_callback
+        # First-run prefetch is delivered in one call if set, else per message via update_callback
+        self.batch_callback = batch_callback
+        self.dedup = NearDuplicateIndex()
+        # Fallback for non-JSON posts; the automaton is built here, not on the first message
+        self.text_classifier = get_text_classifier()
+        self.logger = get_logger("Telegram")
         self.last_message_id = self.load_state()
+        # Set once the client is started (startup timeline, health checks)
+        self.ready = asyncio.Event()
+        self.running = False
+        self._handlers_registered = False
+        # monotonic time the current outage was detected (None = connected)
+        self.outage_started = None
+        # Ids processed recently: catch-up and the live handler can overlap after a reconnect
+        self._recent_ids = deque(maxlen=1000)
 
     def load_state(self):
         if os.path.exists(STATE_FILE):
@@ -24,7 +61,7 @@ class TelegramService:
                     data = json.load(f)
                     return data.get("last_message_id")
             except Exception as e:
-                self.log(f"Error loading state: {e}")
+                self.log(f"Error loading state: {e}", logging.ERROR)
         return None
 
     def save_state(self, msg_id):
@@ -33,90 +70,202 @@ class TelegramService:
                 json.dump({"last_message_id": msg_id}, f)
             self.last_message_id = msg_id
         except Exception as e:
-            self.log(f"Error saving state: {e}")
+            self.log(f"Error saving state: {e}", logging.ERROR)
+
+    def log(self, msg, level=logging.INFO, **fields):
+        self.logger.log(level, msg, extra={"fields": fields})
 
-    def log(self, msg):
-        if self.logger:
-            self.logger(msg)
-        print(msg)
+    def _register_handlers(self):
+        # Once per client: Telethon keeps handlers across reconnects
+        if self._handlers_registered:
+            return
+        self.client.add_event_handler(self._on_new_message, events.NewMessage(chats=self.channel_username))
+        self._handlers_registered = True
+
+    async def _on_new_message(self, event):
+        await self.process_message(event.message)
 
     async def start(self):
-        await self.client.start()
-        
-        # Ensure we are connected
-        if not await self.client.is_user_authorized():
-            self.log("Client not authorized. Please run interactively to login first.")
-            
-        self.log(f"Listening to {self.channel_username}...")
-
-        # Catch up on missed messages
-        if self.last_message_id:
-            await self.check_missed_messages()
+        """Supervisor: owns the client lifecycle until stop()."""
+        self.running = True
+        self._register_handlers()
+        backoff = BACKOFF_MIN
+        while self.running:
+            try:
+                await self._connect()
+                backoff = BACKOFF_MIN
+                # Resolves when the connection is lost (after Telethon's own retries)
+                await self.client.disconnected
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.log(f"Telegram connection error: {e}", logging.ERROR)
+
+            if not self.running:
+                break
+            if self.outage_started is None:
+                self.outage_started = time.monotonic()
+                METRICS.increment("telegram.disconnects")
+                self.log("Telegram disconnected, reconnecting...", logging.WARNING)
+
+            delay = backoff * random.uniform(0.8, 1.2)
+            self.log(f"Reconnect in {delay:.1f} s", logging.DEBUG, delay=delay)
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    async def _connect(self):
+        if not self.ready.is_set():
+            # First connection: login/authorization
+            await self.client.start()
+            self.ready.set()
+
+            # Ensure we are connected
+            if not await self.client.is_user_authorized():
+                self.log("Client not authorized. Please run interactively to login first.", logging.WARNING)
+
+            self.log(f"Listening to {self.channel_username}...")
+            if not self.last_message_id:
+                await self.bootstrap()
         else:
-            self.log("First run or no state found. Listening for new messages only.")
+            await self.client.connect()
 
-            # We could fetch the latest message ID here to set looking forward, 
-            # but getting the next new message will set the state anyway.
+        if self.outage_started is not None:
+            outage_ms = (time.monotonic() - self.outage_started) * 1000
+            METRICS.record("telegram.outage", outage_ms)
+            self.log(f"Telegram reconnected after {outage_ms / 1000:.1f} s", outage_ms=outage_ms)
+
+        # Catch up on messages posted while we were offline
+        await self.check_missed_messages()
+
+        if self.outage_started is not None:
+            # Time-to-recovery: blind from the disconnect until the gap is filled
+            recovery_ms = (time.monotonic() - self.outage_started) * 1000
+            METRICS.record("telegram.recovery", recovery_ms)
+            self.outage_started = None
+
+    async def stop(self):
+        self.running = False
+        await self.client.disconnect()
 
     async def check_connection(self):
         if await self.client.is_user_authorized():
             self.log("З'єднання з Telegram: ОК")
             return True
         else:
-            self.log("З'єднання з Telegram: НЕ АВТОРИЗОВАНО")
+            self.log("З'єднання з Telegram: НЕ АВТОРИЗОВАНО", logging.WARNING)
             return False
 
+    # --- Health probes (see service.health_service.HealthCheck) ---
+
+    async def probe_auth(self):
+        if not self.client.is_connected():
+            return FAIL, "немає з'єднання"
+        if await self.client.is_user_authorized():
+            return "авторизовано"
+        return FAIL, "не авторизовано"
+
+    async def probe_channel(self):
+        entity = await self.client.get_entity(self.channel_username)
+        return f"{getattr(entity, 'title', None) or self.channel_username} доступний"
+
+    async def probe_gap(self):
+        latest = await self.client.get_messages(self.channel_username, limit=1)
+        if not latest:
+            return "канал порожній"
+        latest_id = latest[0].id
+        gap = latest_id - (self.last_message_id or latest_id)
+        return (OK if gap <= 0 else WARN), f"пропущено {max(gap, 0)} повідомлень (останній ID {latest_id})"
+
     async def check_missed_messages(self):
         if not self.last_message_id:
-            self.log("Немає ID останнього повідомлення для перевірки.")
             return
 
         self.log(f"Перевірка пропущених повідомлень починаючи з ID {self.last_message_id}...")
         try:
             # min_id excludes the message with that ID, so we get only newer ones
-            # limit=20 to avoid fetching too many if gap is huge
-            messages = await self.client.get_messages(self.channel_username, min_id=self.last_message_id, limit=20, reverse=True)
+            # limited to avoid fetching too many if gap is huge
+            messages = await self.client.get_messages(self.channel_username, min_id=self.last_message_id, limit=CATCH_UP_LIMIT, reverse=True)
             if messages:
-                self.log(f"Знайдено {len(messages)} пропущених повідомлень.")
+                self.log(f"Знайдено {len(messages)} пропущених повідомлень.", count=len(messages))
                 for message in messages:
                     await self.process_message(message)
             else:
                 self.log("Пропущених повідомлень не знайдено.")
         except Exception as e:
-            self.log(f"Помилка отримання пропущених повідомлень: {e}")
+            self.log(f"Помилка отримання пропущених повідомлень: {e}", logging.ERROR)
+
+    async def bootstrap(self, limit=None):
+        """First run: the latest `limit` posts in one request, delivered as one batch; seeds the checkpoint."""
+        limit = config.BOOTSTRAP_MESSAGES if limit is None else limit
+        if limit <= 0:
+            self.log("First run or no state found. Listening for new messages only.")
+            return
+        start = time.perf_counter()
+        try:
+            # Newest first; one round-trip for the whole batch
+            messages = await self.client.get_messages(self.channel_username, limit=limit)
+        except Exception as e:
+            self.log(f"Bootstrap fetch failed: {e}", logging.ERROR)
+            return
+        messages = [m for m in reversed(messages) if m.id not in self._recent_ids]
+        self._recent_ids.extend(m.id for m in messages)
 
+        # JSON parsing of the whole batch off the event loop
+        parsed = await asyncio.to_thread(lambda: [self._parse(m) for m in messages])
 
-        @self.client.on(events.NewMessage(chats=self.channel_username))
-        async def handler(event):
-            await self.process_message(event.message)
+        items, duplicates = [], []
+        for message, post in zip(messages, parsed):
+            if post is None:
+                continue
+            cluster, duplicate = self.dedup.add(message.id, f"{post[0]}\n{post[1]}", now=message.date.timestamp(),
+                                                scope=dedup_scope(post[2], post[3], post[6]))
+            if duplicate:
+                duplicates.append(cluster)
+            else:
+                items.append(post + (message.id,))
 
-        # Run until disconnected
-        await self.client.run_until_disconnected()
+        if self.batch_callback:
+            self.batch_callback(items)
+        elif self.update_callback:
+            for *args, message_id in items:
+                self.update_callback(*args, message_id=message_id)
+        # Reposts are folded once their originals are published
+        if self.duplicate_callback:
+            for cluster in {c.key: c for c in duplicates}.values():
+                self.duplicate_callback(cluster.key, cluster.sources)
 
-    async def process_message(self, message):
-        # Update state
-        if message.id:
-             self.save_state(message.id)
+        if messages:
+            self.save_state(messages[-1].id)
+        ms = (time.perf_counter() - start) * 1000
+        METRICS.record("telegram.bootstrap", ms)
+        self.log(f"Bootstrap: {len(items)} posts from {len(messages)} messages in {ms:.0f} ms",
+                 count=len(items), fetched=len(messages), ms=ms)
+
+    def _parse(self, message):
+        """(summary, original_text, level, regions, time, footer, status) or None for non-posts."""
+        raw_text = message.message or ""
 
-        raw_text = message.message
-        date = message.date
-        
-        self.log(f"New message received: {raw_text[:50]}...")
-        
         # --- Parsing Logic ---
-        # 1. Skip first line (usually "json")
+        # 1. Skip first line (usually "json") and parse the rest
+        data = None
         lines = raw_text.split('\n')
-        if len(lines) < 2:
-            return
-        
-        # Join the rest to get JSON string
-        json_str = "\n".join(lines[1:])
-        
-        try:
-            data = json.loads(json_str)
-        except json.JSONDecodeError:
-            self.log("Failed to parse JSON. Ignoring.")
-            return
+        if len(lines) >= 2:
+            try:
+                data = json.loads("\n".join(lines[1:]))
+            except json.JSONDecodeError:
+                pass
+
+        if not isinstance(data, dict):
+            # Not a pre-summarized post: classify the raw text locally, without
+            # the "json" marker line of a post whose JSON failed to parse
+            if lines[0].strip().lower() == "json":
+                raw_text = "\n".join(lines[1:])
+            if not raw_text.strip():
+                return None
+            data = self.text_classifier.classify(raw_text)
+            METRICS.increment("telegram.text_fallback")
+            self.log("Not JSON, classified from text.", logging.DEBUG, message_id=message.id,
+                     threat_level=data["level"], regions=data["regions"])
 
         # 2. Check status
         status = data.get("status", "").lower()
@@ -139,17 +288,50 @@ class TelegramService:
         original_text = data.get("original_text", "")
         summary = data.get("summary", "")
         
-        # We now pass 'level', 'regions', 'summary', 'original_text' to the UI callback
-        # The logic for determining color/title will move to main.py because it needs access to user settings (client_storage)
-        
+        # The logic for determining color/title is in the hub/UI because it needs the user settings
+        date = message.date
         formatted_time = date.strftime("%H:%M:%S")
         footer_text = date.strftime("%d.%m.%Y")
+        return summary, original_text, level, regions, formatted_time, footer_text, status
+
+    async def process_message(self, message):
+        if message.id in self._recent_ids:
+            return
+        self._recent_ids.append(message.id)
+
+        # Update state; never backwards (catch-up can finish after a newer live message)
+        if message.id and message.id > (self.last_message_id or 0):
+             self.save_state(message.id)
+
+        raw_text = message.message or ""
+        date = message.date
+
+        # Latency is measured from the channel post time to the rendered card
+        trace = Trace("telegram", origin=date.timestamp())
+        METRICS.record("telegram.delay", max(0.0, time.time() - trace.origin) * 1000)
+        parse_start = time.perf_counter()
+        
+        self.log(f"New message received: {raw_text[:50]}...", message_id=message.id)
+        post = self._parse(message)
+        if post is None:
+            return
+        summary, original_text, level, regions, formatted_time, footer_text, status = post
+        trace.mark("parse", since=parse_start)
+
+        # Near-duplicate suppression: no card, history line or render for a repost
+        dedup_start = time.perf_counter()
+        cluster, duplicate = self.dedup.add(message.id, f"{summary}\n{original_text}", now=date.timestamp(),
+                                            scope=dedup_scope(level, regions, status))
+        trace.mark("dedup", since=dedup_start)
+        if duplicate:
+            METRICS.increment("telegram.duplicates")
+            self.log(f"Duplicate of message {cluster.key} ({cluster.sources} sources)", message_id=message.id, duplicate_of=cluster.key)
+            if self.duplicate_callback:
+                self.duplicate_callback(cluster.key, cluster.sources)
+            return
         
         # Callback to UI
         if self.update_callback:
-            # Modified Signature to include status:
-            # callback(summary, original_text, level, regions, formatted_time, footer_text, status)
-            self.update_callback(summary, original_text, level, regions, formatted_time, footer_text, status)
-
-    async def connect(self):
-        await self.client.start()
+            # Modified Signature to include status, the latency trace and the message id (dedup key):
+            # callback(summary, original_text, level, regions, formatted_time, footer_text, status, trace=trace, message_id=id)
+            self.update_callback(summary, original_text, level, regions, formatted_time, footer_text, status, trace=trace, message_id=message.id)
@@ -0,0 +1,222 @@
+# Local fallback for channel posts that are not pre-summarized JSON: region
+# names and threat keywords found in one pass over the raw text.
+from collections import deque
+
+from service.regions import CITY_TO_REGION_MAPPING, REGION_MAPPING
+
+SUMMARY_CHARS = 200
+
+# Case endings appended to stems (every generated form is a separate pattern)
+ADJ = ("а", "ий", "ій", "е", "і", "у", "ої", "ою", "ого", "ому", "им", "ім", "их", "ими", "о")
+NOUN = ("", "а", "я", "о", "е", "и", "і", "ї", "у", "ю", "ою", "ею", "ом", "ем", "ам", "ям",
+        "ах", "ях", "ами", "ями", "ів", "ей", "ь", "ові")
+EXACT = ("",)
+
+# Informal names of the oblasts (noun stems)
+REGION_ALIASES = {
+    "Вінницька область": ("вінниччин",),
+    "Волинська область": ("волин",),
+    "Дніпропетровська область": ("дніпропетровщин", "дніпровщин"),
+    "Донецька область": ("донеччин",),
+    "Житомирська область": ("житомирщин",),
+    "Закарпатська область": ("закарпатт",),
+    "Івано-Франківська область": ("прикарпатт", "франківщин"),
+    "Київська область": ("київщин",),
+    "Кіровоградська область": ("кіровоградщин",),
+    "Луганська область": ("луганщин",),
+    "Львівська область": ("львівщин",),
+    "Миколаївська область": ("миколаївщин",),
+    "Одеська область": ("одещин",),
+    "Полтавська область": ("полтавщин",),
+    "Рівненська область": ("рівненщин",),
+    "Сумська область": ("сумщин",),
+    "Тернопільська область": ("тернопільщин",),
+    "Харківська область": ("харківщин", "слобожанщин"),
+    "Херсонська область": ("херсонщин",),
+    "Хмельницька область": ("хмельниччин",),
+    "Черкаська область": ("черкащин",),
+    "Чернівецька область": ("буковин",),
+    "Чернігівська область": ("чернігівщин",),
+    "Автономна Республіка Крим": ("кримськ",),
+}
+
+# Cities whose forms the rules in _city_forms get wrong
+CITY_FORMS = {
+    "Суми": ("суми", "сум", "сумах", "сумам", "сумами"),
+    "Черкаси": ("черкаси", "черкас", "черкасах", "черкасам", "черкасами"),
+    "Чернівці": ("чернівці", "чернівців", "чернівцях", "чернівцям", "чернівцями"),
+    "Рівне": ("рівне", "рівного", "рівному", "рівним", "рівнім"),
+}
+
+# Threat keywords: (stem, endings) -> level. CLEAR words lower a post that
+# has nothing above MEDIUM to LOW ("відбій тривоги").
+CLEAR = "CLEAR"
+KEYWORDS = {
+    "CRITICAL": (("балістик", NOUN), ("кинджал", NOUN), ("циркон", NOUN), ("іскандер", NOUN),
+                 ("масован", ADJ), ("в укриття", EXACT)),
+    "HIGH": (("ракет", NOUN), ("ракетн", ADJ), ("крилат", ADJ), ("вибух", NOUN), ("шахед", NOUN), ("дрон", NOUN),
+             ("бпла", EXACT), ("ту-95", EXACT), ("ту-22", EXACT), ("міг-31", EXACT), ("пуск", NOUN),
+             ("атак", NOUN), ("обстріл", NOUN), ("удар", NOUN)),
+    "MEDIUM": (("загроз", NOUN), ("небезпек", NOUN), ("небезпеці", EXACT), ("тривог", NOUN), ("тривозі", EXACT),
+               ("курсом", EXACT), ("напрямок", EXACT), ("напрямку", EXACT), ("розвідувальн", ADJ), ("зліт", NOUN)),
+    CLEAR: (("відбій", EXACT), ("відбою", EXACT), ("чисто", EXACT), ("збит", ADJ)),
+}
+LEVEL_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+_APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "`": "'"})
+
+
+def _is_word_char(ch):
+    return ch.isalpha() or ch in "-'"
+
+
+def _city_forms(city):
+    name = city.lower()
+    if city in CITY_FORMS:
+        return CITY_FORMS[city]
+    if name.endswith("ий"):
+        return tuple(name[:-2] + e for e in ADJ)
+    if name.endswith(("ів", "їв")):
+        # Харків -> Харкова, Київ -> Києва
+        stem = name[:-2] + ("ов" if name.endswith("ів") else "єв")
+        return (name,) + tuple(stem + e for e in ("а", "у", "і", "ом", "ові"))
+    if name.endswith("іль"):
+        # Тернопіль -> Тернополя
+        return (name,) + tuple(name[:-3] + "ол" + e for e in ("я", "ю", "і", "ем"))
+    if name.endswith("ь"):
+        return (name,) + tuple(name[:-1] + e for e in ("я", "ю", "і", "ем"))
+    if name[-1] in "аяо":
+        return tuple(name[:-1] + e for e in NOUN if e)
+    return tuple(name + e for e in ("", "а", "у", "і", "ом", "ові", "ем"))
+
+
+def patterns():
+    """Every inflected form -> ("region", canonical name) or ("level", level)."""
+    table = {}
+    for region in REGION_MAPPING:
+        if region.endswith(" область"):
+            # "Харківська область" -> харківськ + adjective endings
+            stem = region[:-len(" область")].lower()[:-1]
+            for e in ADJ:
+                table[stem + e] = ("region", region)
+    for region, stems in REGION_ALIASES.items():
+        endings = ADJ if region == "Автономна Республіка Крим" else NOUN
+        for stem in stems:
+            for e in endings:
+                table[stem + e] = ("region", region)
+    for city, region in CITY_TO_REGION_MAPPING.items():
+        for form in _city_forms(city):
+            table[form] = ("region", region)
+    for level, words in KEYWORDS.items():
+        for stem, endings in words:
+            for e in endings:
+                table[stem + e] = ("level", level)
+    return table
+
+
+class Automaton:
+    """Aho-Corasick over a dict of patterns: all matches in one pass over the text."""
+
+    def __init__(self, patterns):
+        goto, fail, out = [{}], [0], [()]
+        for word, value in patterns.items():
+            node = 0
+            for ch in word:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append(())
+                node = nxt
+            out[node] += ((len(word), value),)
+
+        # Breadth-first: a node's failure link is the longest proper suffix in the
+        # trie. Transitions are completed into a DFA (each node's dict starts as a
+        # copy of its failure node's), so the scan is one dict lookup per character.
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        for nxt in goto[0].values():
+            delta[nxt] = {**delta[0], **goto[nxt]}
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                fail[nxt] = delta[fail[node]].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                delta[nxt] = {**delta[fail[nxt]], **goto[nxt]}
+                queue.append(nxt)
+
+        self._delta, self._out = delta, out
+
+    def __len__(self):
+        return len(self._delta)
+
+    def find(self, text):
+        """[(start, end, value)] for every pattern occurrence."""
+        delta, out = self._delta, self._out
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            node = delta[node].get(ch, 0)
+            if out[node]:
+                for length, value in out[node]:
+                    matches.append((i - length + 1, i + 1, value))
+        return matches
+
+
+def summarize(text, limit=SUMMARY_CHARS):
+    # First non-empty line, cut at a word boundary
+    line = next((l.strip() for l in text.splitlines() if l.strip()), "")
+    if len(line) <= limit:
+        return line
+    return line[:limit].rsplit(" ", 1)[0] + "…"
+
+
+class TextClassifier:
+    """Raw post text -> the same fields a JSON post carries (summary, original_text, level, regions, status)."""
+
+    def __init__(self):
+        self.automaton = Automaton(patterns())
+
+    def classify(self, text):
+        normalized = text.lower().translate(_APOSTROPHES)
+        regions = []
+        level = None
+        clear = False
+        n = len(normalized)
+        for start, end, (kind, value) in self.automaton.find(normalized):
+            # Whole words only: "сума" is not Суми, "ракетоносій" is not "ракето" + "носій"
+            if start > 0 and _is_word_char(normalized[start - 1]):
+                continue
+            if end < n and _is_word_char(normalized[end]):
+                continue
+            if kind == "region":
+                if value not in regions:
+                    regions.append(value)
+            elif value == CLEAR:
+                clear = True
+            elif level is None or LEVEL_RANK[value] > LEVEL_RANK[level]:
+                level = value
+
+        if clear and (level is None or LEVEL_RANK[level] <= LEVEL_RANK["MEDIUM"]):
+            level = "LOW"
+        return {
+            "summary": summarize(text),
+            "original_text": text,
+            "level": level or "LOW",
+            "regions": regions,
+            # Nothing about a threat or a place: shown only in the ignored view
+            "status": "normal" if regions or level else "ignore",
+        }
+
+
+_classifier = None
+
+
+def get_text_classifier():
+    """Process-wide classifier; the automaton is built on first use."""
+    global _classifier
+    if _classifier is None:
+        _classifier = TextClassifier()
+    return _classifier
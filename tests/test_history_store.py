@@ -0,0 +1,61 @@
+"""History ids and clearing through the ingestion hub."""
+import asyncio
+
+from service.history_store import HistoryStore, NewsRecord
+from service.ingestion_hub import IngestionHub
+
+
+def record(n):
+    return NewsRecord(f"Заголовок {n}", f"Текст {n}", "01.01.2026", "12:00:00", "blue", level="LOW")
+
+
+def test_ids_keep_increasing_after_clear(tmp_path):
+    store = HistoryStore(path=str(tmp_path / "history.jsonl"), legacy_path=str(tmp_path / "none.json"))
+    first = store.append(record(1))
+    store.clear()
+    assert store.load() == []
+    assert store.append(record(2)).id > first.id
+
+
+def test_repost_of_cleared_post_touches_no_card(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        hub = IngestionHub(history=HistoryStore(path="history.jsonl", legacy_path="none.json"))
+        await hub.start(with_services=False)
+        folded = []
+        hub.subscribe(on_duplicate=folded.append)
+
+        hub._on_telegram_message("Стара", "Текст", "LOW", [], "12:00:00", "01.01.2026", message_id=10)
+        old_id = hub.records[0].id
+        hub.clear_history()
+        assert hub.records == []
+
+        hub._on_telegram_message("Нова", "Інший текст", "LOW", [], "12:01:00", "01.01.2026", message_id=11)
+        assert hub.records[0].id != old_id
+        # A repost folded into message 10 (from before the clear)
+        hub._on_duplicate(10, 2)
+        assert folded == []
+
+    asyncio.run(scenario())
+
+
+def test_verify_checks_only_the_appended_tail(tmp_path):
+    path = tmp_path / "history.jsonl"
+    store = HistoryStore(path=str(path), legacy_path=str(tmp_path / "none.json"))
+    store.append_many([(record(n), None) for n in range(3)])
+    assert store.verify() == (3, 0)
+
+    with open(path, "ab") as f:
+        f.write(b"{broken\n")
+        f.write(b'{"id": 99')
+    store.append(record(4))
+    # The earlier lines are not parsed again; the torn line merges with the next append
+    assert store.verify() == (3, 2)
+    offset = store._verified[0]
+    assert store.verify() == (3, 2)
+    assert store._verified[0] == offset == path.stat().st_size
+
+    store.clear()
+    store.append(record(5))
+    assert store.verify() == (1, 0)
@@ -0,0 +1,97 @@
+"""Map geometry: path bounding boxes, oblast zoom and per-level visibility."""
+import os
+import re
+
+import pytest
+
+from ui.map_renderer import OBLAST, RAION, HROMADA, MapRenderer, path_bbox
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100">
+  <path id="UA-01" title="Перша" d="M 0 0 L 100 0 L 100 100 L 0 100 Z"/>
+  <path id="UA-01-01" title="Перший район" d="M 10 10 h 20 v 20 h -20 z"/>
+  <path id="UA-01-01-01" title="Перша громада" d="M 12 12 l 5 0 l 0 5 z"/>
+  <path id="UA-02" title="Друга" d="M 100 0 H 200 V 100 H 100 Z"/>
+</svg>
+"""
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    path = tmp_path / "map.svg"
+    path.write_text(SVG, encoding="utf-8")
+    return MapRenderer(str(path)).load()
+
+
+def region_tag(frame, region_id):
+    return re.search(rf'<[^>]*id="{region_id}"[^>]*>', frame.svg.decode("utf-8")).group(0)
+
+
+def viewbox(frame):
+    return re.search(r'viewBox="([^"]*)"', frame.svg.decode("utf-8")).group(1)
+
+
+@pytest.mark.parametrize("d, box", [
+    ("M 0 0 L 10 5 L 3 -2 Z", (0, -2, 10, 5)),
+    # Relative commands and H/V
+    ("m 10 10 h 20 v 5 h -20 z", (10, 10, 30, 15)),
+    # Implicit linetos after a moveto, no separators
+    ("M1,1 4,5 -2,3z", (-2, 1, 4, 5)),
+    # Control points count; for arcs only the end point does
+    ("M 0 0 C 10 -10 20 10 30 0", (0, -10, 30, 10)),
+    ("M 0 0 A 50 50 0 0 1 10 10", (0, 0, 10, 10)),
+    ("M 5 5 l 1e1 0", (5, 5, 15, 5)),
+])
+def test_path_bbox(d, box):
+    assert path_bbox(d) == box
+
+
+def test_path_bbox_empty():
+    assert path_bbox("") is None
+    assert path_bbox(None) is None
+
+
+def test_levels_from_ids(renderer):
+    assert renderer.ids_by_level == {OBLAST: {"UA-01", "UA-02"}, RAION: {"UA-01-01"}, HROMADA: {"UA-01-01-01"}}
+
+
+def test_zoom_viewbox_frames_the_oblast_with_padding(renderer):
+    # Any id inside the oblast frames the whole oblast
+    assert renderer.zoom_viewbox("UA-01-01") == "-5.00 -5.00 110.00 110.00"
+    assert renderer.zoom_viewbox("UA-02") == "95.00 -5.00 110.00 110.00"
+    assert renderer.zoom_viewbox(None) is None
+    assert renderer.zoom_viewbox("UA-99") is None
+
+
+def test_render_zoom_and_back(renderer):
+    full = viewbox(renderer.render([], []))
+    assert full == "0 0 200 100"
+    assert viewbox(renderer.render([], [], zoom="UA-01-01-01")) == "-5.00 -5.00 110.00 110.00"
+    assert viewbox(renderer.render([], [])) == full
+
+
+def test_hidden_level(renderer):
+    frame = renderer.render(["UA-01-01"], [], levels=[OBLAST])
+    assert 'display="none"' in region_tag(frame, "UA-01-01")
+    assert 'display="none"' in region_tag(frame, "UA-01-01-01")
+    assert 'display="none"' not in region_tag(frame, "UA-01")
+
+    # Shown again; the alert state survives the toggle
+    frame = renderer.render(["UA-01-01"], [])
+    assert 'display="none"' not in region_tag(frame, "UA-01-01")
+    assert 'fill="#CC0000"' in region_tag(frame, "UA-01-01")
+
+
+def test_map_component_zoom_and_levels(renderer):
+    from ui.components.map_component import MapComponent
+
+    component = MapComponent(svg_path=renderer.svg_path, defer_load=True, frame_cache_path=os.devnull)
+    component.renderer = renderer
+    component.zoom_to("Перший район")
+    assert component.zoom_id == "UA-01-01"
+    assert viewbox(component.frame) == "-5.00 -5.00 110.00 110.00"
+    component.set_levels([OBLAST, RAION])
+    assert 'display="none"' in region_tag(component.frame, "UA-01-01-01")
+    component.zoom_to(None)
+    component.set_levels(None)
+    assert viewbox(component.frame) == "0 0 200 100"
+    assert 'display="none"' not in component.frame.svg.decode("utf-8")
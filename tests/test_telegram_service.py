@@ -0,0 +1,204 @@
+"""TelegramService supervisor against a fake client: reconnects, backoff, catch-up."""
+import asyncio
+import datetime
+import json
+
+import pytest
+
+from service import telegram_service
+from service.metrics import METRICS
+from service.telegram_service import BACKOFF_MAX, STATE_FILE, TelegramService
+
+REGIONS = ("Київська область", "Львівська область", "Одеська область", "Харківська область",
+           "Полтавська область", "Сумська область", "Волинська область", "Черкаська область")
+
+_real_sleep = asyncio.sleep
+
+
+class Message:
+    """Stand-in for a Telethon message: a JSON post, one region per id."""
+
+    def __init__(self, id):
+        self.id = id
+        post = {"summary": f"Повідомлення {id}", "original_text": f"Текст повідомлення номер {id}",
+                "level": "MEDIUM", "regions": [REGIONS[id % len(REGIONS)]], "status": "normal"}
+        self.message = "json\n" + json.dumps(post, ensure_ascii=False)
+        self.date = datetime.datetime.now()
+
+
+class Event:
+    def __init__(self, message):
+        self.message = message
+
+
+class FakeClient:
+    """The part of TelegramClient the supervisor uses; drop() simulates a lost connection."""
+
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.handlers = []
+        self.disconnected = None
+        # Next connect() calls that fail
+        self.fail_connects = 0
+        # Awaited inside the next get_messages (an update arriving mid-request)
+        self.on_fetch = None
+
+    def _connected(self):
+        self.disconnected = asyncio.get_running_loop().create_future()
+
+    async def start(self):
+        self._connected()
+
+    async def connect(self):
+        if self.fail_connects:
+            self.fail_connects -= 1
+            raise ConnectionError("offline")
+        self._connected()
+
+    def drop(self):
+        self.disconnected.set_result(None)
+
+    async def disconnect(self):
+        if self.disconnected and not self.disconnected.done():
+            self.disconnected.set_result(None)
+
+    async def is_user_authorized(self):
+        return True
+
+    def add_event_handler(self, callback, event):
+        self.handlers.append(callback)
+
+    async def get_messages(self, channel, min_id=0, limit=None, reverse=False):
+        if self.on_fetch:
+            hook, self.on_fetch = self.on_fetch, None
+            await hook()
+        found = [m for m in self.messages if m.id > min_id]
+        found.sort(key=lambda m: m.id, reverse=not reverse)
+        return found[:limit]
+
+    async def deliver(self, message):
+        self.messages.append(message)
+        for handler in self.handlers:
+            await handler(Event(message))
+
+
+async def settle(rounds=50):
+    for _ in range(rounds):
+        await _real_sleep(0)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """Tmp cwd with a saved checkpoint (no bootstrap), recorded backoff delays, no jitter."""
+    monkeypatch.chdir(tmp_path)
+    with open(STATE_FILE, "w") as f:
+        json.dump({"last_message_id": 5}, f)
+    delays = []
+
+    async def sleep(delay, *args):
+        delays.append(delay)
+        await _real_sleep(0)
+
+    monkeypatch.setattr(telegram_service.asyncio, "sleep", sleep)
+    monkeypatch.setattr(telegram_service.random, "uniform", lambda a, b: 1.0)
+    METRICS.reset()
+    return delays
+
+
+def make_service(client):
+    delivered = []
+
+    def on_news(*args, trace=None, message_id=None):
+        delivered.append(message_id)
+
+    service = TelegramService(on_news, client_factory=lambda: client)
+    return service, delivered
+
+
+def test_reconnects_register_handlers_once_and_backoff_resets(env):
+    delays = env
+
+    async def scenario():
+        client = FakeClient(Message(i) for i in range(1, 6))
+        service, _ = make_service(client)
+        task = asyncio.create_task(service.start())
+        await settle()
+        assert service.ready.is_set()
+
+        # Enough failed attempts to reach the cap, then a successful one
+        client.fail_connects = 7
+        client.drop()
+        await settle(200)
+        assert delays == [1, 2, 4, 8, 16, 32, BACKOFF_MAX, BACKOFF_MAX]
+
+        # Connected again: the next outage starts from the minimum
+        client.drop()
+        await settle()
+        assert delays[-1] == 1
+
+        assert len(client.handlers) == 1
+        await service.stop()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(scenario())
+
+
+def test_catch_up_overlapping_live_handler_delivers_once(env):
+    async def scenario():
+        client = FakeClient(Message(i) for i in range(1, 6))
+        service, delivered = make_service(client)
+        task = asyncio.create_task(service.start())
+        await settle()
+
+        # 6 is posted while offline; the live update for 7 lands while the
+        # catch-up request after the reconnect is in flight
+        client.messages.append(Message(6))
+        client.on_fetch = lambda: client.deliver(Message(7))
+        client.drop()
+        await settle()
+
+        assert sorted(delivered) == [6, 7]
+        assert service.last_message_id == 7
+
+        await client.deliver(Message(7))
+        assert sorted(delivered) == [6, 7]
+
+        await service.stop()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(scenario())
+
+
+def test_outage_and_recovery_recorded(env):
+    async def scenario():
+        client = FakeClient(Message(i) for i in range(1, 6))
+        service, _ = make_service(client)
+        task = asyncio.create_task(service.start())
+        await settle()
+        assert "telegram.outage" not in METRICS.snapshot()["histograms"]
+
+        client.fail_connects = 1
+        client.drop()
+        await settle()
+        assert service.outage_started is None
+
+        snapshot = METRICS.snapshot()
+        assert snapshot["counters"]["telegram.disconnects"] == 1
+        assert snapshot["histograms"]["telegram.outage"]["count"] == 1
+        assert snapshot["histograms"]["telegram.recovery"]["count"] == 1
+
+        await service.stop()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(scenario())
+
+
+def test_broken_json_post_classified_without_marker(env):
+    service, _ = make_service(FakeClient())
+    message = Message(8)
+    message.message = 'json\nРакетна небезпека у Харківській області {"level": '
+    summary, original_text, level, regions, *_ = service._parse(message)
+    assert summary.startswith("Ракетна небезпека")
+    assert not original_text.startswith("json")
+    assert level == "HIGH"
+    assert regions == ["Харківська область"]
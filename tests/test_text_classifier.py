@@ -0,0 +1,34 @@
+"""Fallback classification of real channel phrasings."""
+import pytest
+
+from service.text_classifier import get_text_classifier
+
+
+@pytest.mark.parametrize("text, level, regions", [
+    ("Ракетна небезпека по всій країні", "HIGH", []),
+    ("Ракетна небезпека у Харківській області", "HIGH", ["Харківська область"]),
+    ("Загроза застосування балістики для Київщини", "CRITICAL", ["Київська область"]),
+    ("Небезпека БпЛА для Сумщини", "HIGH", ["Сумська область"]),
+    ("Харків, небезпека обстрілу", "HIGH", ["Харківська область"]),
+    ("Одещина - відбій тривоги", "LOW", ["Одеська область"]),
+    ("Розвідувальний БпЛА курсом на Полтаву", "HIGH", ["Полтавська область"]),
+    ("Тривога у Львові", "MEDIUM", ["Львівська область"]),
+])
+def test_phrasings(text, level, regions):
+    data = get_text_classifier().classify(text)
+    assert data["level"] == level
+    assert data["regions"] == regions
+    assert data["status"] == "normal"
+
+
+def test_whole_words_only():
+    # "сума" is not Суми, "ракетоносій" is not a missile
+    data = get_text_classifier().classify("Сума збору для ракетоносій")
+    assert data["regions"] == []
+    assert data["status"] == "ignore"
+
+
+def test_no_threat_no_region_is_ignored():
+    data = get_text_classifier().classify("Доброго ранку, підписники")
+    assert data["level"] == "LOW"
+    assert data["status"] == "ignore"
@@ -0,0 +1,140 @@
+import asyncio
+
+import flet as ft
+from service.log_service import get_logger
+
+logger = get_logger("UI")
+
+PERIODS = {"1": "Доба", "7": "Тиждень", "30": "30 днів"}
+TOP_REGIONS = 10
+TOP_PAIRS = 5
+BAR_HEIGHT = 60
+
+
+class AnalyticsDialog(ft.AlertDialog):
+    """Alert statistics from the hub's AlertTimeline; computed in a worker thread on open."""
+
+    def __init__(self, page: ft.Page, hub, scheduler):
+        super().__init__()
+        self.page = page
+        self.hub = hub
+        self.scheduler = scheduler
+        self.report = None
+
+        self.period_dropdown = ft.Dropdown(
+            label="Період",
+            options=[ft.dropdown.Option(key, text) for key, text in PERIODS.items()],
+            value="1",
+            on_change=self.on_period_change,
+            width=160
+        )
+        self.summary_text = ft.Text("", size=12, color=ft.Colors.GREY_400)
+        self.regions_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Регіон")),
+                ft.DataColumn(ft.Text("Тривог"), numeric=True),
+                ft.DataColumn(ft.Text("Хвилин"), numeric=True),
+                ft.DataColumn(ft.Text("Частка"), numeric=True),
+            ],
+            rows=[],
+            column_spacing=20,
+            data_row_max_height=32,
+        )
+        # Share of the time under alert per hour of day, all regions
+        self.hour_bars = ft.Row(spacing=2, vertical_alignment=ft.CrossAxisAlignment.END, height=BAR_HEIGHT)
+        self.pairs_column = ft.Column(spacing=2)
+        self.export_text = ft.Text("", size=12, color=ft.Colors.GREY_400, selectable=True)
+
+        self.title = ft.Text("Аналітика тривог")
+        self.content = ft.Column(
+            controls=[
+                ft.Row([self.period_dropdown, self.summary_text], spacing=15),
+                self.regions_table,
+                ft.Text("Погодинний профіль", weight=ft.FontWeight.BOLD, size=13),
+                self.hour_bars,
+                ft.Text("Найчастіше разом", weight=ft.FontWeight.BOLD, size=13),
+                self.pairs_column,
+                self.export_text,
+            ],
+            width=560,
+            height=560,
+            scroll=ft.ScrollMode.AUTO,
+            tight=True
+        )
+        self.actions = [
+            ft.TextButton("Експорт CSV/JSON", on_click=self.on_export_click),
+            ft.TextButton("Закрити", on_click=self.close_dialog)
+        ]
+
+    async def show(self):
+        self.page.open(self)
+        await self.refresh()
+
+    async def on_period_change(self, e):
+        await self.refresh()
+
+    async def refresh(self):
+        timeline = self.hub.timeline
+        if timeline is None:
+            self.summary_text.value = "Немає даних: сервіси не запущено"
+            self.scheduler.mark_dirty(self.summary_text)
+            return
+        self.summary_text.value = "Обчислення..."
+        self.scheduler.mark_dirty(self.summary_text)
+        try:
+            self.report = await asyncio.to_thread(timeline.report, int(self.period_dropdown.value))
+        except Exception as e:
+            logger.error(f"Error computing alert report: {e}")
+            self.summary_text.value = f"Помилка: {e}"
+            self.scheduler.mark_dirty(self.summary_text)
+            return
+        self._render(self.report)
+
+    def _render(self, report):
+        self.summary_text.value = (
+            f"{report['from']} — {report['to']}, покриття {report['coverage']:.0%}, "
+            f"{report['elapsed_ms']:.0f} мс"
+        )
+        self.regions_table.rows = [
+            ft.DataRow(cells=[
+                ft.DataCell(ft.Text(r["region"], size=12)),
+                ft.DataCell(ft.Text(str(r["alerts"]), size=12)),
+                ft.DataCell(ft.Text(str(r["minutes"]), size=12)),
+                ft.DataCell(ft.Text(f"{r['share']:.0%}", size=12)),
+            ])
+            for r in report["regions"][:TOP_REGIONS] if r["minutes"]
+        ]
+
+        peak = max(report["hour_profile"]) or 1
+        self.hour_bars.controls = [
+            ft.Container(
+                width=18,
+                height=max(2, BAR_HEIGHT * share / peak),
+                bgcolor=ft.Colors.RED_400 if share else ft.Colors.GREY_800,
+                tooltip=f"{hour:02d}:00 — {share:.0%}",
+                border_radius=2
+            )
+            for hour, share in enumerate(report["hour_profile"])
+        ]
+
+        self.pairs_column.controls = [
+            ft.Text(f"{p['a']} + {p['b']}: {p['minutes_together']} хв ({p['jaccard']:.0%})", size=12)
+            for p in report["pairs"][:TOP_PAIRS]
+        ] or [ft.Text("Немає даних", size=12, color=ft.Colors.GREY_500)]
+
+        self.scheduler.mark_dirty(self.content)
+
+    async def on_export_click(self, e):
+        if self.report is None:
+            return
+        from service.alert_analytics import export_report
+        try:
+            paths = await asyncio.to_thread(export_report, self.report)
+            self.export_text.value = "Збережено: " + ", ".join(paths)
+        except Exception as ex:
+            logger.error(f"Error exporting alert report: {ex}")
+            self.export_text.value = f"Помилка експорту: {ex}"
+        self.scheduler.mark_dirty(self.export_text)
+
+    def close_dialog(self, e):
+        self.page.close(self)
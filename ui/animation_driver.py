@@ -0,0 +1,87 @@
+import asyncio
+import math
+import threading
+from service.log_service import get_logger
+
+logger = get_logger("UI")
+
+
+class AnimationDriver:
+    """Runs card animation steps on the event loop instead of one thread per card.
+
+    Steps that fall into the same frame are applied together and handed to the
+    UpdateScheduler, so a burst of cards produces a single update.
+    """
+
+    ENTRANCE_DELAY = 0.05
+    FLIP_DURATION = 0.3
+
+    def __init__(self, scheduler, frame_budget=None):
+        self.scheduler = scheduler
+        self.frame_budget = frame_budget or scheduler.frame_budget
+        # frame slot -> [(card, step), ...]
+        self._slots = {}
+        self._lock = threading.Lock()
+
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    def _on_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def schedule(self, delay, card, step):
+        """Run `step()` for `card` after `delay` seconds, aligned to a frame slot."""
+        if self._loop is None:
+            step()
+            self.scheduler.mark_dirty(card)
+            return
+
+        if not self._on_loop_thread():
+            # Flet runs sync handlers (and did_mount) in worker threads
+            self._loop.call_soon_threadsafe(self.schedule, delay, card, step)
+            return
+
+        slot = math.ceil((self._loop.time() + delay) / self.frame_budget)
+        with self._lock:
+            steps = self._slots.get(slot)
+            if steps is None:
+                steps = self._slots[slot] = []
+                self._loop.call_at(slot * self.frame_budget, self._run_slot, slot)
+            steps.append((card, step))
+
+    def _run_slot(self, slot):
+        with self._lock:
+            steps = self._slots.pop(slot, [])
+
+        for card, step in steps:
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Animation step failed: {e}")
+                continue
+            self.scheduler.mark_dirty(card)
+
+    @staticmethod
+    def _is_onscreen(card):
+        return card.page is not None and card.visible is not False
+
+    def animate_in(self, card):
+        if not self._is_onscreen(card):
+            # Nobody will see it - jump straight to the final state
+            card.finish_entrance()
+            return
+        self.schedule(self.ENTRANCE_DELAY, card, card.finish_entrance)
+
+    def flip(self, card):
+        card.start_flip()
+        self.scheduler.mark_dirty(card)
+        self.schedule(self.FLIP_DURATION, card, card.finish_flip)
+
+    def pending(self):
+        with self._lock:
+            return sum(len(steps) for steps in self._slots.values())
@@ -1,26 +1,57 @@
 import flet as ft
-import json
-import os
+import asyncio
+import logging
+import time
+from service.log_service import add_sink, get_logger
+from service.metrics import METRICS, NULL_TRACE
+from service.history_store import HistoryStore, NewsRecord
+from service.profiler import Profiler
+from service.alert_playback import AlertStateLog
 from ui.components.news_card import NewsCard
 from ui.components.developer_console import DeveloperConsole
 from ui.components.map_component import MapComponent
-
-HISTORY_FILE = "history.json"
+from ui.components.map_view_bar import MapViewBar
+from ui.components.playback_bar import PlaybackBar
+from ui.frame_assets import get_frame_assets
+from ui.update_scheduler import UpdateScheduler
+from ui.animation_driver import AnimationDriver
 
 class AppLayout(ft.Row):
-    def __init__(self, page: ft.Page, on_clear_history=None, on_pulse_click=None):
+    def __init__(self, page: ft.Page, on_clear_history=None, on_pulse_click=None, scheduler=None, history=None, state_log=None, assets=None):
         super().__init__()
         self.page = page
+        # All UI updates go through the scheduler so bursts collapse into one diff per frame
+        self.scheduler = scheduler or UpdateScheduler(page)
+        # One event-loop driven animator for all cards (no per-card threads)
+        self.animator = AnimationDriver(self.scheduler)
         self.news_list_container = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, spacing=10)
         
         self.show_ignored_news = False
+        # Shared with the ingestion hub (and so with other sessions) when given
+        self.history = history or HistoryStore()
+        # Record id -> card, to fold near-duplicate posts into an existing card
+        self._cards_by_id = {}
+        # Off until started from the console (zero overhead)
+        self.profiler = Profiler()
 
         self.console = DeveloperConsole(
             on_clear_history_click=on_clear_history, 
             on_pulse_click=on_pulse_click,
-            on_toggle_ignored_click=self.toggle_ignored_view
+            on_toggle_ignored_click=self.toggle_ignored_view,
+            on_metrics_click=self.show_metrics,
+            scheduler=self.scheduler,
+            on_profile_click=self.toggle_profiling,
+            on_memory_click=self.take_memory_snapshot,
+            on_memory_stop_click=self.stop_memory_tracing
         )
-        self.map = MapComponent()
+        # Frames are served from the assets directory as content-addressed URLs
+        self.map = MapComponent(scheduler=self.scheduler, defer_load=True, assets=assets or get_frame_assets())
+        # Zoom to the user's oblast and per-level visibility
+        self.map_view = MapViewBar(self.map, self.scheduler)
+        # Time-travel over the recorded alert states (service.alert_playback)
+        self.playback_bar = PlaybackBar(self.map, state_log or AlertStateLog(), self.scheduler)
+        # Records from every component reach the console via the logging listener thread
+        add_sink(self.on_log_record)
         
         # Center Content: Map (initially visible? Request said: "Center if dev mode, Right if not")
         # Actually request said: "central part if developer mode is enabled, or right part if disabled"
@@ -38,7 +69,7 @@ class AppLayout(ft.Row):
             ),
             # Map
             ft.Container(
-                content=self.map,
+                content=ft.Column([self.map, self.map_view, self.playback_bar], spacing=5, expand=True),
                 expand=3 # More weight
             ),
             # Console (Right Side)
@@ -46,133 +77,164 @@ class AppLayout(ft.Row):
         ]
         self.expand = True
         self.vertical_alignment = ft.CrossAxisAlignment.START
-        
-        self.load_history()
 
     def toggle_ignored_view(self, show):
         self.show_ignored_news = show
-        try:
-            self.console.log(f"Ignored News Visibility: {show}")
-        except:
-            pass
+        self.log(f"Ignored News Visibility: {show}")
             
         for control in self.news_list_container.controls:
             if isinstance(control, NewsCard) and control.data == "ignore":
                 control.visible = show
-        self.page.update()
+        self.scheduler.mark_dirty(self.news_list_container)
+
+    def update_map(self, states, trace=NULL_TRACE):
+        with trace.span("map_render"):
+            self.map.update_alerts(states)
+        self._finish_trace_on_render(trace)
+
+    def _finish_trace_on_render(self, trace):
+        if trace is NULL_TRACE:
+            return
+        dirty_at = time.perf_counter()
+
+        def on_flushed():
+            trace.mark("render", since=dirty_at)
+            trace.finish()
+
+        self.scheduler.after_flush(on_flushed)
+
+    def show_metrics(self, e=None):
+        self.log("--- ЗАТРИМКИ (мс) ---")
+        for line in METRICS.format_lines():
+            self.log(line)
+        try:
+            path = METRICS.export()
+            self.log(f"Метрики збережено у {path}")
+        except Exception as ex:
+            self.log(f"Error exporting metrics: {ex}", level="ERROR")
 
-    def update_map(self, states):
-        self.map.update_alerts(states)
+    async def toggle_profiling(self, e=None):
+        # Async handler: start/stop run on the event loop thread, which is the one profiled
+        if not self.profiler.cpu_active:
+            self.profiler.start_cpu()
+            self.log("CPU профілювання запущено")
+        else:
+            try:
+                path, lines = self.profiler.stop_cpu()
+                for line in lines:
+                    self.log(line)
+                self.log(f"Звіт збережено у {path}")
+            except Exception as ex:
+                self.log(f"Error writing profile: {ex}", level="ERROR")
+        self.console.set_profiling_state(self.profiler.cpu_active, self.profiler.memory_active)
+
+    async def take_memory_snapshot(self, e=None):
+        try:
+            # Snapshot + statistics walk every traced block: off the event loop
+            path, lines = await asyncio.to_thread(self.profiler.take_snapshot)
+            for line in lines:
+                self.log(line)
+            if path:
+                self.log(f"Звіт збережено у {path}")
+        except Exception as ex:
+            self.log(f"Error taking memory snapshot: {ex}", level="ERROR")
+        self.console.set_profiling_state(self.profiler.cpu_active, self.profiler.memory_active)
+
+    def stop_memory_tracing(self, e=None):
+        self.profiler.stop_memory()
+        self.log("tracemalloc вимкнено")
+        self.console.set_profiling_state(self.profiler.cpu_active, self.profiler.memory_active)
 
     def highlight_regions(self, region_names):
         self.map.set_highlights(region_names)
         
-    def add_news(self, title, text, footer, time, bg_color, original_text=None, save=True, animate=True, regions=None, status="normal"):
-        # Add new card to the top
-        # For new items (save=True), we animate. For history (usually save=False), we can skip animation or fast forward.
-        # But user wants smooth appearance for NEW news.
+    def add_news(self, title, text, footer, time, bg_color, original_text=None, animate=True, regions=None, status="normal", trace=NULL_TRACE):
+        # A session-local card on top (not saved); posts are persisted by the ingestion hub
+        record = NewsRecord(title, text, footer, time, bg_color, regions=regions, status=status, original_text=original_text)
+        with trace.span("add_card"):
+            self._add_card(record, animate=animate)
+        self._finish_trace_on_render(trace)
+
+    def add_persisted_news(self, record, title, bg_color, original_text=None, animate=True, trace=NULL_TRACE):
+        # A record already written by the ingestion hub, shown with this session's
+        # classification; id/offset are kept so the back side reads the same line
+        view = record.view(title, bg_color, original_text=original_text)
+        with trace.span("add_card"):
+            self._add_card(view, animate=animate)
+        self._finish_trace_on_render(trace)
+
+    def add_persisted_news_batch(self, views):
+        """[(record, title, bg_color, original_text)] oldest first, inserted on top in one update, no animation."""
+        cards = [self._build_card(record.view(title, bg_color, original_text=original_text), animate=False)
+                 for record, title, bg_color, original_text in views]
+        cards.reverse()
+        self.news_list_container.controls[0:0] = cards
+        self.scheduler.mark_dirty(self.news_list_container)
+
+    def update_sources(self, record):
+        card = self._cards_by_id.get(record.id)
+        if card:
+            card.set_sources(record.sources)
+
+    def _add_card(self, record, animate=True):
+        card = self._build_card(record, animate)
+        self.news_list_container.controls.insert(0, card)
+        
+        # Schedule a render of the card in its initial (offset/transparent) state.
+        # Bursts of cards coalesce into a single update of the list.
+        self.scheduler.mark_dirty(self.news_list_container)
         
-        is_ignored = (status == "ignore")
+        # Entrance animation is driven by the AnimationDriver from did_mount
+
+    def _build_card(self, record, animate):
+        is_ignored = (record.status == "ignore")
         visible = True
         if is_ignored:
             visible = self.show_ignored_news
             
         card = NewsCard(
-            title, text, footer, time, bg_color, 
-            original_text=original_text, 
+            record,
+            load_original_text=self.history.get_original_text,
             animate_entrance=animate,
-            regions=regions, 
-            on_highlight=self.highlight_regions
+            on_highlight=self.highlight_regions,
+            scheduler=self.scheduler,
+            animator=self.animator
         )
         
         if is_ignored:
             card.data = "ignore"
             card.visible = visible
-            
-        self.news_list_container.controls.insert(0, card)
-        
-        # Update page to render the card in its initial (offset/transparent) state
-        self.page.update()
-        
-        # dynamic animation handled in did_mount via threading
-        
-        if save:
-            self.save_news_item({
-                "title": title,
-                "text": text,
-                "footer": footer,
-                "time": time,
-                "bg_color": bg_color,
-                "original_text": original_text,
-                "regions": regions,
-                "status": status
-            })
-
-    def save_news_item(self, item):
-        history = []
-        if os.path.exists(HISTORY_FILE):
-            try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            except Exception as e:
-                self.log(f"Error reading history: {e}")
-        
-        history.insert(0, item) # Prepend
-        
-        try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.log(f"Error saving history: {e}")
+        if record.id is not None:
+            self._cards_by_id[record.id] = card
+        return card
 
-    def load_history(self):
-        if not os.path.exists(HISTORY_FILE):
-            return
-            
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                history = json.load(f)
-                
-            # Iterate in reverse order so we insert them and they end up in correct order (or just insert at end?)
-            # add_news inserts at 0. So if history is [Newest, ..., Oldest]
-            # We should add Oldest first?
-            # actually add_news inserts at 0.
-            # If load_history reads [Item1, Item2, Item3] where Item1 is newest.
-            # We should add Item3, then Item2, then Item1.
-            
-            for item in reversed(history):
-                self.add_news(
-                    item.get("title"),
-                    item.get("text"),
-                    item.get("footer"),
-                    item.get("time"),
-                    item.get("bg_color"),
-                    original_text=item.get("original_text"),
-                    save=False,
-                    animate=False,
-                    regions=item.get("regions"),
-                    status=item.get("status", "normal")
-                )
-        except Exception as e:
-            self.log(f"Error loading history: {e}")
-
-    def clear_history(self, e):
+    async def load_history_async(self, records=None):
+        # File read/parse off the event loop, unless a snapshot (from the hub) is given
+        if records is None:
+            records = await asyncio.to_thread(self.history.load)
+
+        # Records come newest first. Anything already in the list arrived while
+        # loading and is newer, so history goes below it - in one update.
+        self.news_list_container.controls.extend(self._build_card(r, animate=False) for r in records)
+        self.scheduler.mark_dirty(self.news_list_container)
+        return len(records)
+
+    def clear_history(self, e=None):
+        # Cards only; the file and the shared records are cleared by the ingestion hub
         self.news_list_container.controls.clear()
-        
-        # Clear file
-        try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump([], f)
-            self.console.log("History cleared.")
-        except Exception as e:
-            self.console.log(f"Error clearing history file: {e}")
-            
-        self.page.update()
+        self._cards_by_id.clear()
+        self.scheduler.mark_dirty(self.news_list_container)
 
     def toggle_console(self, visible):
         self.console.visible = visible
-        self.page.update()
+        self.scheduler.mark_dirty(self)
+        if visible:
+            # Show what was buffered while the console was hidden
+            self.console.refresh()
+
+    def log(self, message, level="INFO", source="UI"):
+        get_logger(source).log(logging.getLevelName(level), message)
 
-    def log(self, message):
-        if self.console.visible:
-            self.console.log(message)
+    def on_log_record(self, record):
+        # Always buffered (bounded ring), rendered only while the console is visible
+        self.console.log(record.getMessage(), level=record.levelname, source=record.source, created=record.created)
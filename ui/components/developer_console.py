@@ -1,20 +1,103 @@
 import flet as ft
+import threading
+from collections import deque, namedtuple
 from datetime import datetime
+from ui.update_scheduler import request_update
+
+LogRecord = namedtuple("LogRecord", ["timestamp", "level", "source", "message"])
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+LEVEL_COLORS = {
+    "DEBUG": ft.Colors.GREY_500,
+    "INFO": ft.Colors.GREEN,
+    "WARNING": ft.Colors.AMBER,
+    "ERROR": ft.Colors.RED_400,
+    "CRITICAL": ft.Colors.RED_ACCENT,
+}
+SOURCES = ("Alerts", "Telegram", "UI")
+
 
 class DeveloperConsole(ft.Container):
-    def __init__(self, on_clear_history_click, on_pulse_click=None, on_toggle_ignored_click=None):
+    # Fixed-size ring buffer: memory and render cost do not grow with uptime
+    CAPACITY = 500
+    # Render at most ~4 times per second, however fast lines arrive
+    RENDER_INTERVAL = 0.25
+
+    def __init__(self, on_clear_history_click, on_pulse_click=None, on_toggle_ignored_click=None, on_metrics_click=None, scheduler=None, capacity=CAPACITY,
+                 on_profile_click=None, on_memory_click=None, on_memory_stop_click=None):
         super().__init__()
+        self.scheduler = scheduler
         self.on_clear_history_click = on_clear_history_click
         self.on_pulse_click = on_pulse_click
         self.on_toggle_ignored_click = on_toggle_ignored_click
-        
+
+        self.records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._render_pending = False
+        self.paused = False
+        self.min_level = LEVELS["DEBUG"]
+        self.enabled_sources = set(SOURCES)
+        # Pool of reusable rows, grows up to `capacity` and is never rebuilt
+        self._rows = []
+
         self.log_list = ft.ListView(
             expand=True,
             spacing=2,
             auto_scroll=True,
             padding=10
         )
-        
+
+        self.level_dropdown = ft.Dropdown(
+            options=[ft.dropdown.Option(level) for level in LEVELS],
+            value="DEBUG",
+            width=110,
+            text_size=12,
+            dense=True,
+            on_change=self.on_level_change
+        )
+
+        self.source_checks = [
+            ft.Checkbox(label=source, value=True, data=source, on_change=self.on_source_change)
+            for source in SOURCES
+        ]
+
+        self.metrics_btn = ft.IconButton(
+            icon=ft.Icons.TIMER,
+            icon_color=ft.Colors.GREEN,
+            tooltip="Затримки (p50/p95/p99) + експорт",
+            on_click=on_metrics_click
+        )
+
+        # Profiling (service.profiler): nothing is traced until one of these is clicked
+        self.profile_btn = ft.IconButton(
+            icon=ft.Icons.SPEED,
+            icon_color=ft.Colors.GREEN,
+            tooltip="CPU профіль: старт",
+            on_click=on_profile_click
+        )
+
+        self.memory_btn = ft.IconButton(
+            icon=ft.Icons.MEMORY,
+            icon_color=ft.Colors.GREEN,
+            tooltip="Знімок пам'яті (tracemalloc)",
+            on_click=on_memory_click
+        )
+
+        self.memory_stop_btn = ft.IconButton(
+            icon=ft.Icons.STOP_CIRCLE,
+            icon_color=ft.Colors.RED_400,
+            tooltip="Вимкнути tracemalloc",
+            visible=False,
+            on_click=on_memory_stop_click
+        )
+
+        self.pause_btn = ft.IconButton(
+            icon=ft.Icons.PAUSE,
+            icon_color=ft.Colors.GREEN,
+            tooltip="Пауза",
+            on_click=self.toggle_pause
+        )
+
         self.clear_history_btn = ft.ElevatedButton(
             "Очистити історію",
             icon=ft.Icons.DELETE_SWEEP,
@@ -36,7 +119,7 @@ class DeveloperConsole(ft.Container):
             ),
             on_click=self.on_pulse_click
         )
-        
+
         self.toggle_ignored_btn = ft.ElevatedButton(
             "Ignored: OFF", # Initial State Text
             icon=ft.Icons.VISIBILITY_OFF,
@@ -47,10 +130,12 @@ class DeveloperConsole(ft.Container):
             ),
             on_click=lambda e: self.toggle_ignored_state(e)
         )
-        
+
         self.content = ft.Column(
             controls=[
                 ft.Text("DEVELOPER CONSOLE", color=ft.Colors.GREEN, weight=ft.FontWeight.BOLD),
+                ft.Row([self.level_dropdown, ft.Row([self.profile_btn, self.memory_btn, self.memory_stop_btn, self.metrics_btn, self.pause_btn], spacing=0)], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                ft.Row(self.source_checks, spacing=0),
                 ft.Divider(color=ft.Colors.GREEN_900),
                 self.log_list,
                 ft.Row([self.clear_history_btn, self.pulse_btn, self.toggle_ignored_btn], alignment=ft.MainAxisAlignment.CENTER)
@@ -58,7 +143,7 @@ class DeveloperConsole(ft.Container):
             alignment=ft.MainAxisAlignment.START,
             expand=True
         )
-        
+
         self.width = 400
         self.bgcolor = ft.Colors.BLACK
         self.border = ft.border.all(1, ft.Colors.GREEN_900)
@@ -71,7 +156,7 @@ class DeveloperConsole(ft.Container):
         is_active = self.toggle_ignored_btn.text == "Ignored: ON"
         # Toggle
         new_state = not is_active
-        
+
         if new_state:
             self.toggle_ignored_btn.text = "Ignored: ON"
             self.toggle_ignored_btn.icon = ft.Icons.VISIBILITY
@@ -80,19 +165,84 @@ class DeveloperConsole(ft.Container):
             self.toggle_ignored_btn.text = "Ignored: OFF"
             self.toggle_ignored_btn.icon = ft.Icons.VISIBILITY_OFF
             self.toggle_ignored_btn.style.bgcolor = ft.Colors.GREY_700
-            
-        self.toggle_ignored_btn.update()
-        
+
+        request_update(self.scheduler, self.toggle_ignored_btn)
+
         if self.on_toggle_ignored_click:
             self.on_toggle_ignored_click(new_state)
 
-    def log(self, message: str):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_line = ft.Text(f"[{timestamp}] {message}", color=ft.Colors.GREEN, font_family="Consolas, monospace", size=12)
-        self.log_list.controls.append(log_line)
-        self.update()
+    def set_profiling_state(self, cpu_active, memory_active):
+        self.profile_btn.icon = ft.Icons.STOP if cpu_active else ft.Icons.SPEED
+        self.profile_btn.icon_color = ft.Colors.RED_400 if cpu_active else ft.Colors.GREEN
+        self.profile_btn.tooltip = "CPU профіль: стоп і звіт" if cpu_active else "CPU профіль: старт"
+        self.memory_btn.icon_color = ft.Colors.AMBER if memory_active else ft.Colors.GREEN
+        self.memory_stop_btn.visible = memory_active
+        request_update(self.scheduler, self.profile_btn)
+        request_update(self.scheduler, self.memory_btn)
+        request_update(self.scheduler, self.memory_stop_btn)
+
+    def toggle_pause(self, e):
+        self.paused = not self.paused
+        self.pause_btn.icon = ft.Icons.PLAY_ARROW if self.paused else ft.Icons.PAUSE
+        self.pause_btn.tooltip = "Продовжити" if self.paused else "Пауза"
+        request_update(self.scheduler, self.pause_btn)
+        if not self.paused:
+            self.refresh()
+
+    def on_level_change(self, e):
+        self.min_level = LEVELS.get(e.control.value, LEVELS["DEBUG"])
+        self.refresh()
+
+    def on_source_change(self, e):
+        if e.control.value:
+            self.enabled_sources.add(e.control.data)
+        else:
+            self.enabled_sources.discard(e.control.data)
+        self.refresh()
+
+    def log(self, message: str, level="INFO", source="UI", created=None):
+        """Buffers a line; safe to call from any thread and at any rate."""
+        timestamp = (datetime.fromtimestamp(created) if created else datetime.now()).strftime("%H:%M:%S")
+        with self._lock:
+            self.records.append(LogRecord(timestamp, level, source, message))
+        self.refresh()
+
+    def refresh(self):
+        """Schedules a batched render of the buffer."""
+        with self._lock:
+            if self._render_pending:
+                return
+            self._render_pending = True
+
+        if self.scheduler:
+            self.scheduler.call_later(self.RENDER_INTERVAL, self._render)
+        else:
+            self._render()
+
+    def _is_shown(self, record):
+        if LEVELS.get(record.level, LEVELS["INFO"]) < self.min_level:
+            return False
+        # Lines from unknown sources are always shown
+        return record.source not in SOURCES or record.source in self.enabled_sources
+
+    def _render(self):
+        with self._lock:
+            self._render_pending = False
+            if self.paused or not self.visible:
+                return
+            shown = [r for r in self.records if self._is_shown(r)]
+
+        while len(self._rows) < len(shown):
+            self._rows.append(ft.Text(font_family="Consolas, monospace", size=12))
+
+        for row, record in zip(self._rows, shown):
+            row.value = f"[{record.timestamp}] {record.level[0]} {record.source}: {record.message}"
+            row.color = LEVEL_COLORS.get(record.level, ft.Colors.GREEN)
+
+        self.log_list.controls = self._rows[:len(shown)]
+        request_update(self.scheduler, self.log_list)
 
     def clear_logs(self):
-        self.log_list.controls.clear()
+        with self._lock:
+            self.records.clear()
         self.log("Console cleared.")
-        self.update()
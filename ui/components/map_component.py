@@ -1,46 +1,37 @@
 import flet as ft
-import xml.etree.ElementTree as ET
-import base64
-
-# Mapping from API Region Names -> SVG IDs
-# Based on ISO 3166-2:UA and common naming in alerts APIs
-REGION_MAPPING = {
-    "Вінницька область": "UA-05",
-    "Волинська область": "UA-07",
-    "Дніпропетровська область": "UA-12",
-    "Донецька область": "UA-14",
-    "Житомирська область": "UA-18",
-    "Закарпатська область": "UA-21",
-    "Запорізька область": "UA-23",
-    "Івано-Франківська область": "UA-26",
-    "Київська область": "UA-32", # Usually 32 is region, 30 is city. Need to check svg for both or just one.
-    "м. Київ": "UA-30",
-    "Кіровоградська область": "UA-35",
-    "Луганська область": "UA-09",
-    "Львівська область": "UA-46",
-    "Миколаївська область": "UA-48",
-    "Одеська область": "UA-51",
-    "Полтавська область": "UA-53",
-    "Рівненська область": "UA-56",
-    "Сумська область": "UA-59",
-    "Тернопільська область": "UA-61",
-    "Харківська область": "UA-63",
-    "Херсонська область": "UA-65",
-    "Хмельницька область": "UA-68",
-    "Черкаська область": "UA-71",
-    "Чернівецька область": "UA-77",
-    "Чернігівська область": "UA-74",
-    "Автономна Республіка Крим": "UA-43",
-    "м. Севастополь": "UA-40"
-}
+import asyncio
+import os
+from service.log_service import get_logger
+from service.metrics import METRICS
+from service.regions import REGION_MAPPING, region_svg_id
+from ui.map_renderer import get_renderer
+from ui.update_scheduler import request_update
+
+logger = get_logger("UI")
+
+# Last neutral frame (base64), shown on cold start before the SVG is parsed
+FRAME_CACHE_FILE = "map_frame.cache"
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
 
 class MapComponent(ft.Container):
-    def __init__(self, svg_path="ukraine.svg"):
+    def __init__(self, svg_path="ukraine.svg", scheduler=None, defer_load=False, frame_cache_path=FRAME_CACHE_FILE, assets=None):
         super().__init__()
+        self.scheduler = scheduler
+        # ui.frame_assets.FrameAssets: frames go out as short URLs; None = inline base64
+        self.assets = assets
+        self.frame = None
+        self._publish_task = None
         self.svg_path = svg_path
-        self.tree = None
-        self.root = None
-        self.svg_content = ""
+        self.frame_cache_path = frame_cache_path
+        # Shared, process-wide geometry + frame cache (ui.map_renderer)
+        self.renderer = None
         self.image_control = ft.Image(src_base64="", fit=ft.ImageFit.CONTAIN, expand=True)
         self.content = self.image_control
         
@@ -50,188 +41,180 @@ class MapComponent(ft.Container):
         # But previous issue was visibility. Let's keep expand=True on Component itself.
         self.expand = True
         
+        self.alert_states = {}
         self.active_alert_ids = set()
         self.highlighted_ids = set()
+        # Visible geometry levels (None = all) and the oblast the view is zoomed to
+        self.visible_levels = None
+        self.zoom_id = None
+        # Time-travel: live alert updates are kept but not shown until exit_playback()
+        self.playback = False
         
-        # Load initial SVG
-        self.load_svg()
+        if defer_load:
+            # Cold start: paint the cached frame now, parse the SVG later (load_svg_async)
+            self._show_cached_frame()
+        else:
+            # Load initial SVG
+            self.load_svg()
+
+    def _show_cached_frame(self):
+        try:
+            if os.path.exists(self.frame_cache_path) and os.path.getmtime(self.frame_cache_path) >= os.path.getmtime(self.svg_path):
+                with open(self.frame_cache_path, "r", encoding="ascii") as f:
+                    self.image_control.src_base64 = f.read()
+        except Exception as e:
+            logger.warning(f"Map frame cache unavailable: {e}")
+
+    def _write_frame_cache(self, b64):
+        try:
+            with open(self.frame_cache_path, "w", encoding="ascii") as f:
+                f.write(b64)
+        except Exception as e:
+            logger.warning(f"Error writing map frame cache: {e}")
+
+    async def load_svg_async(self):
+        """Parses the SVG off the event loop, then renders the current alert state."""
+        try:
+            self.renderer = await asyncio.to_thread(get_renderer, self.svg_path)
+        except Exception as e:
+            logger.error(f"Error loading SVG: {e}")
+            self.content = ft.Text(f"Error loading map.svg: {e}", color=ft.Colors.RED)
+            request_update(self.scheduler, self)
+            return
+
+        # Alerts that arrived before the geometry was parsed may name raions/hromadas
+        self.active_alert_ids = self._resolve_alerts(self.alert_states)
+        neutral = not self.active_alert_ids and not self.highlighted_ids
+        self.render_map_state()
+        if neutral and self.frame is not None:
+            await asyncio.to_thread(self._write_frame_cache, self.frame.b64)
 
     def load_svg(self):
         try:
-            # Register namespaces to prevent ns0: prefixes
-            ET.register_namespace("", "http://www.w3.org/2000/svg")
-            ET.register_namespace("mapsvg", "http://mapsvg.com")
-            
-            self.tree = ET.parse(self.svg_path)
-            self.root = self.tree.getroot()
-            
-            # Fix SVG scaling: Add viewBox if missing
-            width = self.root.get('width')
-            height = self.root.get('height')
-            if width and height:
-                 if 'viewBox' not in self.root.attrib:
-                     w = width.replace('pt', '').replace('px', '')
-                     h = height.replace('pt', '').replace('px', '')
-                     self.root.set('viewBox', f"0 0 {w} {h}")
-                 
-                 # Remove width/height to let Flutter handle scaling via viewBox + fit
-                 if 'width' in self.root.attrib: del self.root.attrib['width']
-                 if 'height' in self.root.attrib: del self.root.attrib['height']
-                 
-            # Set default style for all paths
-            # SVG uses 'path' elements.
-            # We explicitly set fill to a visible neutral color
-            for elem in self.root.iter():
-                # Namespace handling: ElementTree might tag as {http://www.w3.org/2000/svg}path
-                if elem.tag.endswith('path'):
-                    # Check if it has an ID, if so, color it neutral
-                    if elem.get('id'):
-                        elem.set("fill", "#2D2D2D") # Neutral Dark Grey
-                        elem.set("stroke", "#606060") # Lighter Grey Stroke
-                        elem.set("stroke-width", "1")
-
-            self.update_map_image()
+            self.renderer = get_renderer(self.svg_path)
+            self.render_map_state()
             
         except Exception as e:
-            print(f"Error loading SVG: {e}")
+            logger.error(f"Error loading SVG: {e}")
             self.content = ft.Text(f"Error loading map.svg: {e}", color=ft.Colors.RED)
 
-    def update_alerts(self, states):
-        if not self.root:
-            return
+    def _resolve_alerts(self, states):
+        return self._resolve_names(name for name, data in states.items() if data.get("alertnow"))
 
+    def _resolve_names(self, region_names, lookup=REGION_MAPPING.get):
         # active_ids = set of IDs that are alerts
-        self.active_alert_ids = set()
-        for region_name, data in states.items():
-            if data.get("alertnow"): # Boolean true
-                svg_id = REGION_MAPPING.get(region_name)
-                if svg_id:
-                    self.active_alert_ids.add(svg_id)
+        active_ids = set()
+        for region_name in region_names:
+            svg_id = lookup(region_name)
+            # District/hromada names are looked up in the geometry file itself
+            if not svg_id and self.renderer is not None:
+                svg_id = self.renderer.region_id(region_name)
+            if svg_id:
+                active_ids.add(svg_id)
+        return active_ids
+
+    def update_alerts(self, states):
+        self.alert_states = states
+        if self.playback:
+            return
+        self.active_alert_ids = self._resolve_alerts(states)
         
-        self.render_map_state()
+        # Before the SVG is parsed (cold start) the state is kept and rendered by load_svg_async
+        if self.renderer is not None:
+            self.render_map_state()
+
+    def enter_playback(self):
+        self.playback = True
+
+    def show_playback_state(self, region_names):
+        """Shows a recorded state (names under alert); frames come from the renderer cache."""
+        if not self.playback or self.renderer is None:
+            return
+        active = self._resolve_names(region_names)
+        if active != self.active_alert_ids:
+            self.active_alert_ids = active
+            self.render_map_state()
 
-    # Common City/Short names to Full Region Names mapping
-    CITY_TO_REGION_MAPPING = {
-        "Вінниця": "Вінницька область",
-        "Дніпро": "Дніпропетровська область",
-        "Донецьк": "Донецька область",
-        "Житомир": "Житомирська область",
-        "Запоріжжя": "Запорізька область",
-        "Івано-Франківськ": "Івано-Франківська область",
-        "Київ": "м. Київ", # Or Київська область depending on context, usually City for alerts
-        "Кропивницький": "Кіровоградська область",
-        "Луганськ": "Луганська область",
-        "Луцьк": "Волинська область",
-        "Львів": "Львівська область",
-        "Миколаїв": "Миколаївська область",
-        "Одеса": "Одеська область",
-        "Полтава": "Полтавська область",
-        "Рівне": "Рівненська область",
-        "Суми": "Сумська область",
-        "Тернопіль": "Тернопільська область",
-        "Ужгород": "Закарпатська область",
-        "Харків": "Харківська область",
-        "Херсон": "Херсонська область",
-        "Хмельницький": "Хмельницька область",
-        "Черкаси": "Черкаська область",
-        "Чернівці": "Чернівецька область",
-        "Чернігів": "Чернігівська область",
-        "Сімферополь": "Автономна Республіка Крим",
-        "Крим": "Автономна Республіка Крим",
-        "Севастополь": "м. Севастополь"
-    }
+    def exit_playback(self):
+        self.playback = False
+        self.update_alerts(self.alert_states)
 
     def set_highlights(self, region_names):
         """Highlight specific regions (e.g. on hover) without changing alert state"""
-        if not self.root:
+        if self.renderer is None:
             return
             
-        new_highlights = set()
-        if region_names:
-            if isinstance(region_names, str):
-                region_names = [region_names]
-                
-            for name in region_names:
-                name = name.strip()
-                svg_id = None
-                
-                # 1. Direct Match
-                svg_id = REGION_MAPPING.get(name)
-                
-                # 2. City Mapping (Robust)
-                if not svg_id:
-                    full_name = self.CITY_TO_REGION_MAPPING.get(name)
-                    if full_name:
-                        svg_id = REGION_MAPPING.get(full_name)
-                        
-                # 3. "Область" suffix check (e.g. input "Вінницька" -> "Вінницька область")
-                if not svg_id and "область" not in name:
-                     potential_name = f"{name} область"
-                     svg_id = REGION_MAPPING.get(potential_name)
-
-                # 4. Partial / Case-insensitive Search
-                if not svg_id:
-                     name_lower = name.lower()
-                     for key, val in REGION_MAPPING.items():
-                         if name_lower in key.lower(): 
-                             svg_id = val
-                             break
-
-                if svg_id:
-                    new_highlights.add(svg_id)
-                else:
-                    print(f"DEBUG: Could not map region name '{name}' to SVG ID")
-        
-        print(f"DEBUG: Highlight IDs: {new_highlights}")
+        if isinstance(region_names, str):
+            region_names = [region_names]
+        # Post names (short forms, cities -> their oblast), then raions/hromadas in the geometry
+        new_highlights = self._resolve_names(region_names or (), lookup=region_svg_id)
+
+        logger.debug(f"Highlight IDs: {new_highlights}")
         if self.highlighted_ids != new_highlights:
             self.highlighted_ids = new_highlights
             self.render_map_state()
 
+    def set_levels(self, levels):
+        """Show only these geometry levels (ui.map_renderer.OBLAST/RAION/HROMADA); None shows all."""
+        self.visible_levels = set(levels) if levels is not None else None
+        if self.renderer is not None:
+            self.render_map_state()
+
+    def zoom_to(self, region_name):
+        """Frame one oblast (any region name it contains); None shows the whole country."""
+        zoom_id = None
+        if region_name:
+            zoom_id = next(iter(self._resolve_names([region_name], lookup=region_svg_id)), None)
+        self.zoom_id = zoom_id
+        if self.renderer is not None:
+            self.render_map_state()
+
+    def available_levels(self):
+        """Geometry levels present in the map file (empty before it is parsed)."""
+        return sorted(self.renderer.ids_by_level) if self.renderer is not None else []
+
     def render_map_state(self):
-        # Iterate all paths and update fill
-        for elem in self.root.iter():
-            if elem.tag.endswith('path'):
-                elem_id = elem.get("id")
-                if elem_id:
-                    # Priority: Highlight > Alert > Normal
-                    # Actually, we might want to show Alert color BUT highlighted (brighter)?
-                    # User asked for "Highlight regions on hover".
-                    
-                    fill_color = "#2D2D2D" # Default
-                    stroke_color = "#606060"
-                    stroke_width = "1"
-                    
-                    is_alert = elem_id in self.active_alert_ids
-                    is_highlight = elem_id in self.highlighted_ids
-                    
-                    if is_alert:
-                        fill_color = "#CC0000" # Red
-                        
-                    if is_highlight:
-                        # If it's an alert, make it brighter red? or White overlay?
-                        if is_alert:
-                             fill_color = "#FF3333" # Brighter Red
-                             stroke_color = "#FFFFFF"
-                             stroke_width = "2"
-                        else:
-                             fill_color = "#707070" # Much Lighter Grey (Highlight) for visibility
-                             stroke_color = "#FFFFFF"
-                             stroke_width = "1.5"
-                             
-                    elem.set("fill", fill_color)
-                    elem.set("stroke", stroke_color)
-                    elem.set("stroke-width", stroke_width)
-
-        self.update_map_image()
-
-    def update_map_image(self):
-        # Serialize XML to string, ensuring we don't mess up encoding
-        svg_str = ET.tostring(self.root, encoding='utf8', method='xml').decode('utf8')
-        
-        # Encode to base64
-        b64 = base64.b64encode(svg_str.encode('utf-8')).decode('utf-8')
-        
-        self.image_control.src_base64 = b64
-        self.image_control.src = "" # Ensure we are using base64
-        if self.image_control.page:
-            self.image_control.update()
+        # Frames are cached by state in the shared renderer: toggling a highlight
+        # back and forth, or N sessions showing the same alerts, renders once
+        frame = self.renderer.render(self.active_alert_ids, self.highlighted_ids, levels=self.visible_levels, zoom=self.zoom_id)
+        self.update_map_image(frame)
+
+    def update_map_image(self, frame):
+        if self.frame is not None and self.frame.digest == frame.digest:
+            return
+        self.frame = frame
+        if self.assets is not None:
+            # Content-addressed: the client caches every frame it has already seen
+            payload = self.assets.cached_url(frame)
+            if payload is None:
+                if _on_event_loop():
+                    # New frame: written in a worker thread, sent once it is on disk
+                    self._publish_task = asyncio.create_task(self._publish(frame))
+                    return
+                payload = self.assets.url_for(frame)
+            self._send_url(payload)
+        else:
+            payload = frame.b64
+            self.image_control.src_base64 = payload
+            self.image_control.src = "" # Ensure we are using base64
+            self._sent(payload)
+
+    async def _publish(self, frame):
+        try:
+            url = await self.assets.url_for_async(frame)
+        except Exception as e:
+            logger.error(f"Error writing map frame: {e}")
+            return
+        # A newer frame may have been shown meanwhile
+        if self.frame is frame:
+            self._send_url(url)
+
+    def _send_url(self, url):
+        self.image_control.src = url
+        self.image_control.src_base64 = None
+        self._sent(url)
+
+    def _sent(self, payload):
+        METRICS.increment("map.updates")
+        METRICS.increment("map.bytes_sent", len(payload))
+        request_update(self.scheduler, self.image_control)
@@ -0,0 +1,63 @@
+import flet as ft
+from ui.map_renderer import HROMADA, OBLAST, RAION
+
+LEVEL_LABELS = {OBLAST: "Області", RAION: "Райони", HROMADA: "Громади"}
+
+
+class MapViewBar(ft.Container):
+    """Map view controls under the map: zoom to the user's oblast and which geometry levels are drawn.
+
+    Level toggles appear only for levels the map file actually has (refresh()
+    after the SVG is parsed); with a single level there is nothing to toggle.
+    """
+
+    def __init__(self, map_component, scheduler):
+        super().__init__()
+        self.map = map_component
+        self.scheduler = scheduler
+        self.region = None
+        self.zoomed = False
+
+        self.zoom_btn = ft.IconButton(
+            icon=ft.Icons.ZOOM_IN_MAP, icon_color=ft.Colors.BLUE_400, tooltip="Мій регіон",
+            on_click=self.on_zoom_click, disabled=True
+        )
+        self.level_boxes = {
+            level: ft.Checkbox(label=label, value=True, data=level, visible=False, on_change=self.on_level_change)
+            for level, label in LEVEL_LABELS.items()
+        }
+
+        self.content = ft.Row(
+            controls=[self.zoom_btn, *self.level_boxes.values()],
+            spacing=5,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER
+        )
+
+    def refresh(self):
+        levels = self.map.available_levels()
+        for level, box in self.level_boxes.items():
+            box.visible = len(levels) > 1 and level in levels
+        self.scheduler.mark_dirty(self)
+
+    def set_region(self, region):
+        """The user's region (settings); the zoom follows it while zoomed in."""
+        self.region = region
+        self.zoom_btn.disabled = not region
+        if self.zoomed or not region:
+            self._zoom(bool(region))
+        self.scheduler.mark_dirty(self.zoom_btn)
+
+    def on_zoom_click(self, e):
+        self._zoom(not self.zoomed)
+
+    def _zoom(self, zoomed):
+        self.zoomed = zoomed
+        self.map.zoom_to(self.region if zoomed else None)
+        self.zoom_btn.icon = ft.Icons.ZOOM_OUT_MAP if zoomed else ft.Icons.ZOOM_IN_MAP
+        self.zoom_btn.tooltip = "Вся країна" if zoomed else "Мій регіон"
+        self.scheduler.mark_dirty(self.zoom_btn)
+
+    def on_level_change(self, e):
+        shown = [level for level, box in self.level_boxes.items() if box.visible and box.value]
+        # Everything checked: None, the same frames as before any toggle
+        self.map.set_levels(None if len(shown) == len(self.map.available_levels()) else shown)
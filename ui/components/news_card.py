@@ -1,90 +1,85 @@
 import flet as ft
-from datetime import datetime
-import threading
+from collections import namedtuple
+from service.log_service import get_logger
+from ui.update_scheduler import request_update
+
+logger = get_logger("UI")
+
+CardStyle = namedtuple("CardStyle", ["gradient", "indicator_color", "text_color"])
+
+
+def _gradient(start, end):
+    return ft.LinearGradient(
+        begin=ft.alignment.top_left,
+        end=ft.alignment.bottom_right,
+        colors=[start, end]
+    )
+
+# Shared per-level styles, built once and reused by every card (flyweight).
+# Keyed by the flat 'bg_color' that main logic / history pass in.
+CARD_STYLES = {
+    ft.Colors.GREEN_700: CardStyle(_gradient(ft.Colors.GREEN_900, ft.Colors.GREEN_500), ft.Colors.GREEN_300, ft.Colors.WHITE),
+    ft.Colors.YELLOW_700: CardStyle(_gradient(ft.Colors.YELLOW_900, ft.Colors.YELLOW_600), ft.Colors.YELLOW_300, ft.Colors.WHITE),
+    ft.Colors.ORANGE_700: CardStyle(_gradient(ft.Colors.ORANGE_900, ft.Colors.ORANGE_500), ft.Colors.ORANGE_300, ft.Colors.WHITE),
+    ft.Colors.RED_700: CardStyle(_gradient(ft.Colors.RED_900, ft.Colors.RED_500), ft.Colors.RED_300, ft.Colors.WHITE),
+    ft.Colors.BLUE_GREY_700: CardStyle(_gradient(ft.Colors.BLUE_GREY_900, ft.Colors.BLUE_GREY_500), ft.Colors.BLUE_GREY_200, ft.Colors.WHITE),
+}
+# Fallback for unknown colors: flat bgcolor, no gradient
+DEFAULT_STYLE = CardStyle(None, ft.Colors.GREY_400, ft.Colors.WHITE)
+
+CARD_MARGIN = ft.margin.symmetric(vertical=10, horizontal=20)
+CARD_SCALE_ANIMATION = ft.Animation(300, ft.AnimationCurve.EASE_IN_OUT)
+
+
+def sources_label(sources):
+    extra = sources - 1
+    if extra % 10 == 1 and extra % 100 != 11:
+        word = "джерело"
+    elif 2 <= extra % 10 <= 4 and not 12 <= extra % 100 <= 14:
+        word = "джерела"
+    else:
+        word = "джерел"
+    return f"+{extra} {word}"
+
 
 class NewsCard(ft.Container):
-    def __init__(self, title: str, text: str, footer: str, created_at: str, bg_color: str, original_text: str = None, animate_entrance: bool = True, regions=None, on_highlight=None):
+    def __init__(self, record, load_original_text=None, animate_entrance: bool = True, on_highlight=None, scheduler=None, animator=None):
         super().__init__()
-        self.title = title
-        self.text = text
-        self.footer = footer
-        self.created_at = created_at
-        self.original_text = original_text 
-        self.regions = regions
+        self.scheduler = scheduler
+        self.animator = animator
+        # NewsRecord (service.history_store) - the original text is not kept on the card,
+        # it is fetched via load_original_text(record) on the first flip.
+        self.record = record
+        self.load_original_text = load_original_text
         self.on_highlight = on_highlight
-        
-        # Map flat colors to Gradients
-        # This is a heuristic since we receive 'bg_color' as a string/value from main logic.
-        # We can map specific known colors to cool gradients.
-        
-        self.gradient = None
-        # Default fallback
-        self.bgcolor = bg_color 
-        
-        # Define Gradients
-        if bg_color == ft.Colors.GREEN_700:
-            self.bgcolor = None
-            self.gradient = ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[ft.Colors.GREEN_900, ft.Colors.GREEN_500]
-            )
-            indicator_color = ft.Colors.GREEN_300
-        elif bg_color == ft.Colors.YELLOW_700:
-            self.bgcolor = None
-            self.gradient = ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[ft.Colors.YELLOW_900, ft.Colors.YELLOW_600]
-            )
-            indicator_color = ft.Colors.YELLOW_300
-        elif bg_color == ft.Colors.ORANGE_700:
-            self.bgcolor = None
-            self.gradient = ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[ft.Colors.ORANGE_900, ft.Colors.ORANGE_500]
-            )
-            indicator_color = ft.Colors.ORANGE_300
-        elif bg_color == ft.Colors.RED_700:
-            self.bgcolor = None
-            self.gradient = ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[ft.Colors.RED_900, ft.Colors.RED_500]
-            )
-            indicator_color = ft.Colors.RED_300
-        elif bg_color == ft.Colors.BLUE_GREY_700:
+
+        style = CARD_STYLES.get(record.bg_color)
+        if style:
             self.bgcolor = None
-            self.gradient = ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[ft.Colors.BLUE_GREY_900, ft.Colors.BLUE_GREY_500]
-            )
-            indicator_color = ft.Colors.BLUE_INFO_200
+            self.gradient = style.gradient
         else:
-             # Fallback for unknown colors
-             indicator_color = ft.Colors.GREY_400
-            
-        text_color = ft.Colors.WHITE
-        
-        # Helper to rebuild content with correct indicator color
-        self.indicator_color = indicator_color 
-        self.text_color = text_color
-        
+            style = DEFAULT_STYLE
+            self.bgcolor = record.bg_color
+        self.card_style = style
+
         self.border_radius = 12
         self.padding = 20
-        self.margin = ft.margin.symmetric(vertical=10, horizontal=20) 
-        
-        self.animate_scale = ft.Animation(300, ft.AnimationCurve.EASE_IN_OUT)
+        self.margin = CARD_MARGIN
+
+        self.animate_scale = CARD_SCALE_ANIMATION
         self.scale = ft.Scale(1, 1)
         
         self.on_hover = self.hover_card
         self.on_click = self.flip_card
 
-        # Initial Content
+        # "+N джерел" badge for folded near-duplicate posts
+        self._sources_text = ft.Text(sources_label(record.sources), color=ft.Colors.WHITE70, size=12, visible=record.sources > 1)
+
+        # Faces are built once; the back face only on the first flip
         self.is_front = True
-        self.content = self._build_front_content()
+        self._front = self._build_front_content()
+        self._back = None
+        self.content = self._front
         
         # Initial State
         self.should_animate = animate_entrance
@@ -96,14 +91,29 @@ class NewsCard(ft.Container):
             self.opacity = 1
             self.offset = ft.Offset(0, 0)
 
+    @property
+    def regions(self):
+        return self.record.regions
+
+    def set_sources(self, sources):
+        self.record.sources = sources
+        self._sources_text.value = sources_label(sources)
+        self._sources_text.visible = sources > 1
+        request_update(self.scheduler, self._sources_text)
+
     def did_mount(self):
-        if self.should_animate:
-            threading.Timer(0.05, self._animate_in).start()
+        if not self.should_animate:
+            return
+        if self.animator:
+            self.animator.animate_in(self)
+        else:
+            self.finish_entrance()
+            request_update(self.scheduler, self)
 
-    def _animate_in(self):
+    def finish_entrance(self):
+        self.should_animate = False
         self.opacity = 1
         self.offset = ft.Offset(0, 0)
-        self.update()
 
     def hover_card(self, e):
         is_hovering = (e.data == "true")
@@ -112,7 +122,7 @@ class NewsCard(ft.Container):
              self.scale = 1.05
              # Trigger Map Highlight
              if self.on_highlight:
-                 print(f"DEBUG: Hovering card. Regions: {self.regions}") # DEBUG LOG
+                 logger.debug(f"Hovering card. Regions: {self.regions}")
                  if self.regions:
                      self.on_highlight(self.regions)
         else:
@@ -121,45 +131,79 @@ class NewsCard(ft.Container):
              if self.on_highlight:
                  self.on_highlight([])
 
-        self.update()
+        request_update(self.scheduler, self)
         
     def flip_card(self, e):
+        if self.animator:
+            self.animator.flip(self)
+        else:
+            self.start_flip()
+            self.finish_flip()
+            request_update(self.scheduler, self)
+
+    def start_flip(self):
         self.scale = ft.Scale(0, 1)
-        self.update()
-        threading.Timer(0.3, self._swap_content).start()
-        
+
+    def finish_flip(self):
+        self._swap_content()
+
     def _swap_content(self):
         self.is_front = not self.is_front
         
         if self.is_front:
-            self.content = self._build_front_content()
+            self.content = self._front
         else:
-            self.content = self._build_back_content()
+            if self._back is None:
+                self._back = self._build_back_content()
+            self.content = self._back
             
         self.scale = ft.Scale(1, 1)
-        self.update()
 
     def _build_front_content(self):
+        record = self.record
+        style = self.card_style
         return ft.Column(
             controls=[
                 ft.Row(
                     controls=[
-                        ft.Container(width=16, height=16, bgcolor=self.indicator_color, border_radius=8, border=ft.border.all(1.5, ft.Colors.BLACK)),
-                        ft.Text(self.title, weight=ft.FontWeight.BOLD, color=self.text_color, size=16),
+                        ft.Container(width=16, height=16, bgcolor=style.indicator_color, border_radius=8, border=ft.border.all(1.5, ft.Colors.BLACK)),
+                        ft.Text(record.title, weight=ft.FontWeight.BOLD, color=style.text_color, size=16),
                         ft.Container(expand=True),
-                        ft.Text(self.created_at, color=self.text_color, size=12),
+                        ft.Text(record.time, color=style.text_color, size=12),
                     ],
                     alignment=ft.MainAxisAlignment.START,
                     vertical_alignment=ft.CrossAxisAlignment.CENTER,
                 ),
                 ft.Divider(color=ft.Colors.WHITE24, height=1),
-                ft.Text(self.text, color=self.text_color, size=16, weight=ft.FontWeight.BOLD),
-                ft.Text(self.footer, color=ft.Colors.WHITE70, size=12, italic=True),
+                ft.Text(record.text, color=style.text_color, size=16, weight=ft.FontWeight.BOLD),
+                *self._build_alert_annotation(),
+                ft.Row(
+                    controls=[
+                        ft.Text(record.footer, color=ft.Colors.WHITE70, size=12, italic=True),
+                        ft.Container(expand=True),
+                        self._sources_text,
+                    ],
+                ),
             ],
             spacing=10,
         )
 
+    def _build_alert_annotation(self):
+        minutes = self.record.alert_minutes
+        if minutes is None:
+            return []
+        return [
+            ft.Row(
+                controls=[
+                    ft.Icon(ft.Icons.NOTIFICATIONS_ACTIVE, color=ft.Colors.WHITE, size=16),
+                    ft.Text(f"тривога триває {minutes} хв", color=ft.Colors.WHITE, size=13, weight=ft.FontWeight.W_500),
+                ],
+                spacing=6,
+            )
+        ]
+
     def _build_back_content(self):
+        original_text = self.load_original_text(self.record) if self.load_original_text else None
         return ft.Column(
              controls=[
                 ft.Row(
@@ -174,7 +218,7 @@ class NewsCard(ft.Container):
                 ft.Divider(color=ft.Colors.WHITE54, height=1),
                 ft.Container(
                     content=ft.Text(
-                        self.original_text if self.original_text else "Текст відсутній", 
+                        original_text if original_text else "Текст відсутній", 
                         size=16,
                         color=ft.Colors.WHITE, 
                         selectable=False,
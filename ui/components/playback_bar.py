@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import datetime
+
+import flet as ft
+from service.log_service import get_logger
+from service.metrics import METRICS
+
+logger = get_logger("UI")
+
+# Scrub window and slider resolution
+WINDOW = 24 * 3600
+STEP = 60
+# Recorded seconds per real second while playing (a day in ~70 s)
+PLAYBACK_SPEED = 1200
+
+
+class PlaybackBar(ft.Container):
+    """Time-travel controls under the map: scrub or play back the last 24 hours of alerts.
+
+    Seeking is StateTrack.seek (nearest keyframe + a few deltas); the map only
+    re-renders when the alerting set changes, and repeated states are frame
+    cache hits in the shared renderer.
+    """
+
+    def __init__(self, map_component, state_log, scheduler):
+        super().__init__()
+        self.map = map_component
+        # service.alert_playback.AlertStateLog (shared with the hub)
+        self.state_log = state_log
+        self.scheduler = scheduler
+        self.track = None
+        self.start = None
+        self.position = None
+        self.playing = False
+        self._last_tick = None
+        # Bumped on every play, so a tick left over from an earlier run stops
+        self._run = 0
+
+        self.toggle_btn = ft.IconButton(
+            icon=ft.Icons.HISTORY, icon_color=ft.Colors.BLUE_400, tooltip="Відтворення за добу",
+            on_click=self.on_toggle_click
+        )
+        self.play_btn = ft.IconButton(icon=ft.Icons.PLAY_ARROW, on_click=self.on_play_click, visible=False)
+        self.slider = ft.Slider(
+            min=0, max=WINDOW, divisions=WINDOW // STEP, value=WINDOW,
+            expand=True, visible=False, on_change=self.on_slider_change
+        )
+        self.time_text = ft.Text("", size=12, color=ft.Colors.GREY_400, width=110)
+
+        self.content = ft.Row(
+            controls=[self.toggle_btn, self.play_btn, self.slider, self.time_text],
+            spacing=5,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER
+        )
+
+    @property
+    def active(self):
+        return self.track is not None
+
+    async def on_toggle_click(self, e):
+        if self.active:
+            self.exit()
+        else:
+            await self.enter()
+
+    async def enter(self):
+        end = time.time()
+        self.start = end - WINDOW
+        self.time_text.value = "Завантаження..."
+        self.scheduler.mark_dirty(self.time_text)
+        try:
+            self.track = await asyncio.to_thread(self.state_log.track, self.start, end)
+        except Exception as e:
+            logger.error(f"Error loading alert states: {e}")
+            self.time_text.value = "Немає даних"
+            self.scheduler.mark_dirty(self.time_text)
+            return
+        self.map.enter_playback()
+        self.toggle_btn.icon = ft.Icons.CLOSE
+        self.toggle_btn.tooltip = "Наживо"
+        self.play_btn.visible = True
+        self.slider.visible = True
+        self.scheduler.mark_dirty(self)
+        # Start at the beginning of the window, ready to play forward
+        self.seek(0)
+
+    def exit(self):
+        self.playing = False
+        self.track = None
+        self.map.exit_playback()
+        self.toggle_btn.icon = ft.Icons.HISTORY
+        self.toggle_btn.tooltip = "Відтворення за добу"
+        self.play_btn.icon = ft.Icons.PLAY_ARROW
+        self.play_btn.visible = False
+        self.slider.visible = False
+        self.time_text.value = ""
+        self.scheduler.mark_dirty(self)
+
+    def seek(self, offset):
+        if not self.active:
+            return
+        self.position = min(max(offset, 0), WINDOW)
+        t = self.start + self.position
+        with METRICS.time("map.playback_seek"):
+            self.map.show_playback_state(self.track.seek(t))
+        self.slider.value = self.position
+        self.time_text.value = datetime.fromtimestamp(t).strftime("%d.%m %H:%M")
+        self.scheduler.mark_dirty(self.slider)
+        self.scheduler.mark_dirty(self.time_text)
+
+    async def on_slider_change(self, e):
+        # Dragging pauses playback; every change is one seek, updates coalesce per frame
+        self.playing = False
+        self.play_btn.icon = ft.Icons.PLAY_ARROW
+        self.scheduler.mark_dirty(self.play_btn)
+        self.seek(float(e.control.value))
+
+    async def on_play_click(self, e):
+        self.playing = not self.playing
+        self.play_btn.icon = ft.Icons.PAUSE if self.playing else ft.Icons.PLAY_ARROW
+        self.scheduler.mark_dirty(self.play_btn)
+        if self.playing:
+            if self.position >= WINDOW:
+                self.seek(0)
+            self._last_tick = time.monotonic()
+            self._run += 1
+            run = self._run
+            self.scheduler.call_later(self.scheduler.frame_budget, lambda: self._tick(run))
+
+    def _tick(self, run):
+        # One step per frame, scaled by the real time since the last one
+        if not self.playing or not self.active or run != self._run:
+            return
+        now = time.monotonic()
+        self.seek(self.position + (now - self._last_tick) * PLAYBACK_SPEED)
+        self._last_tick = now
+        if self.position >= WINDOW:
+            self.playing = False
+            self.play_btn.icon = ft.Icons.PLAY_ARROW
+            self.scheduler.mark_dirty(self.play_btn)
+            return
+        self.scheduler.call_later(self.scheduler.frame_budget, lambda: self._tick(run))
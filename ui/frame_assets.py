@@ -0,0 +1,90 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+from service.log_service import get_logger
+
+logger = get_logger("UI")
+
+# Served by Flet (ft.app(assets_dir=ASSETS_DIR)); frames live in a subdirectory.
+# Absolute, next to main.py: Flet resolves a relative assets_dir against the
+# script directory, the writes here would go to the working directory
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+FRAMES_DIR = "frames"
+MAX_FRAMES = 256
+
+
+class FrameAssets:
+    """Map frames published as content-addressed files under the assets directory.
+
+    The client only receives a short URL per update; a URL names exactly one
+    frame, so a frame the client has already loaded (e.g. a highlight toggled
+    back and forth) comes from its image cache instead of over the wire.
+    """
+
+    def __init__(self, assets_dir=ASSETS_DIR, max_frames=MAX_FRAMES):
+        self.dir = os.path.join(assets_dir, FRAMES_DIR)
+        self.max_frames = max_frames
+        os.makedirs(self.dir, exist_ok=True)
+        # digest -> file name, oldest first (files left by earlier runs included)
+        self._files = OrderedDict()
+        existing = sorted(
+            (entry for entry in os.scandir(self.dir) if entry.name.endswith(".svg")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in existing:
+            self._files[entry.name[:-len(".svg")]] = entry.name
+        self._lock = threading.Lock()
+        self._prune()
+
+    def cached_url(self, frame):
+        """URL of a frame already written, else None; no file I/O."""
+        with self._lock:
+            name = self._files.get(frame.digest)
+            if name is None:
+                return None
+            self._files.move_to_end(frame.digest)
+        return f"/{FRAMES_DIR}/{name}"
+
+    async def url_for_async(self, frame):
+        """url_for with the first-use write in a worker thread, off the event loop."""
+        return self.cached_url(frame) or await asyncio.to_thread(self.url_for, frame)
+
+    def url_for(self, frame):
+        """URL of the frame (ui.map_renderer.Frame), written on first use. Blocking."""
+        with self._lock:
+            name = self._files.get(frame.digest)
+            if name is not None:
+                self._files.move_to_end(frame.digest)
+            else:
+                name = f"{frame.digest}.svg"
+                path = os.path.join(self.dir, name)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(frame.svg)
+                os.replace(tmp_path, path)
+                self._files[frame.digest] = name
+                self._prune()
+        return f"/{FRAMES_DIR}/{name}"
+
+    def _prune(self):
+        while len(self._files) > self.max_frames:
+            _, name = self._files.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.dir, name))
+            except OSError as e:
+                logger.warning(f"Error removing map frame {name}: {e}")
+
+
+_assets = None
+_assets_lock = threading.Lock()
+
+
+def get_frame_assets():
+    """Process-wide frame store (shared by all sessions, like the renderer)."""
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = FrameAssets()
+        return _assets
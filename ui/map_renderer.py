@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from service.metrics import METRICS
+
+# (fill, stroke, stroke-width) per region state
+NEUTRAL_STYLE = ("#2D2D2D", "#606060", "1")
+ALERT_STYLE = ("#CC0000", "#606060", "1")
+HIGHLIGHT_STYLE = ("#707070", "#FFFFFF", "1.5")
+ALERT_HIGHLIGHT_STYLE = ("#FF3333", "#FFFFFF", "2")
+
+# Geometry levels. A path gives its level in `data-level`, otherwise it is
+# derived from the id depth: UA-63 (oblast), UA-63-01 (raion), UA-63-01-05 (hromada)
+OBLAST = 0
+RAION = 1
+HROMADA = 2
+
+# Margin around a zoomed-in oblast, as a fraction of its size
+ZOOM_PADDING = 0.05
+
+_VIEWBOX_MARKER = "__VIEWBOX__"
+_SLOT_RE = re.compile(r'(viewBox="__VIEWBOX__"|fill="__R\d+__")')
+_PATH_TOKEN_RE = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_PATH_PARAMS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+class Frame:
+    """One rendered map state: SVG bytes plus their content digest."""
+
+    __slots__ = ("svg", "digest", "_b64")
+
+    def __init__(self, svg):
+        self.svg = svg
+        self.digest = hashlib.sha1(svg).hexdigest()[:20]
+        self._b64 = None
+
+    @property
+    def b64(self):
+        # Only for the inline (src_base64) fallback and the cold-start cache
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.svg).decode("ascii")
+        return self._b64
+
+
+def region_style(is_alert, is_highlight):
+    # Priority: Highlight > Alert > Normal; a highlighted alert is a brighter red
+    if is_highlight:
+        return ALERT_HIGHLIGHT_STYLE if is_alert else HIGHLIGHT_STYLE
+    return ALERT_STYLE if is_alert else NEUTRAL_STYLE
+
+
+def element_level(elem):
+    level = elem.get("data-level")
+    if level is not None:
+        return int(level)
+    return max(0, elem.get("id").count("-") - 1)
+
+
+def oblast_id(region_id):
+    return "-".join(region_id.split("-")[:2])
+
+
+def path_bbox(d):
+    """(min_x, min_y, max_x, max_y) of a path's points, control points included."""
+    xs, ys = [], []
+    x = y = start_x = start_y = 0.0
+    command = None
+    tokens = _PATH_TOKEN_RE.findall(d or "")
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                x, y = start_x, start_y
+                continue
+        if command is None:
+            break
+        upper = command.upper()
+        count = _PATH_PARAMS[upper]
+        params = [float(t) for t in tokens[i:i + count]]
+        if len(params) < count:
+            break
+        i += count
+        relative = command.islower()
+
+        if upper == "H":
+            x = params[0] + (x if relative else 0)
+        elif upper == "V":
+            y = params[0] + (y if relative else 0)
+        else:
+            # Arcs: only the end point is a coordinate pair
+            pairs = params[5:7] if upper == "A" else params
+            base_x, base_y = (x, y) if relative else (0.0, 0.0)
+            for px, py in zip(pairs[0::2], pairs[1::2]):
+                xs.append(base_x + px)
+                ys.append(base_y + py)
+            x, y = xs[-1], ys[-1]
+        xs.append(x)
+        ys.append(y)
+
+        if upper == "M":
+            start_x, start_y = x, y
+            # Further pairs after a moveto are implicit linetos
+            command = "l" if relative else "L"
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class MapRenderer:
+    """Parsed map geometry plus a cache of rendered frames.
+
+    Flet-free and shared by every MapComponent in the process (see
+    get_renderer), so the SVG is parsed once and a frame for a given
+    state is rendered once no matter how many sessions show it.
+
+    The document is serialized once into static chunks with one slot per
+    region (its style attributes) and one for the viewBox. A new state only
+    rewrites the slots of the regions whose style or visibility changed,
+    so a single-district change costs one slot, not a walk of the tree.
+    """
+
+    def __init__(self, svg_path, cache_size=64):
+        self.svg_path = svg_path
+        self.cache_size = cache_size
+        self.region_ids = set()
+        # id -> level, title -> id, level -> ids
+        self.levels = {}
+        self.names = {}
+        self.ids_by_level = {}
+        self.viewbox = None
+        self._elements = {}
+        self._bboxes = {}
+        self._chunks = []
+        self._slot_pos = {}
+        self._viewbox_pos = None
+        # State of the chunks as last rendered (diffed against the next state)
+        self._active = frozenset()
+        self._highlighted = frozenset()
+        self._visible_levels = None
+        self._zoom = None
+        self._frames = OrderedDict()
+        # Chunks are mutated while rendering; sessions may render from worker threads
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Register namespaces to prevent ns0: prefixes
+        ET.register_namespace("", "http://www.w3.org/2000/svg")
+        ET.register_namespace("mapsvg", "http://mapsvg.com")
+
+        root = ET.parse(self.svg_path).getroot()
+
+        # Fix SVG scaling: Add viewBox if missing
+        width = root.get('width')
+        height = root.get('height')
+        if width and height:
+            if 'viewBox' not in root.attrib:
+                w = width.replace('pt', '').replace('px', '')
+                h = height.replace('pt', '').replace('px', '')
+                root.set('viewBox', f"0 0 {w} {h}")
+
+            # Remove width/height to let Flutter handle scaling via viewBox + fit
+            del root.attrib['width']
+            del root.attrib['height']
+        self.viewbox = root.get('viewBox')
+
+        # Namespace handling: ElementTree might tag as {http://www.w3.org/2000/svg}path
+        paths = [elem for elem in root.iter() if elem.tag.endswith('path') and elem.get('id')]
+        for i, elem in enumerate(paths):
+            region_id = elem.get("id")
+            level = element_level(elem)
+            self._elements[region_id] = elem
+            self.levels[region_id] = level
+            self.ids_by_level.setdefault(level, set()).add(region_id)
+            for attr in ("data-name", "title"):
+                if elem.get(attr):
+                    self.names[elem.get(attr)] = region_id
+
+            # Style attributes become a per-region slot in the serialized document
+            for attr in ("fill", "stroke", "stroke-width", "display"):
+                elem.attrib.pop(attr, None)
+            elem.set("fill", f"__R{i}__")
+        self.region_ids = set(self._elements)
+
+        if self.viewbox:
+            root.set('viewBox', _VIEWBOX_MARKER)
+        self._build_chunks(ET.tostring(root, encoding="unicode"), [elem.get("id") for elem in paths])
+        self._visible_levels = frozenset(self.ids_by_level)
+        return self
+
+    def _build_chunks(self, text, ids):
+        # Odd entries after the split are the markers; they become the slots
+        self._chunks = _SLOT_RE.split(text)
+        for pos in range(1, len(self._chunks), 2):
+            marker = self._chunks[pos]
+            if marker.startswith("viewBox"):
+                self._viewbox_pos = pos
+                self._chunks[pos] = f'viewBox="{self.viewbox}"'
+            else:
+                region_id = ids[int(marker[len('fill="__R'):-len('__"')])]
+                self._slot_pos[region_id] = pos
+                self._chunks[pos] = self._slot(False, False, True)
+
+    @staticmethod
+    def _slot(is_alert, is_highlight, visible):
+        fill, stroke, stroke_width = region_style(is_alert, is_highlight)
+        slot = f'fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"'
+        return slot if visible else slot + ' display="none"'
+
+    def region_id(self, name):
+        """Geometry id for a region title (`title`/`data-name` attribute), or None."""
+        return self.names.get(name)
+
+    def zoom_viewbox(self, region_id):
+        """viewBox framing an oblast and everything below it, or None for the whole map."""
+        if region_id is None:
+            return None
+        oblast = oblast_id(region_id)
+        boxes = []
+        for rid, elem in self._elements.items():
+            if oblast_id(rid) != oblast:
+                continue
+            if rid not in self._bboxes:
+                self._bboxes[rid] = path_bbox(elem.get("d"))
+            if self._bboxes[rid]:
+                boxes.append(self._bboxes[rid])
+        if not boxes:
+            return None
+        min_x = min(b[0] for b in boxes)
+        min_y = min(b[1] for b in boxes)
+        width = max(b[2] for b in boxes) - min_x
+        height = max(b[3] for b in boxes) - min_y
+        pad_x, pad_y = width * ZOOM_PADDING, height * ZOOM_PADDING
+        return f"{min_x - pad_x:.2f} {min_y - pad_y:.2f} {width + 2 * pad_x:.2f} {height + 2 * pad_y:.2f}"
+
+    def render(self, active_ids, highlighted_ids, levels=None, zoom=None):
+        """Returns the Frame for a state, rendering it only on a cache miss.
+
+        levels: visible geometry levels (default: all); zoom: id of an oblast to frame.
+        """
+        active = frozenset(active_ids)
+        highlighted = frozenset(highlighted_ids)
+        visible_levels = frozenset(levels) if levels is not None else frozenset(self.ids_by_level)
+        zoom = oblast_id(zoom) if zoom else None
+        key = (active, highlighted, visible_levels, zoom)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                METRICS.increment("map.frame_cache_hit")
+                return frame
+
+            with METRICS.time("map.render_state"):
+                changed = (active ^ self._active) | (highlighted ^ self._highlighted)
+                for level in visible_levels ^ self._visible_levels:
+                    changed |= self.ids_by_level.get(level, set())
+                for region_id in changed:
+                    pos = self._slot_pos.get(region_id)
+                    if pos is not None:
+                        self._chunks[pos] = self._slot(
+                            region_id in active, region_id in highlighted,
+                            self.levels[region_id] in visible_levels,
+                        )
+                if zoom != self._zoom and self._viewbox_pos is not None:
+                    self._chunks[self._viewbox_pos] = f'viewBox="{self.zoom_viewbox(zoom) or self.viewbox}"'
+                self._active, self._highlighted = active, highlighted
+                self._visible_levels, self._zoom = visible_levels, zoom
+            METRICS.increment("map.slots_rewritten", len(changed))
+
+            with METRICS.time("map.encode"):
+                frame = Frame("".join(self._chunks).encode("utf-8"))
+
+            self._frames[key] = frame
+            if len(self._frames) > self.cache_size:
+                self._frames.popitem(last=False)
+            return frame
+
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def get_renderer(svg_path):
+    """Process-wide renderer per SVG file; parsed on first use (blocking)."""
+    with _renderers_lock:
+        renderer = _renderers.get(svg_path)
+        if renderer is None:
+            renderer = _renderers[svg_path] = MapRenderer(svg_path).load()
+        return renderer
@@ -1,16 +1,16 @@
 import flet as ft
-from ui.components.map_component import REGION_MAPPING
+from service.regions import REGION_MAPPING
+from service.log_service import get_logger
+
+logger = get_logger("UI")
 
 class SettingsDialog(ft.AlertDialog):
-    def __init__(self, page: ft.Page, on_dev_mode_change, on_region_changed):
+    def __init__(self, page: ft.Page, settings, on_dev_mode_change):
         super().__init__()
         self.page = page
+        # ui.settings_store.SettingsStore: never touches client storage synchronously
+        self.settings = settings
         self.on_dev_mode_change = on_dev_mode_change
-        self.on_region_changed = on_region_changed
-        
-        # Load saved region from client storage
-        # DEFERRED to show() to avoid TimeoutError
-        # saved_region = self.page.client_storage.get("user_region")
         
         self.dev_mode_switch = ft.Switch(
             label="Режим розробника",
@@ -27,7 +27,7 @@ class SettingsDialog(ft.AlertDialog):
             label="Ваш регіон",
             hint_text="Оберіть область",
             options=options,
-            value="Не обрано", # Default, updated in show()
+            value=settings.get("user_region") or "Не обрано", # Updated when the settings load
             on_change=self.on_region_change,
             width=280
         )
@@ -46,35 +46,21 @@ class SettingsDialog(ft.AlertDialog):
         self.actions = [
             ft.TextButton("Закрити", on_click=self.close_dialog)
         ]
+        settings.subscribe("user_region", self.on_region_setting)
 
     def on_switch_change(self, e):
         self.on_dev_mode_change(e.control.value)
         
     def on_region_change(self, e):
         val = e.control.value
-        if val == "Не обрано":
-            self.page.client_storage.remove("user_region")
-            self.on_region_changed(None)
-        else:
-            self.page.client_storage.set("user_region", val)
-            self.on_region_changed(val)
+        self.settings.set("user_region", None if val == "Не обрано" else val)
+
+    def on_region_setting(self, region):
+        # Dialog controls are rendered when opened; no update needed here
+        self.region_dropdown.value = region if region else "Не обрано"
 
     def close_dialog(self, e):
         self.page.close(self)
 
     def show(self):
-        # Load saved region just before showing to ensure client is ready
-        # and to avoid TimeoutError during app startup
-        try:
-            saved_region = self.page.client_storage.get("user_region")
-            self.region_dropdown.value = saved_region if saved_region else "Не обрано"
-            
-            # Note: We do NOT call .update() here because the dialog isn't open yet.
-            # Setting .value is enough; it will render correctly when opened.
-            
-            # Also update the cache in main
-            self.on_region_changed(saved_region)
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-            
         self.page.open(self)
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from collections import namedtuple
+
+from service.log_service import get_logger
+
+logger = get_logger("UI")
+
+Setting = namedtuple("Setting", ["key", "type", "default"])
+
+# Everything kept in client storage; values are coerced to `type` on load and set
+SETTINGS = {
+    "user_region": Setting("user_region", str, None),
+}
+
+# Writes within this window are coalesced into one client storage round-trip per key
+WRITE_DELAY = 0.5
+
+
+def _coerce(setting, value):
+    if value is None:
+        return setting.default
+    try:
+        return setting.type(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for setting {setting.key}: {value!r}")
+        return setting.default
+
+
+class SettingsStore:
+    """In-process settings cache in front of page.client_storage.
+
+    Loaded once asynchronously; get() only reads the cache, so hot paths
+    never wait on the client. set() updates the cache, notifies subscribers
+    and persists in the background (write-behind).
+    """
+
+    def __init__(self, page, scheduler, settings=SETTINGS, write_delay=WRITE_DELAY):
+        self.page = page
+        # UpdateScheduler.call_later: thread-safe, sync Flet handlers run in worker threads
+        self.scheduler = scheduler
+        self.settings = settings
+        self.write_delay = write_delay
+        self._values = {key: s.default for key, s in settings.items()}
+        self._subscribers = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._flush_pending = False
+        self.loaded = asyncio.Event()
+
+    async def load(self):
+        """Reads every setting concurrently; subscribers see the loaded values."""
+        if self.loaded.is_set():
+            return
+        keys = list(self.settings)
+        results = await asyncio.gather(
+            *(self.page.client_storage.get_async(key) for key in keys), return_exceptions=True
+        )
+        for key, value in zip(keys, results):
+            if isinstance(value, Exception):
+                logger.error(f"Error loading setting {key}: {value}")
+                continue
+            # A set() made before the load finished wins over the stored value
+            if key not in self._dirty:
+                self._store(key, _coerce(self.settings[key], value))
+        self.loaded.set()
+
+    def get(self, key):
+        return self._values[key]
+
+    def set(self, key, value):
+        self._store(key, _coerce(self.settings[key], value))
+        with self._lock:
+            self._dirty.add(key)
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+        self.scheduler.call_later(self.write_delay, lambda: asyncio.ensure_future(self.flush()))
+
+    def subscribe(self, key, callback):
+        """callback(value) on every change of `key`."""
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key, callback):
+        callbacks = self._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _store(self, key, value):
+        if self._values.get(key) == value:
+            return
+        self._values[key] = value
+        for callback in list(self._subscribers.get(key, ())):
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"Settings subscriber for {key} failed: {e}")
+
+    async def flush(self):
+        """Persists pending changes (latest value per key)."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flush_pending = False
+        for key in dirty:
+            value = self._values[key]
+            try:
+                if value is None:
+                    await self.page.client_storage.remove_async(key)
+                else:
+                    await self.page.client_storage.set_async(key, value)
+            except Exception as e:
+                logger.error(f"Error saving setting {key}: {e}")
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from service.log_service import get_logger
+
+logger = get_logger("UI")
+
+
+class UpdateScheduler:
+    """Coalesces UI updates: components mark themselves dirty, one flush per frame."""
+
+    def __init__(self, page, frame_budget=1 / 30):
+        self.page = page
+        self.frame_budget = frame_budget
+
+        # id(control) -> control, insertion ordered so flushes stay deterministic
+        self._dirty = {}
+        self._page_dirty = False
+        self._flush_pending = False
+        self._after_flush = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+        # Metrics
+        self.requested = 0
+        self.flushed_controls = 0
+        self.flushes = 0
+
+    def mark_dirty(self, control=None):
+        """Request an update of `control` (or the whole page if None) on the next frame."""
+        with self._lock:
+            self.requested += 1
+            if control is None or control is self.page:
+                self._page_dirty = True
+            else:
+                self._dirty[id(control)] = control
+
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+
+        delay = max(0.0, self._last_flush + self.frame_budget - time.monotonic())
+        self.call_later(delay, self.flush)
+
+    def after_flush(self, callback):
+        """Runs `callback()` once the next flush has been sent to the client."""
+        with self._lock:
+            self._after_flush.append(callback)
+            pending = self._flush_pending
+            self._flush_pending = True
+        if not pending:
+            self.call_later(0, self.flush)
+
+    def call_later(self, delay, callback):
+        """Thread-safe loop.call_later; runs inline when there is no event loop."""
+        if self._loop is None:
+            # No event loop (e.g. constructed outside of flet's async app)
+            callback()
+        elif self._on_loop_thread():
+            self._loop.call_later(delay, callback)
+        else:
+            self._loop.call_soon_threadsafe(self._loop.call_later, delay, callback)
+
+    def _on_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def flush(self):
+        with self._lock:
+            page_dirty = self._page_dirty
+            dirty = list(self._dirty.values())
+            callbacks = self._after_flush
+            self._after_flush = []
+            self._dirty.clear()
+            self._page_dirty = False
+            self._flush_pending = False
+            self._last_flush = time.monotonic()
+
+        try:
+            self._send(page_dirty, dirty)
+        finally:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"After-flush callback failed: {e}")
+
+    def _send(self, page_dirty, dirty):
+        if page_dirty:
+            controls = []
+        else:
+            controls = self._minimal_set(dirty)
+            if not controls:
+                return
+
+        try:
+            self.page.update(*controls)
+        except Exception as e:
+            logger.error(f"UI flush failed: {e}")
+            return
+
+        self.flushes += 1
+        self.flushed_controls += len(controls) if controls else 1
+
+    @staticmethod
+    def _minimal_set(controls):
+        # Drop controls that are not mounted yet, and controls whose ancestor
+        # is already part of this flush (its diff includes the descendants).
+        mounted = [c for c in controls if c.page]
+        ids = {id(c) for c in mounted}
+        result = []
+        for control in mounted:
+            parent = control.parent
+            covered = False
+            while parent is not None:
+                if id(parent) in ids:
+                    covered = True
+                    break
+                parent = parent.parent
+            if not covered:
+                result.append(control)
+        return result
+
+    def stats(self):
+        return {
+            "requested": self.requested,
+            "flushes": self.flushes,
+            "flushed_controls": self.flushed_controls,
+            "pending": len(self._dirty) + (1 if self._page_dirty else 0),
+        }
+
+
+def request_update(scheduler, control=None):
+    """Route an update through the scheduler, falling back to a direct update."""
+    if scheduler is not None:
+        scheduler.mark_dirty(control)
+    elif control is not None and control.page:
+        control.update()